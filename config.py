@@ -4,6 +4,7 @@
 
 # RAW DATA sheet
 DATA_SHEET_NAME = None          # Use first sheet if None
+ALL_DATA_SHEETS = False         # If DATA_SHEET_NAME is None: read every sheet whose header has the SO column
 HEADER_ROW      = 1             # Row index for column names
 
 # ================================================================
@@ -45,6 +46,59 @@ ATTACH_SHEET_NAME     = "ATTACHMENT"
 # ================================================================
 DATA_START_ROW        = 3    # First row of data (row 3)
 SERVICE_ORDER_COL_IDX = 2    # Column B in CLAIM/ATTACHMENT
+UPSERT_EXISTING       = False  # Rewrite SOs already in the template when their content changed (instead of skipping them)
+
+
+# ================================================================
+# LARGE-FILE (STREAMING) INGESTION
+# ================================================================
+STREAM_CHUNK_SIZE     = 5000   # RAW rows held in memory at once
+STREAM_MIN_ROWS       = 150000 # Stream RAW files with at least this many rows
+STREAM_MIN_FILE_MB    = 40     # ... or at least this file size
+FAST_XLSX_READER      = True   # Column-projected reader (core/xlsx_reader.py) for .xlsx/.xlsm RAW files
+CATEGORICAL_RAW       = True   # Hold repetitive RAW columns (Technician, Site ID, statuses...) as categoricals
+BATCH_MAX_WORKERS     = 4      # Worker processes when several RAW files are ingested together
+
+
+# ================================================================
+# PARSED-INPUT CACHE (core/artifact_cache.py)
+# ================================================================
+import os as _os
+CACHE_ENABLED         = True   # Reuse parsed RAW / LKS / worker master files across runs
+CACHE_DIR             = _os.path.join(_os.path.dirname(_os.path.abspath(__file__)), ".cache")
+CACHE_MAX_MB          = 512    # Least recently used entries are removed beyond this size
+
+
+# ================================================================
+# PUBLIC HOLIDAYS (core/holiday_calendar.py)
+# ================================================================
+HOLIDAY_FILE          = _os.path.join(_os.path.dirname(_os.path.abspath(__file__)), "core", "data", "public_holidays.csv")
+HOLIDAY_STATE         = "JHR"  # State whose holidays apply when a row's Site ID is not in SITE_STATES
+PAYSLIP_FILL_DAY_TYPES = False  # Payslip: count CLAIM rows with a blank Day Type by their calendar day type (typed values are never changed)
+SITE_STATES           = {"6340": "JHR", "6342": "JHR", "6346": "JHR", "6410": "KTN"}
+
+
+# ================================================================
+# ATTACHMENT PHOTOS (network access to the Attachments URL links)
+# ================================================================
+HTTP_TIMEOUT          = 10     # Seconds per request (connect and read)
+HTTP_MAX_WORKERS      = 16     # Concurrent requests (also the keep-alive pool size)
+HTTP_HOST_MAX_WORKERS = 8      # Concurrent requests to any one host
+CHECK_LINKS           = False  # Request every written image link and flag broken ones for review (main.py --check-links)
+LINK_CHECK_TTL_HOURS  = 24     # A link's checked status is reused for this long
+PHOTO_DATES           = False  # Use photo EXIF capture dates as the diskon override date (main.py --photo-dates)
+EXIF_FETCH_BYTES      = 64 * 1024  # Leading bytes of each photo fetched to find its EXIF block
+OCR_DATES             = False  # Read the date stamp burned into photos as the override date (main.py --ocr-dates)
+OCR_BACKEND           = "tesseract"  # Text recognizer (core/services/ocr_dates.py OCR_BACKENDS)
+OCR_STAMP_BOX         = (0.45, 0.80, 1.0, 1.0)  # Stamp region as fractions of the photo (left, top, right, bottom)
+OCR_MAX_WORKERS       = 4      # Worker processes recognizing stamps (and hashing photos, PHOTO_DUPLICATES)
+IMAGE_MODE            = "formula"  # ATTACHMENT photos: "formula" (=IMAGE(url), fetched by Excel) or "embedded" (thumbnails, main.py --embed-images)
+THUMB_DIR             = _os.path.join(CACHE_DIR, "thumbnails")  # Downscaled photos, named by the photo's content hash
+THUMB_SIZE            = (160, 120)  # Largest thumbnail width, height in pixels (the photo's aspect ratio is kept)
+THUMB_QUALITY         = 80     # JPEG quality of the thumbnails
+PHOTO_DUPLICATES      = False  # Flag SOs whose photos look like another SO's photo (main.py --photo-duplicates)
+PHASH_MAX_DISTANCE    = 6      # Photos whose 64-bit perceptual hashes differ in at most this many bits are the same photo
+PHOTO_HASH_ARCHIVE    = _os.path.join(CACHE_DIR, "photo_hashes.npz")  # Hashes of earlier runs' photos (kept by updates with .cache)
 
 
 # ================================================================
@@ -52,5 +106,4 @@ SERVICE_ORDER_COL_IDX = 2    # Column B in CLAIM/ATTACHMENT
 # ================================================================
 # Add more here if other modules need configuration
 # Template file should be in the same directory as the script
-import os as _os
 DEFAULT_TEMPLATE_PATH = _os.path.join(_os.path.dirname(_os.path.abspath(__file__)), "LKS Template (M).xlsm")
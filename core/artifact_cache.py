@@ -0,0 +1,162 @@
+# core/artifact_cache.py — content-addressed cache for parsed input workbooks
+"""
+On-disk cache of parsed Excel inputs.
+
+Entries are keyed by the SHA-256 of the input file content plus a code
+fingerprint (VERSION and the sources under core/ and config.py), so an
+edited input or an updated release never reads a stale entry. Values are
+pickled; the cache directory is trimmed to CACHE_MAX_MB, least recently
+used entries first (a hit refreshes the entry's mtime).
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+from config import CACHE_ENABLED, CACHE_DIR, CACHE_MAX_MB
+
+APP_DIR = Path(__file__).resolve().parents[1]
+VERSION_FILE = APP_DIR / "VERSION"
+
+# Bump when the shape of a cached artifact changes without a code change
+CACHE_SCHEMA = 1
+
+_MISSING = object()
+_code_version = None
+_digests = {}  # (path, size, mtime_ns) -> content digest, per process
+
+
+def code_version():
+    """Fingerprint of the code that produces cached artifacts."""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256(f"schema={CACHE_SCHEMA}".encode())
+        if VERSION_FILE.exists():
+            digest.update(VERSION_FILE.read_bytes())
+        sources = sorted((APP_DIR / "core").rglob("*.py")) + [APP_DIR / "config.py"]
+        for source in sources:
+            digest.update(str(source.relative_to(APP_DIR)).encode())
+            digest.update(source.read_bytes())
+        _code_version = digest.hexdigest()
+    return _code_version
+
+
+def file_digest(path, block_size=1 << 20):
+    """SHA-256 of a file's content (memoized while size and mtime are unchanged)."""
+    path = Path(path).resolve()
+    stat = path.stat()
+    memo_key = (str(path), stat.st_size, stat.st_mtime_ns)
+    digest = _digests.get(memo_key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, "rb") as handle:
+            for block in iter(lambda: handle.read(block_size), b""):
+                sha.update(block)
+        digest = _digests[memo_key] = sha.hexdigest()
+    return digest
+
+
+class ArtifactCache:
+    """
+    Pickle store for parsed inputs with size-based LRU eviction.
+
+    Use one instance per run; `hits` / `misses` count its lookups so the
+    run log can report them (see `summary`).
+    """
+
+    def __init__(self, root=CACHE_DIR, max_mb=CACHE_MAX_MB, enabled=CACHE_ENABLED):
+        self.root = Path(root)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, kind, *inputs):
+        """
+        Cache key for an artifact built from `inputs`.
+
+        Paths contribute their content hash, anything else its repr
+        (sheet names, options).
+        """
+        sha = hashlib.sha256(f"{kind}|{code_version()}".encode())
+        for item in inputs:
+            token = f"file:{file_digest(item)}" if isinstance(item, Path) else f"value:{item!r}"
+            sha.update(b"|" + token.encode())
+        return sha.hexdigest()
+
+    def _entry(self, kind, key):
+        return self.root / f"{kind}-{key}.pkl"
+
+    def get(self, kind, key, default=None):
+        if not self.enabled:
+            return default
+        entry = self._entry(kind, key)
+        try:
+            with open(entry, "rb") as handle:
+                value = pickle.load(handle)
+        except FileNotFoundError:
+            self.misses += 1
+            return default
+        except Exception:
+            # Truncated or written by an incompatible interpreter
+            entry.unlink(missing_ok=True)
+            self.misses += 1
+            return default
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        self.hits += 1
+        return value
+
+    def put(self, kind, key, value):
+        if not self.enabled:
+            return
+        tmp = None
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            with os.fdopen(fd, "wb") as handle:
+                pickle.dump(value, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._entry(kind, key))
+        except (OSError, pickle.PicklingError):
+            # A read-only or full disk only costs the speed-up
+            if tmp is not None:
+                Path(tmp).unlink(missing_ok=True)
+            return
+        self.evict()
+
+    def fetch(self, kind, inputs, compute):
+        """Cached value for (kind, inputs), or compute() stored under that key."""
+        if not self.enabled:
+            return compute()
+        key = self.key(kind, *inputs)
+        value = self.get(kind, key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(kind, key, value)
+        return value
+
+    def evict(self):
+        """Deletes least recently used entries until the cache fits in max_bytes."""
+        try:
+            entries = [(entry.stat(), entry) for entry in self.root.glob("*.pkl")]
+        except OSError:
+            return
+        total = sum(stat.st_size for stat, _ in entries)
+        if total <= self.max_bytes:
+            return
+        for stat, entry in sorted(entries, key=lambda item: item[0].st_mtime_ns):
+            if total <= self.max_bytes:
+                break
+            try:
+                entry.unlink()
+            except OSError:
+                continue
+            total -= stat.st_size
+
+    def summary(self):
+        if not self.enabled:
+            return "disabled"
+        return f"{self.hits} hit(s), {self.misses} miss(es)"
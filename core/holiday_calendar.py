@@ -0,0 +1,191 @@
+# core/holiday_calendar.py — public-holiday day-type index
+"""
+Day type (Hari Biasa / Hujung Minggu / Cuti Umum) of any date, per state.
+
+The holiday list (HOLIDAY_FILE, see its header for the format) is expanded
+once into a uint8 table of day-type codes, one row per state and one column
+per day of the years the file covers, so classifying a whole date column is
+a single array lookup; a single date (`day_type`) is looked up in a set of
+(state, holiday) pairs instead. A public holiday wins over the Sunday rule;
+dates outside the covered years get the Sunday rule only, with a warning
+once per year.
+"""
+from datetime import date, datetime
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from config import HOLIDAY_FILE, HOLIDAY_STATE, SITE_STATES
+
+HARI_BIASA, HUJUNG_MINGGU, CUTI_UMUM = 0, 1, 2
+DAY_TYPES = ("Hari Biasa", "Hujung Minggu", "Cuti Umum")   # indexed by code
+
+STATES = ("JHR", "KDH", "KTN", "MLK", "NSN", "PHG", "PNG", "PRK",
+          "PLS", "SBH", "SWK", "SGR", "TRG", "KUL", "LBN", "PJY")
+
+_SUNDAY = 3             # 1970-01-01 (day 0) was a Thursday; (days + 3) % 7 counts from Monday
+_DAY_TYPE_LABELS = np.asarray(DAY_TYPES, dtype=object)
+
+
+def _parse_states(spec):
+    """State codes of a `states` field ("ALL;-SWK", "JHR;KTN", ...)."""
+    selected = set()
+    for token in str(spec).upper().replace(" ", "").split(";"):
+        if token == "ALL":
+            selected.update(STATES)
+        elif token.startswith("-"):
+            selected.discard(token[1:])
+        elif token in STATES:
+            selected.add(token)
+        elif token:
+            raise ValueError(f"Unknown state code {token!r} in holiday list.")
+    return selected
+
+
+def _as_days(dates):
+    """datetime64[D] array of a date column (datetime64, datetime/date objects or None)."""
+    if isinstance(dates, pd.Series):
+        dates = dates.to_numpy()
+    dates = np.asarray(dates)
+    if dates.dtype.kind != "M":
+        dates = pd.to_datetime(pd.Series(dates, dtype=object), errors="coerce").to_numpy()
+    return dates.astype("datetime64[D]")
+
+
+def _weekday_codes(days):
+    """HUJUNG_MINGGU on Sundays, HARI_BIASA elsewhere (and on NaT)."""
+    ints = days.astype("int64")
+    sunday = ~np.isnat(days) & ((ints + _SUNDAY) % 7 == 6)
+    return np.where(sunday, HUJUNG_MINGGU, HARI_BIASA).astype(np.uint8)
+
+
+class HolidayCalendar:
+    """
+    Precomputed day-type table for the years covered by a holiday list.
+
+    `holidays` maps state code -> iterable of dates. Use `load` for the
+    configured file and `default_calendar()` for the shared instance.
+    """
+
+    def __init__(self, holidays, default_state=HOLIDAY_STATE):
+        if default_state not in STATES:
+            raise ValueError(f"Unknown default state {default_state!r}.")
+        self.default_state = default_state
+        self._state_index = {state: i for i, state in enumerate(STATES)}
+        self._warned_years = set()
+
+        all_days = np.asarray(sorted({np.datetime64(d, "D") for days in holidays.values() for d in days}),
+                              dtype="datetime64[D]")
+        if len(all_days):
+            first_year = all_days[0].astype("datetime64[Y]")
+            last_year = all_days[-1].astype("datetime64[Y]")
+            self.start = first_year.astype("datetime64[D]")
+            self.end = (last_year + 1).astype("datetime64[D]")
+        else:
+            self.start = self.end = np.datetime64("1970-01-01", "D")
+
+        span = np.arange(self.start, self.end, dtype="datetime64[D]")
+        self.index = np.tile(_weekday_codes(span), (len(STATES), 1))
+        for state, days in holidays.items():
+            offsets = np.asarray([np.datetime64(d, "D") for d in days], dtype="datetime64[D]") - self.start
+            self.index[self._state_index[state], offsets.astype("int64")] = CUTI_UMUM
+        self._holidays = {
+            (self._state_index[state], np.datetime64(d, "D").item()) for state, days in holidays.items() for d in days
+        }
+        self._years = range(self.start.item().year, self.end.item().year) if len(all_days) else range(0)
+
+    @classmethod
+    def load(cls, path=HOLIDAY_FILE, default_state=HOLIDAY_STATE):
+        """Calendar for a holiday CSV (date,name,states)."""
+        table = pd.read_csv(path, comment="#", dtype=str, keep_default_na=False)
+        holidays = {state: [] for state in STATES}
+        for day, spec in zip(pd.to_datetime(table["date"], format="%Y-%m-%d"), table["states"]):
+            for state in _parse_states(spec):
+                holidays[state].append(day.date())
+        return cls(holidays, default_state)
+
+    def _state_row(self, state):
+        """Row index into `index` of one state code / Site ID (default state when None or unknown)."""
+        return self._state_index.get(_state_of(state), self._state_index[self.default_state])
+
+    def _warn_uncovered(self, years):
+        """Warn once per year that is not in the holiday list (only Sundays are marked there)."""
+        if not self._years:
+            return      # no holiday list at all: default_calendar already warned
+        for year in sorted(set(years) - self._warned_years):
+            if year not in self._years:
+                self._warned_years.add(year)
+                print(f"Warning: The holiday list covers {self._years[0]}-{self._years[-1]} only; "
+                      f"public holidays in {year} will not be marked as Cuti Umum.")
+
+    def state_codes(self, states, n):
+        """Row index into `index` of each of `n` rows (scalar/None/array of codes or Site IDs)."""
+        default = self._state_index[self.default_state]
+        if states is None:
+            return np.full(n, default, dtype=np.intp)
+        if isinstance(states, str) or np.ndim(states) == 0:
+            return np.full(n, self._state_row(states), dtype=np.intp)
+        codes, uniques = pd.factorize(pd.Series(states, dtype=object))
+        rows = np.fromiter((self._state_index.get(_state_of(u), default) for u in uniques),
+                           dtype=np.intp, count=len(uniques))
+        return np.append(rows, default)[codes]   # code -1 (missing cell) -> default
+
+    def classify(self, dates, states=None):
+        """
+        Day-type codes (uint8, see DAY_TYPES) of a date column.
+
+        `states` is one state code / Site ID for all rows, one per row, or
+        None for the default state. NaT / None dates are HARI_BIASA.
+        """
+        days = _as_days(dates)
+        codes = _weekday_codes(days)
+        offsets = days.astype("int64") - self.start.astype("int64")
+        dated = ~np.isnat(days)
+        inside = dated & (offsets >= 0) & (offsets < self.index.shape[1])
+        if inside.any():
+            rows = self.state_codes(states, len(days))
+            codes[inside] = self.index[rows[inside], offsets[inside]]
+        outside = dated & ~inside
+        if outside.any():
+            self._warn_uncovered(np.unique(days[outside].astype("datetime64[Y]").astype("int64") + 1970).tolist())
+        return codes
+
+    def labels(self, dates, states=None):
+        """classify as an object array of DAY_TYPES labels."""
+        return _DAY_TYPE_LABELS[self.classify(dates, states)]
+
+    def day_type(self, day, state=None):
+        """DAY_TYPES label of one date (None -> "Hari Biasa"); classify is for whole columns."""
+        if isinstance(day, datetime):
+            day = day.date() if not pd.isna(day) else None
+        elif day is not None and not isinstance(day, date):
+            day = _as_days([day])[0]
+            day = None if np.isnat(day) else day.item()
+        if day is None:
+            return DAY_TYPES[HARI_BIASA]
+        if day.year not in self._years:
+            self._warn_uncovered([day.year])
+        if (self._state_row(state), day) in self._holidays:
+            return DAY_TYPES[CUTI_UMUM]
+        return DAY_TYPES[HUJUNG_MINGGU if day.weekday() == 6 else HARI_BIASA]
+
+
+def _state_of(value):
+    """State code for a state code or a Site ID (None when unknown)."""
+    if value is None:
+        return None
+    text = str(value).strip().upper()
+    if text.endswith(".0"):
+        text = text[:-2]
+    return text if text in STATES else SITE_STATES.get(text)
+
+
+@lru_cache(maxsize=1)
+def default_calendar():
+    """The configured calendar, loaded once per process (Sunday rule only if the file is missing)."""
+    if not Path(HOLIDAY_FILE).exists():
+        print(f"Warning: Holiday list not found ({HOLIDAY_FILE}); public holidays will not be marked as Cuti Umum.")
+        return HolidayCalendar({})
+    return HolidayCalendar.load(HOLIDAY_FILE)
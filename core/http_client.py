@@ -0,0 +1,62 @@
+# core/http_client.py — pooled HTTP session for attachment URLs
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import HTTP_MAX_WORKERS
+
+USER_AGENT = "TNB-LKS-Automation"
+
+
+def pooled_session(pool_size=HTTP_MAX_WORKERS):
+    """
+    requests.Session keeping up to `pool_size` keep-alive connections per host.
+
+    Share one session between the worker threads of a stage so the
+    attachment host's connections are reused instead of reopened per URL.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+def fetch_head(session, url, size, timeout):
+    """
+    The first `size` bytes of `url` (fewer if the body is shorter).
+
+    Asks for a byte range; servers that ignore it and send the whole body
+    are read only up to `size` before the connection is released.
+    """
+    headers = {"Range": f"bytes=0-{size - 1}"}
+    with session.get(url, headers=headers, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        data = bytearray()
+        for block in response.iter_content(chunk_size=16 * 1024):
+            data += block
+            if len(data) >= size:
+                break
+        return bytes(data[:size])
+
+
+def fetch_body(session, url, timeout):
+    """Whole body of `url`."""
+    response = session.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.content
+
+
+def fetch_status(session, url, timeout):
+    """
+    HTTP status of `url` (redirects followed) without downloading its body.
+
+    Tries HEAD first; hosts that refuse it (signed storage URLs answer 403,
+    some servers 405/501) get a one-byte ranged GET instead.
+    """
+    response = session.head(url, timeout=timeout, allow_redirects=True)
+    response.close()
+    if response.status_code not in (403, 405, 501):
+        return response.status_code
+    with session.get(url, headers={"Range": "bytes=0-0"}, timeout=timeout, stream=True) as response:
+        return response.status_code
@@ -0,0 +1,71 @@
+# core/process_pool.py — worker processes for CPU-bound stages
+"""
+Process pools shared by the services (RAW parsing, stamp OCR, photo
+hashing).
+
+On Windows worker processes are spawned and re-import the app (pandas,
+openpyxl, Pillow) before their first job, so a pool is worth starting
+only once per stage: `run_parallel` is for one-shot job lists, `StagePool`
+keeps one pool open across the batches of a stage. Both fall back to
+running the jobs in this process when worker processes cannot be started.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from config import BATCH_MAX_WORKERS
+
+
+def run_parallel(func, arg_lists, max_workers=BATCH_MAX_WORKERS):
+    """
+    [func(*args) for args in arg_lists], spread over a process pool.
+
+    Falls back to this process for a single job or when worker processes
+    cannot be started.
+    """
+    arg_lists = list(arg_lists)
+    with StagePool(min(len(arg_lists), max_workers or os.cpu_count() or 1)) as pool:
+        return pool.map(func, arg_lists)
+
+
+class StagePool:
+    """
+    One process pool for a whole stage, fed batch by batch:
+
+        with StagePool(workers) as pool:
+            for batch in batches:
+                results = pool.map(func, [(arg, ...) for ... in batch])
+
+    The pool is started by the first batch with more than one job and
+    reused by the following ones; after a failure to start (or a crashed
+    worker) the remaining batches run in this process.
+    """
+
+    def __init__(self, max_workers=BATCH_MAX_WORKERS):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = None
+        self._broken = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def map(self, func, arg_lists):
+        """[func(*args) for args in arg_lists], in order."""
+        arg_lists = list(arg_lists)
+        if len(arg_lists) > 1 and self.max_workers > 1 and not self._broken:
+            try:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                return list(self._executor.map(func, *zip(*arg_lists)))
+            except (BrokenProcessPool, OSError):
+                self._broken = True
+                self.close()
+        return [func(*args) for args in arg_lists]
@@ -0,0 +1,234 @@
+# core/raw_dataset.py — one parse of a RAW export, shared by the services
+import numpy as np
+import pandas as pd
+
+from core.so_utils import clean_so_column
+from core.raw_stream import iter_raw_chunks, read_raw, sheet_headers
+from config import (
+    CATEGORICAL_RAW, DATA_SHEET_NAME, HEADER_ROW, STREAM_CHUNK_SIZE,
+    COL_3MS_SO, COL_CONTRACT, COL_SO_STATUS, COL_USER_STATUS,
+    COL_ADDRESS, COL_VOLTAGE, COL_SO_TYPE, COL_SO_DESC,
+    COL_TECHNICIAN, COL_STATUS_DATE, COL_SITE_ID,
+    COL_OLD_METER, COL_NEW_METER, COL_NEW_COMM, COL_ATTACH_URL,
+)
+
+# Raw header variants -> canonical config names (exact match).
+# Note: Preprocessor converts headers to UPPERCASE.
+COLUMN_ALIASES = {
+    "3MS SO No.": COL_3MS_SO, "3MS SO No": COL_3MS_SO, "SO Number": COL_3MS_SO, "3MS SO NO.": COL_3MS_SO,
+    "Contract Account": COL_CONTRACT, "CONTRACT ACCOUNT": COL_CONTRACT,
+    "SO Status": COL_SO_STATUS, "SO STATUS": COL_SO_STATUS,
+    "User Status": COL_USER_STATUS, "USER STATUS": COL_USER_STATUS,
+    "Address": COL_ADDRESS, "ADDRESS": COL_ADDRESS,
+    "Voltage": COL_VOLTAGE, "VOLTAGE": COL_VOLTAGE,
+    "SO Type": COL_SO_TYPE, "SO TYPE": COL_SO_TYPE,
+    "SO Description": COL_SO_DESC, "SO DESCRIPTION": COL_SO_DESC,
+    "Technician": COL_TECHNICIAN, "TECHNICIAN": COL_TECHNICIAN,
+    "Status Date": COL_STATUS_DATE, "STATUS DATE": COL_STATUS_DATE,
+    "Site ID": COL_SITE_ID, "SITE ID": COL_SITE_ID,
+    "Old Meter no": COL_OLD_METER, "Old Meter No": COL_OLD_METER, "OLD METER NO": COL_OLD_METER,
+    "New Meter no": COL_NEW_METER, "New Meter No": COL_NEW_METER, "NEW METER NO": COL_NEW_METER,
+    "Mew Meter no": COL_NEW_METER, "Mew Meter No": COL_NEW_METER, "MEW METER NO": COL_NEW_METER,
+    "Ew Meter no": COL_NEW_METER, "Ew Meter No": COL_NEW_METER, "EW METER NO": COL_NEW_METER,
+    "New Comm Module": COL_NEW_COMM, "NEW COMM MODULE": COL_NEW_COMM,
+}
+
+# Stripped + upper-cased header variants for the SO and attachment URL columns
+SO_HEADERS = ("3MS SO NO.", "3MS SO NO", "SO NUMBER", COL_3MS_SO.upper())
+URL_HEADERS = ("ATTACHMENTS URL", "ATTACHMENT URL", "ATTACHMENT_URL", COL_ATTACH_URL.upper())
+
+CANONICAL_COLUMNS = frozenset(COLUMN_ALIASES.values()) | {COL_ATTACH_URL}
+
+# Low-cardinality columns held as pandas categoricals (int codes + one string
+# per distinct value) instead of one Python string per cell.
+CATEGORY_COLUMNS = (COL_TECHNICIAN, COL_SITE_ID, COL_SO_STATUS, COL_USER_STATUS, COL_VOLTAGE, COL_SO_TYPE)
+
+
+def canonical_column(name):
+    """Config column name for a RAW header, or None if no service uses it."""
+    if name in COLUMN_ALIASES:
+        return COLUMN_ALIASES[name]
+    if name in CANONICAL_COLUMNS:
+        return name
+    key = str(name).strip().upper()
+    if key in SO_HEADERS:
+        return COL_3MS_SO
+    if key in URL_HEADERS:
+        return COL_ATTACH_URL
+    return None
+
+
+def is_raw_column(name):
+    """Column projection for the RAW reader."""
+    return canonical_column(name) is not None
+
+
+def normalize_columns(df):
+    """Renames recognised headers to config names; unknown and repeated ones are dropped."""
+    keep, names = [], []
+    for position, column in enumerate(df.columns):
+        name = canonical_column(column)
+        if name is None or name in names:
+            continue
+        keep.append(position)
+        names.append(name)
+    df = df.iloc[:, keep]
+    df.columns = names
+    return df
+
+
+def is_category_column(name):
+    """RAW headers whose cells the reader interns (see CATEGORY_COLUMNS)."""
+    return CATEGORICAL_RAW and canonical_column(name) in CATEGORY_COLUMNS
+
+
+def encode_categories(df):
+    """Stores the CATEGORY_COLUMNS present in `df` as categoricals (missing cells stay NaN)."""
+    if not CATEGORICAL_RAW:
+        return df
+    for name in CATEGORY_COLUMNS:
+        if name in df.columns and not isinstance(df[name].dtype, pd.CategoricalDtype):
+            df[name] = df[name].astype("category")
+    return df
+
+
+def data_sheets(data_path):
+    """Names of the worksheets whose header row has an SO column (workbook order)."""
+    return [
+        name for name, header in sheet_headers(data_path, HEADER_ROW)
+        if any(value is not None and canonical_column(value) == COL_3MS_SO for value in header)
+    ]
+
+
+class RawDataset:
+    """
+    RAW export parsed once per run.
+
+    Holds the normalized columns (`frame`, missing cells as NaN,
+    CATEGORY_COLUMNS as categoricals), the forward-filled SO column used
+    for attachment rows (`so_filled`) and a per-SO row index (`so_codes`
+    into `so_keys`). ClaimService and ImageInjector both read from it, so
+    each input file is parsed once.
+    """
+
+    def __init__(self, frame, source=None, sheet_name=None, so_carry=None):
+        self.frame = frame
+        self.source = source
+        self.sheet_name = sheet_name
+        self._so_carry = so_carry
+        self._so_filled = None
+        self._so_index = None
+
+    @classmethod
+    def load(cls, data_path, sheet_name=None, columns=None):
+        """Parses the RAW sheet; `columns` (config names) limits it to those columns."""
+        target_sheet = sheet_name if sheet_name else DATA_SHEET_NAME
+        usecols = is_raw_column if columns is None else (lambda name: canonical_column(name) in columns)
+        df = normalize_columns(
+            read_raw(data_path, target_sheet, header_row=HEADER_ROW, usecols=usecols, intern=is_category_column)
+        )
+        if columns is not None:
+            df = df[[name for name in df.columns if name in columns]]
+        return cls(encode_categories(df), source=data_path, sheet_name=target_sheet)
+
+    @classmethod
+    def iter_chunks(cls, data_path, sheet_name=None, chunk_size=STREAM_CHUNK_SIZE):
+        """Bounded-memory variant of load: consecutive slices, SO fill carried across."""
+        target_sheet = sheet_name if sheet_name else DATA_SHEET_NAME
+        carry = None
+        chunks = iter_raw_chunks(
+            data_path, target_sheet, HEADER_ROW, chunk_size, usecols=is_raw_column, intern=is_category_column
+        )
+        for chunk in chunks:
+            dataset = cls(
+                encode_categories(normalize_columns(chunk)), source=data_path, sheet_name=target_sheet, so_carry=carry
+            )
+            yield dataset
+            carry = dataset.last_so
+
+    @classmethod
+    def coerce(cls, source, sheet_name=None):
+        """Accepts a RawDataset or a path (parsed on the spot)."""
+        if isinstance(source, RawDataset):
+            return source
+        return cls.load(source, sheet_name)
+
+    def __len__(self):
+        return len(self.frame.index)
+
+    def column(self, name):
+        """Column values as an object array ("" when the column is absent)."""
+        if name not in self.frame.columns:
+            return np.full(len(self), "", dtype=object)
+        return self.frame[name].to_numpy(dtype=object)
+
+    @property
+    def so_filled(self):
+        """SO column with blank cells forward filled (attachment continuation rows)."""
+        if self._so_filled is None:
+            values = pd.Series(self.column(COL_3MS_SO), dtype=object)
+            values = values.mask(values.isna() | (values == ""))
+            if len(values) and pd.isna(values.iloc[0]) and self._so_carry is not None:
+                values.iloc[0] = self._so_carry
+            self._so_filled = values.ffill().to_numpy(dtype=object)
+        return self._so_filled
+
+    @property
+    def last_so(self):
+        filled = self.so_filled
+        for value in filled[::-1]:
+            if not pd.isna(value):
+                return value
+        return self._so_carry
+
+    def _build_so_index(self):
+        raw_codes, raw_uniques = pd.factorize(pd.Series(self.so_filled, dtype=object))
+        cleaned = clean_so_column(raw_uniques)
+        clean_codes, keys = pd.factorize(pd.Series(cleaned, dtype=object))
+        keys = np.asarray(keys, dtype=object)
+
+        lookup = clean_codes.copy()
+        blank = np.flatnonzero(keys == "")
+        if len(blank):
+            lookup[clean_codes == blank[0]] = -1
+        lookup = np.append(lookup, -1)               # raw code -1 (no SO yet)
+        self._so_index = (lookup[raw_codes], keys)
+
+    @property
+    def so_codes(self):
+        """Per-row index into so_keys (-1 where the row has no SO)."""
+        if self._so_index is None:
+            self._build_so_index()
+        return self._so_index[0]
+
+    @property
+    def so_keys(self):
+        """Cleaned SO numbers in first-appearance order ("" never used)."""
+        if self._so_index is None:
+            self._build_so_index()
+        return self._so_index[1]
+
+    def rows_for(self, so):
+        """Row positions belonging to an SO (continuation rows included)."""
+        matches = np.flatnonzero(self.so_keys == so)
+        if not len(matches):
+            return np.array([], dtype=np.intp)
+        return np.flatnonzero(self.so_codes == matches[0])
+
+    def url_rows(self):
+        """(SOs, URLs) object arrays of the rows with an attachment URL, in row order."""
+        if COL_3MS_SO not in self.frame.columns or COL_ATTACH_URL not in self.frame.columns:
+            # Debugging check
+            print(f"Warning: Columns not found. Available: {self.frame.columns.tolist()}")
+            empty = np.array([], dtype=object)
+            return empty, empty
+        urls = pd.Series(self.column(COL_ATTACH_URL), dtype=object)
+        present = urls.notna().to_numpy()
+        urls = urls[present].astype(str).str.strip().to_numpy(dtype=object)
+        codes = self.so_codes[present]
+        keep = (codes >= 0) & (urls != "")
+        return self.so_keys[codes[keep]], urls[keep]
+
+    def url_entries(self):
+        """Yields (so, url) for every row with an attachment URL, in row order."""
+        yield from zip(*self.url_rows())
@@ -0,0 +1,175 @@
+# core/raw_stream.py — bounded-memory RAW workbook reader
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from config import HEADER_ROW, STREAM_CHUNK_SIZE, STREAM_MIN_ROWS, STREAM_MIN_FILE_MB, FAST_XLSX_READER
+
+# pandas' default `na_values` for read_excel — kept identical so streamed
+# chunks hold exactly what `pd.read_excel(dtype=str)` would.
+NA_STRINGS = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+    "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+})
+
+
+def cell_text(value):
+    """Converts an openpyxl cell value the way `read_excel(dtype=str)` does (NA -> None)."""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    elif isinstance(value, datetime):
+        return str(value)
+    text = str(value)
+    if text in NA_STRINGS:
+        return None
+    return text
+
+
+def header_names(values):
+    """Header row -> column names, with pandas' 'Unnamed: i' and '.1' de-duplication."""
+    names = []
+    seen = {}
+    for i, value in enumerate(values):
+        name = f"Unnamed: {i}" if value is None or value == "" else value
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _chunk_frame(records, columns):
+    frame = pd.DataFrame(records, columns=columns, dtype=object)
+    return frame.where(frame.notna(), float("nan"))
+
+
+def _open_sheet(workbook, sheet_name):
+    if sheet_name is None or sheet_name == 0:
+        return workbook.worksheets[0]
+    return workbook[sheet_name]
+
+
+def use_fast_reader(data_path):
+    """True when core.xlsx_reader can replace pandas/openpyxl for this file."""
+    return FAST_XLSX_READER and Path(data_path).suffix.lower() in (".xlsx", ".xlsm")
+
+
+def read_raw(data_path, sheet_name=None, header_row=HEADER_ROW, usecols=None, intern=None):
+    """
+    Reads the RAW sheet like `pd.read_excel(dtype=str)`.
+
+    With the fast reader only the `usecols` columns (names or a callable)
+    are parsed, and the `intern` columns share one string per distinct
+    value; otherwise every column is returned as pandas reads it.
+    """
+    if use_fast_reader(data_path):
+        from core.xlsx_reader import read_xlsx
+        return read_xlsx(data_path, sheet_name, header_row=header_row, usecols=usecols, intern=intern)
+
+    df = pd.read_excel(data_path, sheet_name=sheet_name, header=header_row - 1, dtype=str)
+    # Handle case where sheet_name=None returns a dict of all sheets
+    if isinstance(df, dict):
+        # Use the first sheet found
+        df = list(df.values())[0]
+    return df
+
+
+def iter_raw_chunks(
+    data_path, sheet_name=None, header_row=HEADER_ROW, chunk_size=STREAM_CHUNK_SIZE, usecols=None, intern=None
+):
+    """
+    Yields the RAW sheet as DataFrames of at most `chunk_size` rows.
+
+    Cells are converted like `pd.read_excel(dtype=str)` (strings, NaN for
+    empty), so chunk consumers see the same values as the in-memory path.
+    Only one chunk of rows is alive at a time.
+    """
+    if use_fast_reader(data_path):
+        from core.xlsx_reader import iter_xlsx_chunks
+        yield from iter_xlsx_chunks(data_path, sheet_name, header_row, usecols, chunk_size, intern)
+        return
+
+    workbook = load_workbook(data_path, read_only=True, data_only=True)
+    try:
+        worksheet = _open_sheet(workbook, sheet_name)
+        rows = worksheet.iter_rows(min_row=header_row, values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = list(header)
+        while header and header[-1] is None:
+            header.pop()
+        columns = header_names(header)
+        width = len(columns)
+
+        records = []
+        for values in rows:
+            record = [cell_text(v) for v in values[:width]]
+            if len(record) < width:
+                record.extend([None] * (width - len(record)))
+            records.append(record)
+            if len(records) >= chunk_size:
+                yield _chunk_frame(records, columns)
+                records = []
+        if records:
+            # Trailing empty rows are dropped, as read_excel does
+            while records and all(v is None for v in records[-1]):
+                records.pop()
+            if records:
+                yield _chunk_frame(records, columns)
+    finally:
+        workbook.close()
+
+
+def sheet_headers(data_path, header_row=HEADER_ROW):
+    """[(sheet name, header row values)] for every worksheet, in workbook order (no data rows read)."""
+    if Path(data_path).suffix.lower() not in (".xlsx", ".xlsm"):
+        return []
+    if use_fast_reader(data_path):
+        from core.xlsx_reader import XlsxReader
+        with XlsxReader(data_path) as reader:
+            headers = []
+            for name, _ in reader.sheets:
+                rows = reader.iter_rows(name, min_row=header_row)
+                _, values = next(rows, (None, {}))
+                rows.close()
+                headers.append((name, [values.get(i) for i in range(1, max(values, default=0) + 1)]))
+            return headers
+
+    workbook = load_workbook(data_path, read_only=True, data_only=True)
+    try:
+        headers = []
+        for worksheet in workbook.worksheets:
+            values = next(worksheet.iter_rows(min_row=header_row, max_row=header_row, values_only=True), ())
+            headers.append((worksheet.title, list(values)))
+        return headers
+    finally:
+        workbook.close()
+
+
+def estimate_rows(data_path, sheet_name=None):
+    """Row count from the sheet dimension (no cell parsing)."""
+    workbook = load_workbook(data_path, read_only=True)
+    try:
+        return _open_sheet(workbook, sheet_name).max_row or 0
+    finally:
+        workbook.close()
+
+
+def should_stream(data_path, sheet_name=None):
+    """True when the RAW file is large enough for the bounded-memory path."""
+    data_path = Path(data_path)
+    if data_path.suffix.lower() not in (".xlsx", ".xlsm"):
+        return False
+    if data_path.stat().st_size >= STREAM_MIN_FILE_MB * 1024 * 1024:
+        return True
+    try:
+        return estimate_rows(data_path, sheet_name) >= STREAM_MIN_ROWS
+    except Exception:
+        return False
@@ -1,78 +1,286 @@
+import hashlib
+import numpy as np
 import pandas as pd
 from datetime import datetime
-from pathlib import Path
 from collections import Counter
 
-from core.so_utils import clean_so
+from core.so_utils import clean_so_column
+from core.raw_dataset import COLUMN_ALIASES, RawDataset
 from core.services.date_engine import DateEngine
+from core.services.image_injector import IMAGE_COLUMNS
 from config import (
-    DATA_SHEET_NAME, HEADER_ROW,
     COL_3MS_SO, COL_CONTRACT, COL_SO_STATUS, COL_USER_STATUS,
     COL_ADDRESS, COL_VOLTAGE, COL_SO_TYPE, COL_SO_DESC,
     COL_TECHNICIAN, COL_STATUS_DATE, COL_SITE_ID,
-    COL_OLD_METER, COL_NEW_METER, COL_NEW_COMM
+    COL_OLD_METER, COL_NEW_METER, COL_NEW_COMM,
+    STREAM_CHUNK_SIZE,
 )
 
 # Helpers
 
+BUSINESS_AREAS = {
+    "6340": "Johor Bahru",
+    "6342": "Kulai Jaya",
+    "6346": "Johor Jaya",
+    "6410": "Kota Bharu",
+}
+
+# First-row fields carried per SO group (everything build_rows writes).
+GROUP_FIELDS = (
+    COL_CONTRACT, COL_SO_STATUS, COL_ADDRESS, COL_VOLTAGE, COL_SO_TYPE, COL_SO_DESC,
+    COL_TECHNICIAN, COL_STATUS_DATE, COL_SITE_ID, COL_OLD_METER, COL_NEW_METER, COL_NEW_COMM,
+)
+
+_MIN_SORT_KEY = np.datetime64(datetime.min, "us")
+
+# CLAIM sheet column of each field write_row writes
+CLAIM_COLUMNS = {
+    "Service Order": 2, "Account Number": 3, "Status": 4, "Address": 5,
+    "Voltage": 6, "SO Description": 7, "Labor": 8, "Status Date": 9,
+    "Site": 10, "Business Area": 11, "Old Device No": 12, "New Device No": 13,
+    "Comm Module No": 14, "Hari Field": 15, "Jenis Kerja": 16,
+    "Remarks 1": 17, "Remarks 2": 18,
+}
+TEXT_FIELDS = frozenset({"Service Order", "Account Number", "Site", "Old Device No", "New Device No", "Comm Module No"})
+
+
+
+class ClaimRow:
+    """
+    One CLAIM row, holding only the fields write_row puts in the sheet.
+
+    Slotted to keep large runs small (no per-row dict). Fields are read by
+    attribute or by CLAIM header name (`row["Service Order"]`, `row.get`).
+    """
+    __slots__ = (
+        "so", "account", "status", "address", "voltage", "so_description", "labor",
+        "status_date", "site", "business_area", "old_device", "new_device", "comm_module",
+        "hari", "remarks_1", "remarks_2",
+    )
+
+    jenis_kerja = "KERJA BIASA"   # same for every row
+
+    # CLAIM header -> attribute
+    FIELDS = {
+        "Service Order": "so", "Account Number": "account", "Status": "status", "Address": "address",
+        "Voltage": "voltage", "SO Description": "so_description", "Labor": "labor",
+        "Status Date": "status_date", "Site": "site", "Business Area": "business_area",
+        "Old Device No": "old_device", "New Device No": "new_device", "Comm Module No": "comm_module",
+        "Hari Field": "hari", "Jenis Kerja": "jenis_kerja", "Remarks 1": "remarks_1", "Remarks 2": "remarks_2",
+    }
+
+    def __init__(self, so, account, status, address, voltage, so_description, labor, status_date,
+                 site, business_area, old_device, new_device, comm_module, hari, remarks_1, remarks_2):
+        self.so = so
+        self.account = account
+        self.status = status
+        self.address = address
+        self.voltage = voltage
+        self.so_description = so_description
+        self.labor = labor
+        self.status_date = status_date
+        self.site = site
+        self.business_area = business_area
+        self.old_device = old_device
+        self.new_device = new_device
+        self.comm_module = comm_module
+        self.hari = hari
+        self.remarks_1 = remarks_1
+        self.remarks_2 = remarks_2
+
+    def __getitem__(self, field):
+        return getattr(self, self.FIELDS[field])
+
+    def get(self, field, default=None):
+        attr = self.FIELDS.get(field)
+        return default if attr is None else getattr(self, attr)
+
+    def as_dict(self):
+        return {field: getattr(self, attr) for field, attr in self.FIELDS.items()}
+
+    def __eq__(self, other):
+        if not isinstance(other, ClaimRow):
+            return NotImplemented
+        return all(getattr(self, attr) == getattr(other, attr) for attr in self.__slots__)
+
+    def __repr__(self):
+        return f"ClaimRow(so={self.so!r}, status_date={self.status_date!r})"
+
+
+# (ClaimRow attribute, CLAIM column, written as text) in CLAIM_COLUMNS order
+_WRITE_PLAN = tuple((ClaimRow.FIELDS[field], col, field in TEXT_FIELDS) for field, col in CLAIM_COLUMNS.items())
+
+
+def content_hash(values):
+    """Stable hash of cell values; blanks (None, "", NaN) compare equal, as they read back from a saved workbook."""
+    parts = []
+    for value in values:
+        if value is None or value != value:
+            value = ""
+        elif isinstance(value, datetime):
+            value = value.isoformat(sep=" ")
+        parts.append(str(value))
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _text_blank(values) -> np.ndarray:
+    """Vector form of `not str(v).strip()` (missing cells read as "nan")."""
+    s = pd.Series(values, dtype=object)
+    return s.where(s.notna(), "nan").astype(str).str.strip().eq("").to_numpy(dtype=bool)
+
+
+def _column(df, name):
+    """Column values as an object array ("" when the column is absent)."""
+    if name not in df.columns:
+        return np.full(len(df.index), "", dtype=object)
+    return df[name].to_numpy(dtype=object)
+
+
+def _take(df, name, positions):
+    """Rows `positions` of a column as a fresh Series; categoricals stay encoded until finalize_groups."""
+    if name not in df.columns:
+        return pd.Series(np.full(len(positions), "", dtype=object), dtype=object)
+    values = df[name]
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        return pd.Series(values.to_numpy(dtype=object)[positions], dtype=object)
+    codes = values.cat.codes.to_numpy()[positions]
+    return pd.Series(pd.Categorical.from_codes(codes, dtype=values.dtype))
+
+
+def _contains_tras(values) -> np.ndarray:
+    """Rows whose User Status contains TRAS (missing cells never do); categoricals test each category once."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        per_category = np.asarray(values.cat.categories.astype(str).str.upper().str.contains("TRAS"), dtype=bool)
+        codes = values.cat.codes.to_numpy()
+        return np.append(per_category, False)[codes]
+    return values.astype(str).str.upper().str.contains("TRAS").to_numpy(dtype=bool, na_value=False)
 
-def get_business_area(site_id):
-    s = str(site_id).strip()
-    if s == "6340": return "Johor Bahru"
-    if s == "6342": return "Kulai Jaya"
-    if s == "6346": return "Johor Jaya"
-    if s == "6410": return "Kota Bharu"
-    return ""
 
 class ClaimService:
     @staticmethod
-    def build_rows(data_path, sheet_name=None):
-        """Reads RAW data and returns processed rows + stats."""
-        data_path = Path(data_path)
-        
-        # Load Data
-        target_sheet = sheet_name if sheet_name else DATA_SHEET_NAME
-        
-        df = pd.read_excel(
-            data_path, 
-            sheet_name=target_sheet, 
-            header=HEADER_ROW - 1, 
-            dtype=str
-        )
-        
-        # Handle case where sheet_name=None returns a dict of all sheets
-        if isinstance(df, dict):
-            # Use the first sheet found
-            df = list(df.values())[0]
-
-        # Normalize Columns
-        # Note: Preprocessor converts headers to UPPERCASE.
-        df = df.rename(columns={
-            "3MS SO No.": COL_3MS_SO, "3MS SO No": COL_3MS_SO, "SO Number": COL_3MS_SO, "3MS SO NO.": COL_3MS_SO,
-            "Contract Account": COL_CONTRACT, "CONTRACT ACCOUNT": COL_CONTRACT,
-            "SO Status": COL_SO_STATUS, "SO STATUS": COL_SO_STATUS,
-            "User Status": COL_USER_STATUS, "USER STATUS": COL_USER_STATUS,
-            "Address": COL_ADDRESS, "ADDRESS": COL_ADDRESS,
-            "Voltage": COL_VOLTAGE, "VOLTAGE": COL_VOLTAGE,
-            "SO Type": COL_SO_TYPE, "SO TYPE": COL_SO_TYPE,
-            "SO Description": COL_SO_DESC, "SO DESCRIPTION": COL_SO_DESC,
-            "Technician": COL_TECHNICIAN, "TECHNICIAN": COL_TECHNICIAN,
-            "Status Date": COL_STATUS_DATE, "STATUS DATE": COL_STATUS_DATE,
-            "Site ID": COL_SITE_ID, "SITE ID": COL_SITE_ID,
-            "Old Meter no": COL_OLD_METER, "Old Meter No": COL_OLD_METER, "OLD METER NO": COL_OLD_METER,
-            "New Meter no": COL_NEW_METER, "New Meter No": COL_NEW_METER, "NEW METER NO": COL_NEW_METER,
-            "Mew Meter no": COL_NEW_METER, "Mew Meter No": COL_NEW_METER, "MEW METER NO": COL_NEW_METER,
-            "Ew Meter no": COL_NEW_METER, "Ew Meter No": COL_NEW_METER, "EW METER NO": COL_NEW_METER,
-            "New Comm Module": COL_NEW_COMM, "NEW COMM MODULE": COL_NEW_COMM,
-        })
+    def prepare_frame(df):
+        """Canonical column names + drops rows without an SO value."""
+        df = df.rename(columns=COLUMN_ALIASES)
 
         if COL_3MS_SO not in df.columns:
             # Debugging helper: Identify close matches or print all
             raise KeyError(f"Missing '{COL_3MS_SO}' in RAW DATA. Available columns: {list(df.columns)}")
 
-        df = df[df[COL_3MS_SO].astype(str).str.strip() != ""]
-        if df.empty: raise ValueError("RAW DATA has no valid SO rows.")
+        return df[df[COL_3MS_SO].astype(str).str.strip() != ""]
+
+    @staticmethod
+    def group_dataset(dataset):
+        """group_frame over a RawDataset (or one streamed chunk of it)."""
+        return ClaimService.group_frame(ClaimService.prepare_frame(dataset.frame))
+
+    @staticmethod
+    def build_rows(source, sheet_name=None):
+        """Reads RAW data (path or RawDataset) and returns processed rows + stats."""
+        dataset = RawDataset.coerce(source, sheet_name)
+        groups = ClaimService.group_dataset(dataset)
+        if groups.empty: raise ValueError("RAW DATA has no valid SO rows.")
+        return ClaimService.finalize_groups(groups)
+
+    @staticmethod
+    def build_rows_streaming(data_path, sheet_name=None, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Same result as build_rows, reading the RAW sheet in chunks.
+
+        Each chunk is reduced to one record per SO key and the partial
+        groups are merged at the end, so memory follows the SO count and
+        chunk size rather than the size of the sheet.
+        """
+        parts = (
+            ClaimService.group_dataset(chunk)
+            for chunk in RawDataset.iter_chunks(data_path, sheet_name, chunk_size)
+        )
+        groups = ClaimService.combine_groups(parts)
+        if groups.empty: raise ValueError("RAW DATA has no valid SO rows.")
+        return ClaimService.finalize_groups(groups)
+
+    @staticmethod
+    def group_frame(df):
+        """
+        Collapses RAW rows into one record per SO key (first-appearance order).
+
+        Columns: so_key, rows (group size), has_tras, first_date (first
+        parseable status date in the group), the first row's GROUP_FIELDS and
+        its status date parsed (status_parsed: datetime or None, status_ns:
+        datetime64 with NaT), so finalize_groups does not parse it again.
+        Missing SO cells are dropped, matching groupby's default.
+        """
+        df = df[df[COL_3MS_SO].notna()]
+        codes, keys = pd.factorize(df[COL_3MS_SO], sort=False)
+        n_groups = len(keys)
+
+        sizes = np.bincount(codes, minlength=n_groups)
+        _, first_idx = np.unique(codes, return_index=True)
+
+        if COL_USER_STATUS in df.columns:
+            tras_rows = _contains_tras(df[COL_USER_STATUS])
+            has_tras = np.bincount(codes, weights=tras_rows, minlength=n_groups) > 0
+        else:
+            has_tras = np.zeros(n_groups, dtype=bool)
+
+        # First parseable status date of each group (TRAS-by-date bucket)
+        parsed_obj, parsed_ns = DateEngine.parse_column(_column(df, COL_STATUS_DATE))
+        first_date = np.full(n_groups, None, dtype=object)
+        dated = ~np.isnat(parsed_ns)
+        dated_groups, dated_first = np.unique(codes[dated], return_index=True)
+        first_date[dated_groups] = parsed_obj[np.flatnonzero(dated)[dated_first]]
+
+        groups = {
+            "so_key": pd.Series(np.asarray(keys, dtype=object), dtype=object),
+            "rows": pd.Series(sizes),
+            "has_tras": pd.Series(has_tras),
+            "first_date": pd.Series(first_date, dtype=object),
+            "status_parsed": pd.Series(parsed_obj[first_idx], dtype=object),
+            "status_ns": pd.Series(parsed_ns[first_idx]),
+        }
+        for field in GROUP_FIELDS:
+            groups[field] = _take(df, field, first_idx)
+        return pd.DataFrame(groups)
+
+    @staticmethod
+    def combine_groups(parts):
+        """Merges group_frame results of consecutive RAW slices (order preserved)."""
+        parts = [p for p in parts if not p.empty]
+        if not parts:
+            return ClaimService.group_frame(pd.DataFrame({COL_3MS_SO: pd.Series([], dtype=object)}))
+        if len(parts) == 1:
+            return parts[0]
+
+        merged = pd.concat(parts, ignore_index=True)
+        codes, keys = pd.factorize(merged["so_key"], sort=False)
+        n_groups = len(keys)
+        _, first_idx = np.unique(codes, return_index=True)
 
+        first_date = np.full(n_groups, None, dtype=object)
+        dates = merged["first_date"].to_numpy(dtype=object)
+        dated = np.flatnonzero([d is not None for d in dates])
+        dated_groups, dated_first = np.unique(codes[dated], return_index=True)
+        first_date[dated_groups] = dates[dated[dated_first]]
+
+        groups = {
+            "so_key": pd.Series(np.asarray(keys, dtype=object), dtype=object),
+            "rows": pd.Series(np.bincount(codes, weights=merged["rows"], minlength=n_groups).astype(np.int64)),
+            "has_tras": pd.Series(np.bincount(codes, weights=merged["has_tras"], minlength=n_groups) > 0),
+            "first_date": pd.Series(first_date, dtype=object),
+            "status_parsed": pd.Series(merged["status_parsed"].to_numpy(dtype=object)[first_idx], dtype=object),
+            "status_ns": pd.Series(merged["status_ns"].to_numpy()[first_idx]),
+        }
+        for field in GROUP_FIELDS:
+            groups[field] = _take(merged, field, first_idx)
+        return pd.DataFrame(groups)
+
+    @staticmethod
+    def _screen(groups):
+        """
+        SO cleanup, TRAS and duplicate rules over grouped RAW data.
+
+        Returns (cleaned SOs, indices of the groups kept, their parsed status
+        dates as (objects, datetime64), their raw status values, stats).
+        """
         stats = {
             "total_sos_raw": 0, "tras_removed": 0, "duplicates_skipped": 0,
             "sos_after_tras": 0, "invalid_dates": 0, "missing_address": 0,
@@ -80,99 +288,40 @@ class ClaimService:
             "duplicate_counts": {}
         }
 
-        so_groups = []
-
-        for so, subdf in df.groupby(COL_3MS_SO, sort=False):
-            so_clean = clean_so(so)
-            if not so_clean:
-                continue
-            stats["total_sos_raw"] += 1
-
-            duplicate_count = max(len(subdf.index) - 1, 0)
-            if duplicate_count:
-                stats["duplicates_skipped"] += duplicate_count
-                stats["duplicate_groups"] += 1
-                stats["duplicate_sos"].append(so_clean)
-                stats["duplicate_counts"][so_clean] = duplicate_count + 1
-
-            if COL_USER_STATUS in subdf.columns:
-                if subdf[COL_USER_STATUS].astype(str).str.upper().str.contains("TRAS").any():
-                    stats["tras_removed"] += 1
-                    tras_date = None
-                    for _, tras_row in subdf.iterrows():
-                        tras_date = DateEngine.parse_date(tras_row.get(COL_STATUS_DATE, "") or "")
-                        if tras_date:
-                            break
-                    if tras_date:
-                        stats["tras_by_date"][tras_date] += 1
-                    else:
-                        stats["tras_by_date"]["Unknown date"] += 1
-                    continue
-            
-            # Use first row of the group
-            row0 = subdf.iloc[0]
-            
-            raw_status = row0.get(COL_STATUS_DATE, "") or ""
-            # Parse date using DateEngine
-            # We want to keep the full datetime object for writing to Excel later
-            date_obj = DateEngine.parse_datetime(raw_status)
-            status_str = str(raw_status) # Keep original just in case, or for debug
-            
-            # If we successfully parsed a datetime, we can format it for display in logs if needed
-            # but for the "Status Date" field in the row, we should store the object.
-            
-            # date_obj is now a datetime object (or None)
-            
-            if not date_obj and str(raw_status).strip():
-                stats["invalid_dates"] += 1
-            if not str(row0.get(COL_ADDRESS, "") or "").strip():
-                stats["missing_address"] += 1
-
-            so_groups.append({
-                "so": so_clean,
-                "row0": row0,
-                "status_val": date_obj if date_obj else raw_status, # Store object or raw string
-                "date_obj": date_obj,
-                "site_id": row0.get(COL_SITE_ID, "") or ""
-            })
+        so_clean = clean_so_column(groups["so_key"])
+        valid = so_clean != ""
+        sizes = groups["rows"].to_numpy()
+        has_tras = groups["has_tras"].to_numpy(dtype=bool)
+        stats["total_sos_raw"] = int(valid.sum())
 
-        # Sort by datetime (date + time) from oldest to newest
-        so_groups.sort(key=lambda g: g["date_obj"] if g["date_obj"] else datetime.min)
-        stats["sos_after_tras"] = len(so_groups)
-
-        # Build Objects
-        rows = []
-        for i, g in enumerate(so_groups, 1):
-            r0 = g["row0"]
-            
-            # --- DATE LOGIC CORE ---
-            # Currently we don't have OCR dates in the builder flow, so ocr_date=None
-            # But the logic will still calculate Hari/TaskForce based on Status Date
-            logic = DateEngine.calculate(g["status_val"], ocr_date_str=None)
-            
-            rows.append({
-                "Qty": i,
-                "Service Order": g["so"],
-                "Account Number": r0.get(COL_CONTRACT, "") or "",
-                "Status": r0.get(COL_SO_STATUS, "") or "",
-                "Address": r0.get(COL_ADDRESS, "") or "",
-                "Voltage": r0.get(COL_VOLTAGE, "") or "",
-                "SO Description": r0.get(COL_SO_TYPE, "") or r0.get(COL_SO_DESC, "") or "",
-                "Labor": r0.get(COL_TECHNICIAN, "") or "",
-                "Status Date": g["status_val"],
-                "Site": g["site_id"],
-                "Business Area": get_business_area(g["site_id"]),
-                "Old Device No": r0.get(COL_OLD_METER, "") or "",
-                "New Device No": r0.get(COL_NEW_METER, "") or "",
-                "Comm Module No": r0.get(COL_NEW_COMM, "") or "",
-                
-                # Derived Fields
-                "Hari Field": logic["hari"],
-                "Jenis Kerja": "KERJA BIASA",
-                "Remarks 1": logic["remarks_1"],
-                "Remarks 2": logic["remarks_2"],
-            })
-        
+        # Duplicates (counted before TRAS removal)
+        dup_mask = valid & (sizes > 1)
+        stats["duplicates_skipped"] = int((sizes[dup_mask] - 1).sum())
+        stats["duplicate_groups"] = int(dup_mask.sum())
+        for so, count in zip(so_clean[dup_mask], sizes[dup_mask]):
+            stats["duplicate_sos"].append(so)
+            stats["duplicate_counts"][so] = int(count)
+
+        # TRAS
+        tras_mask = valid & has_tras
+        stats["tras_removed"] = int(tras_mask.sum())
+        for tras_dt in groups["first_date"].to_numpy(dtype=object)[tras_mask]:
+            stats["tras_by_date"][tras_dt.date() if tras_dt else "Unknown date"] += 1
+
+        keep = np.flatnonzero(valid & ~has_tras)
+        raw_status = groups[COL_STATUS_DATE].to_numpy(dtype=object)[keep]
+        date_obj = groups["status_parsed"].to_numpy(dtype=object)[keep]
+        date_ns = groups["status_ns"].to_numpy(dtype="datetime64[us]")[keep]
+
+        stats["invalid_dates"] = int((np.isnat(date_ns) & ~_text_blank(raw_status)).sum())
+        addresses = groups[COL_ADDRESS].to_numpy(dtype=object)[keep]
+        stats["missing_address"] = int(_text_blank([a or "" for a in addresses]).sum())
+        stats["sos_after_tras"] = len(keep)
+        return so_clean, keep, (date_obj, date_ns), raw_status, stats
+
+    @staticmethod
+    def _format_stats(stats):
+        """TRAS counts by display date (oldest first, unknown last) and sorted duplicate SOs."""
         formatted_tras_by_date: dict[str, int] = {}
         for tras_key, tras_count in sorted(
             stats["tras_by_date"].items(),
@@ -188,50 +337,144 @@ class ClaimService:
 
         stats["tras_by_date"] = formatted_tras_by_date
         stats["duplicate_sos"] = sorted(stats["duplicate_sos"])
-        return rows, stats
+        return stats
 
     @staticmethod
-    def write_data(handler, rows, start_claim=3, start_attach=3):
-        """Writes rows to Claim and Attachment sheets using ExcelHandler."""
+    def group_stats(groups):
+        """finalize_groups' stats alone, without building the claim rows."""
+        *_, stats = ClaimService._screen(groups)
+        return ClaimService._format_stats(stats)
+
+    @staticmethod
+    def finalize_groups(groups):
+        """Applies SO cleanup, TRAS/duplicate rules and the date sort to grouped RAW data."""
+        so_clean, keep, (date_obj, date_ns), raw_status, stats = ClaimService._screen(groups)
+
+        # Sort by datetime (date + time) from oldest to newest
+        order = np.argsort(np.where(np.isnat(date_ns), _MIN_SORT_KEY, date_ns), kind="stable")
+        keep = keep[order]
+        date_obj, date_ns = date_obj[order], date_ns[order]
+        raw_status = raw_status[order]
+
+        # Store object or raw string
+        status_vals = [d if d else raw for d, raw in zip(date_obj, raw_status)]
+
+        def field(name):
+            return groups[name].to_numpy(dtype=object)[keep]
+
+        so_type, so_desc = field(COL_SO_TYPE), field(COL_SO_DESC)
+        site_ids = field(COL_SITE_ID)
+        business_areas = (
+            pd.Series(site_ids, dtype=object).astype(str).str.strip()
+            .map(BUSINESS_AREAS).fillna("").to_numpy(dtype=object)
+        )
+
+        # --- DATE LOGIC CORE ---
+        # Currently we don't have OCR dates in the builder flow, so ocr_dates=None.
+        # Site IDs pick the state whose public holidays apply (config.SITE_STATES).
+        logic = DateEngine.calculate_batch(date_ns, states=site_ids)
+
+        rows = [
+            ClaimRow(
+                so, contract or "", status or "", address or "", voltage or "", t or desc or "",
+                labor or "", status_val, site or "", ba, old_dev or "", new_dev or "", comm or "",
+                # Derived Fields
+                hari, remarks_1, remarks_2,
+            )
+            for (so, contract, status, address, voltage, t, desc, labor, status_val,
+                 site, ba, old_dev, new_dev, comm, hari, remarks_1, remarks_2) in zip(
+                so_clean[keep], field(COL_CONTRACT), field(COL_SO_STATUS), field(COL_ADDRESS),
+                field(COL_VOLTAGE), so_type, so_desc, field(COL_TECHNICIAN), status_vals,
+                site_ids, business_areas, field(COL_OLD_METER), field(COL_NEW_METER),
+                field(COL_NEW_COMM), logic["hari"], logic["remarks_1"], logic["remarks_2"])
+        ]
+        return rows, ClaimService._format_stats(stats)
+
+    @staticmethod
+    def apply_override_dates(rows, override_dates):
+        """
+        Re-derives Hari / Remarks of `rows` with DateEngine's override date
+        (OCR / photo capture date) from `override_dates` ({so: date}).
+
+        Rows without an override keep their values. Returns how many rows
+        became diskon.
+        """
+        rows = [row for row in rows if override_dates.get(row.so)]
+        if not rows:
+            return 0
+        logic = DateEngine.calculate_batch(
+            np.asarray([row.status_date for row in rows], dtype=object),
+            np.asarray([override_dates[row.so] for row in rows], dtype=object),
+            states=[row.site for row in rows],
+        )
+        for row, hari, remarks_1, remarks_2 in zip(rows, logic["hari"], logic["remarks_1"], logic["remarks_2"]):
+            row.hari, row.remarks_1, row.remarks_2 = hari, remarks_1, remarks_2
+        return int(logic["is_diskon"].sum())
+
+    @staticmethod
+    def claim_values(row):
+        """Values write_row puts in the CLAIM columns (CLAIM_COLUMNS order)."""
+        values = []
+        for attr, _, is_text in _WRITE_PLAN:
+            val = getattr(row, attr)
+            if is_text:
+                val = "" if val is None else str(val)
+            values.append(val)
+        return values
+
+    @staticmethod
+    def row_hash(row, formulas):
+        """Content hash of a claim row as written: CLAIM values + ATTACHMENT image formulas."""
+        return content_hash([*ClaimService.claim_values(row), *formulas])
+
+    @staticmethod
+    def written_row_hash(handler, claim_row, attach_row):
+        """row_hash of a row already in the workbook (read back from its cells)."""
         wsC = handler.ws_claim
+        values = [wsC.cell(row=claim_row, column=col).value for col in CLAIM_COLUMNS.values()]
+        if attach_row:
+            wsA = handler.ws_attach
+            values += [wsA.cell(row=attach_row, column=col).value for col in IMAGE_COLUMNS]
+        else:
+            values += [None] * len(IMAGE_COLUMNS)
+        return content_hash(values)
+
+    @staticmethod
+    def write_row(handler, row, claim_row, attach_row):
+        """Writes one row's CLAIM cells and its ATTACHMENT SO / old meter cells."""
+        wsC = handler.ws_claim
+        for attr, col, is_text in _WRITE_PLAN:
+            val = getattr(row, attr)
+            cell = wsC.cell(row=claim_row, column=col)
+            if is_text:
+                cell.value = "" if val is None else str(val)
+                cell.number_format = "@"
+            elif attr == "status_date" and isinstance(val, (datetime, pd.Timestamp)):
+                 cell.value = val
+                 cell.number_format = "d mmm, yyyy, h:mm AM/PM"
+            else:
+                cell.value = val
+
+        if attach_row is None:
+            return
+
+        # Write Attachment (SO + Old Meter)
         wsA = handler.ws_attach
-        
-        # CLAIM SHEET MAP
-        col_map = {
-            "Service Order": 2, "Account Number": 3, "Status": 4, "Address": 5,
-            "Voltage": 6, "SO Description": 7, "Labor": 8, "Status Date": 9,
-            "Site": 10, "Business Area": 11, "Old Device No": 12, "New Device No": 13,
-            "Comm Module No": 14, "Hari Field": 15, "Jenis Kerja": 16,
-            "Remarks 1": 17, "Remarks 2": 18,
-        }
-        text_cols = {"Service Order", "Account Number", "Site", "Old Device No", "New Device No", "Comm Module No"}
+        so = row.so
+        old_dev = str(row.old_device).strip()
 
+        cSO = wsA.cell(row=attach_row, column=2)
+        cSO.value = so
+        cSO.number_format = "@"
+
+        cOld = wsA.cell(row=attach_row, column=3)
+        cOld.value = old_dev
+        cOld.number_format = "@"
+
+    @staticmethod
+    def write_data(handler, rows, start_claim=3, start_attach=3):
+        """Writes rows to Claim and Attachment sheets using ExcelHandler."""
         for i, row in enumerate(rows):
-            # Write Claim
-            rC = start_claim + i
-            for field, col in col_map.items():
-                val = row.get(field)
-                cell = wsC.cell(row=rC, column=col)
-                if field in text_cols:
-                    cell.value = "" if val is None else str(val)
-                    cell.number_format = "@"
-                elif field == "Status Date" and isinstance(val, (datetime, pd.Timestamp)):
-                     cell.value = val
-                     cell.number_format = "d mmm, yyyy, h:mm AM/PM"
-                else:
-                    cell.value = val
-
-            # Write Attachment (SO + Old Meter)
-            rA = start_attach + i
-            so = clean_so(row.get("Service Order", ""))
-            old_dev = str(row.get("Old Device No", "")).strip()
-            
-            cSO = wsA.cell(row=rA, column=2)
-            cSO.value = so
-            cSO.number_format = "@"
-
-            cOld = wsA.cell(row=rA, column=3)
-            cOld.value = old_dev
-            cOld.number_format = "@"
+            ClaimService.write_row(handler, row, start_claim + i, start_attach + i)
 
         print(f"Written {len(rows)} rows to Claim & Attachment.")
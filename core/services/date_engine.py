@@ -1,7 +1,21 @@
 from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from core.holiday_calendar import default_calendar
+
+# Whole-value formats parse_datetime accepts, in the order it tries them
+COLUMN_FORMATS = ("%b %d, %Y, %I:%M %p", "%d %b %Y", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d")
+# pandas rolls seconds 60/61 over and takes any fraction length; strptime does not,
+# so values parsed with these must also print back exactly as written
+_ROUND_TRIP_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M:%S.%f")
+SNIFF_SAMPLE = 50       # distinct values tried against each format
+PARSE_CACHE_SIZE = 4096
+
 
 class DateEngine:
-    @staticmethod
     @staticmethod
     def parse_datetime(date_str):
         """Attempts to parse a date string into a datetime object."""
@@ -43,6 +57,58 @@ class DateEngine:
 
         return None
 
+    @staticmethod
+    def sniff_format(texts):
+        """The COLUMN_FORMATS entry most of a sample of `texts` match exactly (None if none do)."""
+        sample = [t for t in texts if t][:SNIFF_SAMPLE]
+        best, best_hits = None, 0
+        for fmt in COLUMN_FORMATS:
+            hits = 0
+            for text in sample:
+                try:
+                    datetime.strptime(text, fmt)
+                    hits += 1
+                except ValueError:
+                    pass
+            if hits > best_hits:
+                best, best_hits = fmt, hits
+        return best
+
+    @staticmethod
+    def parse_column(values):
+        """
+        parse_datetime over a whole column, with the same results.
+
+        Distinct values are parsed once: those matching the sniffed format in
+        one pandas call, the rest one by one through an LRU cache.
+        Returns (object array of datetime/None, datetime64[us] array with NaT).
+        """
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+        parsed = np.full(len(uniques) + 1, None, dtype=object)       # last slot: code -1 (missing cell)
+        parsed_us = np.full(len(uniques) + 1, np.datetime64("NaT", "us"))
+        pending = np.ones(len(uniques), dtype=bool)
+
+        is_text = np.fromiter((isinstance(u, str) for u in uniques), dtype=bool, count=len(uniques))
+        texts = pd.Series(uniques[is_text], dtype=object).str.strip()
+        fmt = DateEngine.sniff_format(texts)
+        if fmt:
+            stamps = pd.to_datetime(texts, format=fmt, errors="coerce")
+            matched = stamps.notna()
+            if fmt in _ROUND_TRIP_FORMATS:
+                matched &= stamps.dt.strftime(fmt) == texts
+            matched = matched.to_numpy(dtype=bool)
+            at = np.flatnonzero(is_text)[matched]
+            parsed[at] = np.asarray(stamps[matched].dt.to_pydatetime(), dtype=object)
+            parsed_us[at] = stamps[matched].to_numpy(dtype="datetime64[us]")
+            pending[at] = False
+
+        for i in np.flatnonzero(pending):
+            d = _parse_cached(uniques[i])
+            if d:
+                parsed[i] = d
+                parsed_us[i] = np.datetime64(d, "us")
+        return parsed[codes], parsed_us[codes]
+
     @staticmethod
     def parse_date(date_str):
         """Attempts to parse a date string into a date object."""
@@ -55,12 +121,14 @@ class DateEngine:
         return None
 
     @staticmethod
-    def calculate(status_date_str, ocr_date_str=None):
+    def calculate(status_date_str, ocr_date_str=None, state=None):
         """
         Applies Business Logic:
         1. Effective Date = OCR if present, else Status.
         2. Diskon = (OCR is present AND OCR != Status).
-        3. Hari = "Hujung Minggu" if Effective is Sunday.
+        3. Hari = "Cuti Umum" if Effective is a public holiday in `state`
+           (state code or Site ID, see core/holiday_calendar.py),
+           else "Hujung Minggu" if it is a Sunday.
         4. Remarks 2 is currently disabled.
         5. Remarks 1 = "TECO LEWAT..." if Diskon.
         """
@@ -83,9 +151,8 @@ class DateEngine:
         remarks_2 = ""
 
         if effective_date:
-            # Sunday Rule
-            if effective_date.weekday() == 6:
-                hari_field = "Hujung Minggu"
+            # Holiday calendar (Sunday Rule included)
+            hari_field = default_calendar().day_type(effective_date, state)
 
         if is_diskon:
             remarks_1 = f"TECO LEWAT SEBAB DISKON ({effective_date.strftime('%d %b %Y')})"
@@ -97,3 +164,46 @@ class DateEngine:
             "remarks_1": remarks_1,
             "remarks_2": remarks_2
         }
+
+    @staticmethod
+    def calculate_batch(status_dates, ocr_dates=None, states=None):
+        """
+        calculate over whole columns: the same rules, as array operations.
+
+        `status_dates` / `ocr_dates` hold anything parse_date accepts, or are
+        datetime64 arrays already; ocr_dates=None means no OCR override.
+        `states` is one state code / Site ID, one per row, or None.
+        Returns a dict of arrays keyed like calculate's result
+        (effective_date as datetime64[D] with NaT for no date).
+        """
+        status = _as_days(status_dates)
+        ocr = _as_days(ocr_dates) if ocr_dates is not None else np.full(len(status), np.datetime64("NaT", "D"))
+
+        is_diskon = ~np.isnat(ocr) & (status != ocr)
+        effective = np.where(is_diskon, ocr, status)
+        hari = default_calendar().labels(effective, states)
+        remarks_1 = np.full(len(status), "", dtype=object)
+        if is_diskon.any():
+            labels = pd.DatetimeIndex(effective[is_diskon]).strftime("TECO LEWAT SEBAB DISKON (%d %b %Y)")
+            remarks_1[is_diskon] = np.asarray(labels, dtype=object)
+
+        return {
+            "effective_date": effective,
+            "is_diskon": is_diskon,
+            "hari": hari,
+            "remarks_1": remarks_1,
+            "remarks_2": np.full(len(status), "", dtype=object),
+        }
+
+
+def _as_days(values):
+    """Dates of a column as datetime64[D] (NaT where parse_date gives None)."""
+    values = np.asarray(values) if not isinstance(values, pd.Series) else values.to_numpy()
+    if values.dtype.kind != "M":
+        values = DateEngine.parse_column(values)[1]
+    return values.astype("datetime64[D]")
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE, typed=True)
+def _parse_cached(value):
+    return DateEngine.parse_datetime(value)
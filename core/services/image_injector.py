@@ -1,115 +1,274 @@
+import re
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
-from core.so_utils import clean_so
-from config import (
-    DATA_START_ROW, SERVICE_ORDER_COL_IDX, COL_3MS_SO, COL_ATTACH_URL
+from openpyxl.drawing.image import Image as XLImage
+from openpyxl.utils.cell import column_index_from_string, coordinate_from_string
+
+from core.so_utils import sheet_sos
+from core.raw_dataset import RawDataset
+from config import DATA_START_ROW, IMAGE_MODE, STREAM_CHUNK_SIZE
+
+# ATTACHMENT columns of the OLD meter, CARD and NEW meter images
+IMAGE_COLUMNS = (4, 5, 6)
+LINK_LABEL = "Photo"    # Text of the photo link under an embedded thumbnail
+
+# Filename vocabulary of detect_type (typos included), in precedence order:
+# the first type with any of its tokens in the filename wins.
+URL_RULES = (
+    ("old", ("old_read", "oldread", "old_red", "old_rea")),
+    # Typos: cad, crd, car, ard
+    ("card", ("card", "cad", "crd", "car", "ard")),
+    # Typos: newmeter, nee_meter, new_meer, new_metwr, mew_meter, ew_meter
+    ("new", (
+        "new_meter", "newmeter", "nee_meter", "new_metwr", "new_meer", "mew_meter", "mewmeter",
+        "ew_meter", "ewmeter", "nw_meter", "new_mter", "new_metr", "newmeterr",
+    )),
+)
+# Fallback fuzzy for new meter: a stem and an ending anywhere in the filename
+FUZZY_NEW = (("new_m", "mew_m", "ew_m"), ("eer", "ter", "etr", "meter"))
+CLASSIFY_CACHE_SIZE = 65536
+
+
+def _alternatives(tokens):
+    return "|".join(map(re.escape, tokens))
+
+
+# One pass over the filename: an optional lookahead per rule records the token
+# it found (or None), so every rule is tested in a single match call.
+_URL_RULES_RE = re.compile(
+    "".join(f"(?:(?=.*?(?P<{kind}>{_alternatives(tokens)})))?" for kind, tokens in URL_RULES)
+    + f"(?:(?=.*?(?P<fuzzy_stem>{_alternatives(FUZZY_NEW[0])}))(?=.*?(?P<fuzzy_end>{_alternatives(FUZZY_NEW[1])})))?",
+    re.S,
 )
 
+
+@lru_cache(maxsize=CLASSIFY_CACHE_SIZE)
+def classify_filename(filename):
+    """
+    (type, rule) of a lower-cased attachment filename.
+
+    type is "old" / "card" / "new" or None; rule names what decided it
+    ("card:crd", "new:fuzzy(ew_m+ter)", or None when unclassified).
+    """
+    found = _URL_RULES_RE.match(filename)
+    for kind, _ in URL_RULES:
+        token = found.group(kind)
+        if token:
+            return kind, f"{kind}:{token}"
+    if found.group("fuzzy_stem"):
+        return "new", f"new:fuzzy({found.group('fuzzy_stem')}+{found.group('fuzzy_end')})"
+    return None, None
+
+
+def url_filename(url):
+    """Lower-cased filename (last path part) of a URL ("" for blanks)."""
+    if url is None or url != url:
+        return ""
+    return str(url).lower().rpartition("/")[2]
+
+
+URL_SLOTS = ("old", "card", "new", "first")
+
+
+class UrlMap:
+    """
+    SO -> {old, card, new, first} attachment URLs, stored column-wise.
+
+    `sos` holds the SOs (first-appearance order) and `slots` one object
+    column per URL_SLOTS entry (None where the SO has no such URL).
+    `get(so)` returns the per-SO dict the services use; vectorized callers
+    read `positions(sos)` and `column(slot)` instead.
+    """
+    __slots__ = ("sos", "slots", "_index")
+
+    def __init__(self, sos, slots):
+        self.sos = np.asarray(sos, dtype=object)
+        self.slots = slots
+        self._index = None
+
+    @classmethod
+    def empty(cls):
+        return cls([], {slot: np.array([], dtype=object) for slot in URL_SLOTS})
+
+    @classmethod
+    def from_rows(cls, sos, urls, types=None):
+        """
+        Map of RAW attachment rows ((so, url) pairs in row order): the first
+        URL of each SO and the first URL of each type win.
+        """
+        sos = np.asarray(sos, dtype=object)
+        urls = np.asarray(urls, dtype=object)
+        if types is None:
+            types = ImageInjector.detect_types(urls)
+        codes, keys = pd.factorize(pd.Series(sos, dtype=object), sort=False)
+        return cls._first_per_code(codes, len(keys), np.asarray(keys, dtype=object), {
+            "first": (urls, np.ones(len(urls), dtype=bool)),
+            **{kind: (urls, types == kind) for kind in ("old", "card", "new")},
+        })
+
+    @classmethod
+    def merge(cls, maps):
+        """Maps of consecutive RAW slices / files merged in order (first URL of each slot wins)."""
+        maps = [m for m in maps if len(m)]
+        if not maps:
+            return cls.empty()
+        if len(maps) == 1:
+            return maps[0]
+        sos = np.concatenate([m.sos for m in maps])
+        codes, keys = pd.factorize(pd.Series(sos, dtype=object), sort=False)
+        columns = {}
+        for slot in URL_SLOTS:
+            values = np.concatenate([m.slots[slot] for m in maps])
+            columns[slot] = (values, pd.notna(values))
+        return cls._first_per_code(codes, len(keys), np.asarray(keys, dtype=object), columns)
+
+    @classmethod
+    def _first_per_code(cls, codes, n, keys, columns):
+        """{slot: (values, mask)} -> map holding each code's first masked value per slot."""
+        slots = {}
+        for slot in URL_SLOTS:
+            values, mask = columns[slot]
+            rows = np.flatnonzero(mask)[::-1]
+            # Scattered in reverse, so the first row of each code is written last
+            first = np.full(n, -1, dtype=np.intp)
+            first[codes[rows]] = rows
+            column = np.full(n, None, dtype=object)
+            found = first >= 0
+            column[found] = values[first[found]]
+            slots[slot] = column
+        return cls(keys, slots)
+
+    @property
+    def index(self):
+        """{so: position} (built on first use)."""
+        if self._index is None:
+            self._index = {so: i for i, so in enumerate(self.sos)}
+        return self._index
+
+    def positions(self, sos):
+        """Position of each SO in `sos` (-1 for SOs without URLs)."""
+        index = self.index
+        return np.fromiter((index.get(so, -1) for so in sos), dtype=np.intp, count=len(sos))
+
+    def column(self, slot, positions=None):
+        """URLs of one slot, for every SO or for `positions` (None at -1)."""
+        values = self.slots[slot]
+        if positions is None:
+            return values
+        return np.append(values, None)[positions]
+
+    def get(self, so, default=None):
+        i = self.index.get(so)
+        if i is None:
+            return default
+        return {slot: self.slots[slot][i] for slot in URL_SLOTS}
+
+    def __getitem__(self, so):
+        imgs = self.get(so)
+        if imgs is None:
+            raise KeyError(so)
+        return imgs
+
+    def __contains__(self, so):
+        return so in self.index
+
+    def __len__(self):
+        return len(self.sos)
+
+    def __iter__(self):
+        return iter(self.sos)
+
+    def items(self):
+        for so in self.sos:
+            yield so, self[so]
+
+    def __getstate__(self):
+        return self.sos, self.slots
+
+    def __setstate__(self, state):
+        self.sos, self.slots = state
+        self._index = None
+
+
 class ImageInjector:
     @staticmethod
     def detect_type(url: str) -> str | None:
         if not url: return None
-        u = url.lower()
-        filename = u.split("/")[-1] # Focus on filename
-        
-        # OLD READ
-        if any(x in filename for x in ["old_read", "oldread", "old_red", "old_rea"]):
-            return "old"
-            
-        # CARD
-        # Typos: cad, crd, car, ard
-        if any(x in filename for x in ["card", "cad", "crd", "car", "ard"]):
-            return "card"
-        
-        # NEW METER
-        # Typos: newmeter, nee_meter, new_meer, new_metwr, mew_meter, ew_meter
-        if any(
-            x in filename
-            for x in [
-                "new_meter",
-                "newmeter",
-                "nee_meter",
-                "new_metwr",
-                "new_meer",
-                "mew_meter",
-                "mewmeter",
-                "ew_meter",
-                "ewmeter",
-                "nw_meter",
-                "new_mter",
-                "new_metr",
-                "newmeterr",
-            ]
-        ):
-            return "new"
-            
-        # Fallback fuzzy for new meter
-        if (
-            ("new_m" in filename or "mew_m" in filename or "ew_m" in filename)
-            and ("eer" in filename or "ter" in filename or "etr" in filename or "meter" in filename)
-        ):
-            return "new"
-        
-        return None
+        return classify_filename(url_filename(url))[0]  # Focus on filename
 
     @staticmethod
-    def build_url_map(data_path, sheet_name=None):
-        """Reads raw data and maps SO -> {old, card, new} URLs."""
-        from config import DATA_SHEET_NAME 
-        target_sheet = sheet_name if sheet_name else (DATA_SHEET_NAME if DATA_SHEET_NAME else 0)
+    def classify_urls(urls):
+        """
+        detect_type over a whole URL column: (types, rules) object arrays.
 
-        df = pd.read_excel(data_path, sheet_name=target_sheet, dtype=str).fillna("")
-        
-        # Normalize Columns: Strip and Upper
-        df.columns = [str(c).strip().upper() for c in df.columns]
-        
-        # Mapping: keys must be UPPERCASE versions of expected headers
-        target_so = COL_3MS_SO.upper()
-        target_url = COL_ATTACH_URL.upper()
-        
-        rename_map = {}
-        for c in df.columns:
-            if c in ["3MS SO NO.", "3MS SO NO", "SO NUMBER", target_so]:
-                rename_map[c] = COL_3MS_SO
-            elif c in ["ATTACHMENTS URL", "ATTACHMENT URL", "ATTACHMENT_URL", target_url]:
-                rename_map[c] = COL_ATTACH_URL
-                
-        df = df.rename(columns=rename_map)
-        
-        # Debugging check
-        if COL_3MS_SO not in df.columns or COL_ATTACH_URL not in df.columns:
-            print(f"Warning: Columns not found. Available: {df.columns.tolist()}")
-        
-        # Forward fill SO numbers as per original logic
-        if COL_3MS_SO in df.columns:
-            df[COL_3MS_SO] = df[COL_3MS_SO].replace("", pd.NA).ffill()
-        else:
-            return {} 
-        
-        url_map = {}
-        # ... rest of loop logic is fine if columns exist
-        for _, row in df.iterrows():
-            if COL_3MS_SO not in row or COL_ATTACH_URL not in row: continue
-            
-            so = clean_so(row[COL_3MS_SO])
-            url = str(row[COL_ATTACH_URL]).strip()
-            if not so or not url: continue
-
-            if so not in url_map:
-                url_map[so] = {"old": None, "card": None, "new": None, "first": None}
-            
-            if url_map[so]["first"] is None:
-                url_map[so]["first"] = url
-            
-            t = ImageInjector.detect_type(url)
-            if t and url_map[so][t] is None:
-                url_map[so][t] = url
-        return url_map
+        Filenames repeat heavily across SOs, so each distinct one is matched once (memo).
+        """
+        types = np.full(len(urls), None, dtype=object)
+        rules = np.full(len(urls), None, dtype=object)
+        for i, url in enumerate(urls):
+            filename = url_filename(url) if url else ""
+            if filename:
+                types[i], rules[i] = classify_filename(filename)
+        return types, rules
+
+    @staticmethod
+    def detect_types(urls):
+        """Types of a URL column (object array, None where unclassified)."""
+        return ImageInjector.classify_urls(urls)[0]
+
+    @staticmethod
+    def rule_stats(urls):
+        """
+        (rule counts, unclassified filename counts) of a URL column, for
+        tuning the URL_RULES vocabulary. Blank URLs are left out.
+        """
+        _, rules = ImageInjector.classify_urls(urls)
+        rule_counts, unclassified = Counter(), Counter()
+        for url, rule in zip(urls, rules):
+            filename = url_filename(url)
+            if not url or not filename:
+                continue
+            rule_counts[rule or "unclassified"] += 1
+            if rule is None:
+                unclassified[filename] += 1
+        return rule_counts, unclassified
+
+    @staticmethod
+    def url_map_from_entries(entries):
+        """UrlMap of (so, url) pairs (first URL of each type wins)."""
+        entries = list(entries)
+        sos = [so for so, _ in entries]
+        urls = [url for _, url in entries]
+        return UrlMap.from_rows(sos, urls)
+
+    @staticmethod
+    def build_url_map(source, sheet_name=None):
+        """UrlMap (SO -> {old, card, new, first} URLs) from RAW data (path or RawDataset)."""
+        dataset = RawDataset.coerce(source, sheet_name)
+        return UrlMap.from_rows(*dataset.url_rows())
+
+    @staticmethod
+    def build_url_map_streaming(data_path, sheet_name=None, chunk_size=STREAM_CHUNK_SIZE):
+        """build_url_map over RAW chunks (bounded memory)."""
+        return UrlMap.merge(
+            UrlMap.from_rows(*chunk.url_rows())
+            for chunk in RawDataset.iter_chunks(data_path, sheet_name, chunk_size)
+        )
 
     @staticmethod
     def img_formula(url: str) -> str | None:
         if not url: return None
         return f'=_xlfn.IMAGE("{url}",,1)'
 
+    @staticmethod
+    def link_formula(url: str) -> str | None:
+        """Plain link to the photo (embedded mode: the thumbnail covers the cell, Excel fetches nothing)."""
+        if not url: return None
+        return f'=HYPERLINK("{url}","{LINK_LABEL}")'
+
     @staticmethod
     def set_formula(cell, formula):
         if not formula:
@@ -119,30 +278,94 @@ class ImageInjector:
         cell.data_type = "f"
 
     @staticmethod
-    def run(handler, data_path, progress_cb=None, sheet_name=None):
-        """Injects image formulas into Attachment sheet."""
-        data_path = str(data_path) # pandas needs string
-        url_map = ImageInjector.build_url_map(data_path, sheet_name=sheet_name)
+    def slot_urls(imgs):
+        """(OLD meter, CARD, NEW meter) photo URLs of one url_map entry."""
+        return imgs.get("old") or imgs.get("first"), imgs.get("card"), imgs.get("new")
+
+    @staticmethod
+    def formulas(imgs, mode=IMAGE_MODE):
+        """(OLD meter, CARD, NEW meter) cell formulas for one url_map entry."""
+        formula = ImageInjector.link_formula if mode == "embedded" else ImageInjector.img_formula
+        return tuple(formula(url) for url in ImageInjector.slot_urls(imgs))
+
+    @staticmethod
+    def drop_images(ws, cells):
+        """Removes pictures anchored at `cells` ((row, column) pairs) before they are redrawn."""
+        if not ws._images:
+            return
+        kept = []
+        for image in ws._images:
+            anchor = image.anchor
+            if isinstance(anchor, str):     # added this run, not yet saved
+                col, row = coordinate_from_string(anchor)
+                at = (row, column_index_from_string(col))
+            elif getattr(anchor, "_from", None) is not None:
+                at = (anchor._from.row + 1, anchor._from.col + 1)
+            else:
+                at = None
+            if at not in cells:
+                kept.append(image)
+        ws._images = kept
+
+    @staticmethod
+    def embed_image(ws, cell, path):
+        """Anchors the thumbnail at `path` to the top-left corner of `cell`."""
+        image = XLImage(str(path))
+        ws.add_image(image, cell.coordinate)
+
+    @staticmethod
+    def run(handler, source=None, progress_cb=None, sheet_name=None, url_map=None, rows=None,
+            thumbnails=None, download_cb=None):
+        """
+        Injects image formulas into Attachment sheet (url_map is built from source if not given).
+
+        `rows` limits the rewrite to those ATTACHMENT rows; by default every
+        row with an SO is rewritten. Returns (row, so, (OLD meter, CARD,
+        NEW meter) URLs) of every row written, for QualityControl.analyze_written.
+        With a ThumbnailCache as `thumbnails`
+        (IMAGE_MODE "embedded") the photos are embedded as thumbnails over
+        plain links instead; `download_cb(done, total)` follows the downloads.
+        """
+        if url_map is None:
+            url_map = ImageInjector.build_url_map(source, sheet_name=sheet_name)
         
         wsA = handler.ws_attach
-        last_row = wsA.max_row
-        if last_row < DATA_START_ROW: last_row = DATA_START_ROW
-        
-        col_old, col_card, col_new = 4, 5, 6
+        if rows is None:
+            last_row = wsA.max_row
+            if last_row < DATA_START_ROW: last_row = DATA_START_ROW
+            rows = range(DATA_START_ROW, last_row + 1)
+
         idx = 0
-        total = last_row - DATA_START_ROW + 1
+        total = len(rows)
+
+        sos = sheet_sos(wsA, rows)
+        positions = url_map.positions(sos)
+        old_urls = [old or first for old, first in
+                    zip(url_map.column("old", positions), url_map.column("first", positions))]
+        card_urls = url_map.column("card", positions)
+        new_urls = url_map.column("new", positions)
+
+        formula = ImageInjector.img_formula
+        thumbs = {}
+        if thumbnails is not None:
+            formula = ImageInjector.link_formula
+            ImageInjector.drop_images(wsA, {(r, col) for r in rows for col in IMAGE_COLUMNS})
+            urls = [*old_urls, *card_urls, *new_urls]
+            thumbs = thumbnails.paths([u for u in urls if u], download_cb)
 
-        for r in range(DATA_START_ROW, last_row + 1):
-            so = clean_so(wsA.cell(r, SERVICE_ORDER_COL_IDX).value)
+        written = []
+        for i, (r, so) in enumerate(zip(rows, sos)):
             if not so: continue
 
             idx += 1
-            imgs = url_map.get(so, {})
-            
-            old_url = imgs.get("old") or imgs.get("first")
-            ImageInjector.set_formula(wsA.cell(r, col_old), ImageInjector.img_formula(old_url))
-            ImageInjector.set_formula(wsA.cell(r, col_card), ImageInjector.img_formula(imgs.get("card")))
-            ImageInjector.set_formula(wsA.cell(r, col_new), ImageInjector.img_formula(imgs.get("new")))
+            urls = (old_urls[i], card_urls[i], new_urls[i])
+            written.append((r, so, urls))
+            for col, url in zip(IMAGE_COLUMNS, urls):
+                cell = wsA.cell(r, col)
+                ImageInjector.set_formula(cell, formula(url))
+                if url in thumbs:
+                    ImageInjector.embed_image(wsA, cell, thumbs[url])
 
             if progress_cb:
                 progress_cb(f"Processing SO {so} ({idx}/{total})")
+        return written
@@ -0,0 +1,180 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from core.process_pool import run_parallel
+from core.raw_dataset import RawDataset, data_sheets
+from core.raw_stream import should_stream
+from core.services.claim_service import ClaimService
+from core.services.image_injector import ImageInjector, UrlMap
+from config import ALL_DATA_SHEETS, BATCH_MAX_WORKERS, DATA_SHEET_NAME, HOLIDAY_FILE
+
+# RAW export suffixes picked up from a batch folder
+RAW_SUFFIXES = (".xlsx", ".xlsm", ".xls")
+
+
+def _holiday_input():
+    """Holiday list as a cache input: it decides the Hari / Remarks of the claim rows."""
+    holiday_file = Path(HOLIDAY_FILE)
+    return holiday_file if holiday_file.exists() else None
+
+
+@dataclass
+class IngestResult:
+    """Everything run_process needs from one RAW export (or a batch of them)."""
+    claim_rows: list
+    stats: dict
+    url_map: UrlMap
+    streaming: bool = False
+    cached: bool = False
+    sources: list = field(default_factory=list)  # (file / sheet label, stats) when several were merged
+
+
+def ingest(data_path, sheet_name=None, streaming=None, cache=None):
+    """
+    Parses a RAW export exactly once and builds claim rows, stats and the URL map.
+
+    Small files are loaded into one RawDataset that both services share.
+    Large files (see raw_stream.should_stream) are read chunk by chunk; each
+    chunk feeds ClaimService and ImageInjector before the next is read.
+
+    Workbooks with several data sheets (see sheets_to_read) have each
+    sheet parsed in a worker process; the sheets are merged into one row
+    set and their own stats kept in `sources`.
+
+    With an ArtifactCache, a file parsed before (same content, same code,
+    same holiday list) is not opened at all; its build_rows / build_url_map results are reused.
+    """
+    if cache is None or not cache.enabled:
+        return _parse_file(data_path, sheet_name, streaming)
+
+    key = cache.key("raw", Path(data_path), sheet_name, _holiday_input())
+    built = cache.get("claim_rows", key)
+    url_map = cache.get("url_map", key)
+    if built is not None and url_map is not None:
+        claim_rows, stats, sources = built
+        return IngestResult(claim_rows, stats, url_map, cached=True, sources=sources)
+
+    result = _parse_file(data_path, sheet_name, streaming)
+    cache.put("claim_rows", key, (result.claim_rows, result.stats, result.sources))
+    cache.put("url_map", key, result.url_map)
+    return result
+
+
+def sheets_to_read(data_path, sheet_name=None):
+    """
+    Sheets ingest reads from one RAW file.
+
+    An explicit sheet (argument or DATA_SHEET_NAME) is read alone. Otherwise,
+    with ALL_DATA_SHEETS, every sheet whose header row has the SO column is
+    read (consolidated exports with one sheet per Business Area or week);
+    [None] (the first sheet) when there is nothing to discover.
+    """
+    if sheet_name is not None or DATA_SHEET_NAME is not None or not ALL_DATA_SHEETS:
+        return [sheet_name]
+    return data_sheets(data_path) or [None]
+
+
+def _parse_file(data_path, sheet_name=None, streaming=None):
+    sheets = sheets_to_read(data_path, sheet_name)
+    if len(sheets) == 1:
+        return _parse(data_path, sheets[0], streaming)
+    parsed = run_parallel(parse_groups, [(data_path, sheet, streaming) for sheet in sheets])
+    return _merge_parsed(sheets, parsed)
+
+
+def _parse(data_path, sheet_name=None, streaming=None):
+    groups, url_map, streaming = parse_groups(data_path, sheet_name, streaming)
+    if groups.empty: raise ValueError("RAW DATA has no valid SO rows.")
+    claim_rows, stats = ClaimService.finalize_groups(groups)
+    return IngestResult(claim_rows, stats, url_map, streaming=streaming)
+
+
+def parse_groups(data_path, sheet_name=None, streaming=None):
+    """
+    (SO groups, URL map, streamed?) of one RAW export, before the TRAS/duplicate rules.
+
+    Module-level so process pool workers can run it (see ingest_batch).
+    """
+    if streaming is None:
+        streaming = should_stream(data_path, sheet_name)
+
+    if not streaming:
+        dataset = RawDataset.load(data_path, sheet_name)
+        groups = ClaimService.group_dataset(dataset)
+        url_map = ImageInjector.build_url_map(dataset)
+        return groups, url_map, False
+
+    parts = []
+    url_maps = []
+    for chunk in RawDataset.iter_chunks(data_path, sheet_name):
+        parts.append(ClaimService.group_dataset(chunk))
+        url_maps.append(UrlMap.from_rows(*chunk.url_rows()))
+    return ClaimService.combine_groups(parts), UrlMap.merge(url_maps), True
+
+
+def collect_inputs(data_path):
+    """RAW exports named by a list of paths, a folder (sorted by name) or a single path."""
+    if isinstance(data_path, (list, tuple)):
+        return [Path(p) for p in data_path]
+    data_path = Path(data_path)
+    if not data_path.is_dir():
+        return [data_path]
+    return sorted(
+        p for p in data_path.iterdir()
+        if p.is_file() and p.suffix.lower() in RAW_SUFFIXES
+        and not p.name.startswith("~$")           # Excel lock files
+        and not p.name.startswith("LKS (")        # results of earlier runs
+    )
+
+
+def ingest_batch(data_paths, sheet_name=None, cache=None, max_workers=BATCH_MAX_WORKERS):
+    """
+    Ingests several RAW exports as one export, files taken in the given order.
+
+    Files (and the data sheets of multi-sheet files) are parsed in worker
+    processes; cached files are not parsed at all. SO groups are merged
+    across files before the TRAS and duplicate rules run, so an SO sent in
+    two files is written once and counted as a duplicate. Each file's (or
+    sheet's) own stats are kept in `sources`.
+    """
+    data_paths = [Path(p) for p in data_paths]
+    parsed = [None] * len(data_paths)     # per file: [(label, parse_groups result)]
+    keys = [None] * len(data_paths)
+    if cache is not None and cache.enabled:
+        for index, data_path in enumerate(data_paths):
+            keys[index] = cache.key("raw_groups", data_path, sheet_name, _holiday_input())
+            parsed[index] = cache.get("raw_groups", keys[index])
+
+    jobs = []
+    for index, data_path in enumerate(data_paths):
+        if parsed[index] is not None:
+            continue
+        parsed[index] = []
+        sheets = sheets_to_read(data_path, sheet_name)
+        for sheet in sheets:
+            label = data_path.name if len(sheets) == 1 else f"{data_path.name} [{sheet}]"
+            jobs.append((index, label, sheet))
+
+    results = run_parallel(parse_groups, [(data_paths[index], sheet) for index, _, sheet in jobs], max_workers)
+    for (index, label, _), result in zip(jobs, results):
+        parsed[index].append((label, result))
+    for index in {index for index, _, _ in jobs}:
+        if keys[index] is not None:
+            cache.put("raw_groups", keys[index], parsed[index])
+
+    items = [item for file_items in parsed for item in file_items]
+    return _merge_parsed([label for label, _ in items], [result for _, result in items])
+
+
+def _merge_parsed(labels, parsed):
+    """IngestResult of several parse_groups results, with per-source stats."""
+    # Per-source stats only: the claim rows are built once, from the merged groups
+    sources = [(label, ClaimService.group_stats(groups)) for label, (groups, _, _) in zip(labels, parsed)]
+
+    groups = ClaimService.combine_groups([groups for groups, _, _ in parsed])
+    if groups.empty: raise ValueError("RAW DATA has no valid SO rows.")
+    claim_rows, stats = ClaimService.finalize_groups(groups)
+    # First URL of each type wins across files too, as within one file
+    url_map = UrlMap.merge(url_map for _, url_map, _ in parsed)
+    streaming = any(streamed for _, _, streamed in parsed)
+    return IngestResult(claim_rows, stats, url_map, streaming=streaming, sources=sources)
@@ -0,0 +1,121 @@
+# core/services/link_checker.py — broken attachment links
+"""
+Checks that the Attachments URL links written into the ATTACHMENT sheet
+still resolve, so dead photos are flagged for review before TNB rejects
+the claim.
+
+Every link gets a HEAD request (a one-byte GET where HEAD is refused, see
+http_client.fetch_status) over one pooled session. HTTP_MAX_WORKERS
+threads run the requests, at most HTTP_HOST_MAX_WORKERS of them against
+the same host. HTTP statuses are kept per URL in a SqliteCache table for
+LINK_CHECK_TTL_HOURS, so a re-run only requests links not checked
+recently. Network errors (timeouts, refused connections) count as broken
+but are not cached, so they are retried on the next run.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+from core.http_client import fetch_status, pooled_session
+from core.sqlite_cache import SqliteCache
+from config import HTTP_HOST_MAX_WORKERS, HTTP_MAX_WORKERS, HTTP_TIMEOUT, LINK_CHECK_TTL_HOURS
+
+UNREACHABLE = 0     # Status of a link whose request failed without an HTTP answer
+
+
+def is_broken(status):
+    return status == UNREACHABLE or status >= 400
+
+
+def status_label(status):
+    """Short reason shown next to a broken slot ("404", "unreachable")."""
+    return "unreachable" if status == UNREACHABLE else str(status)
+
+
+class LinkChecker:
+    """
+    HTTP status of many attachment URLs.
+
+    `checked`, `cached` and `failed` count the URLs of the last `statuses`
+    call (requested, served from the cache, no HTTP answer) so the run log
+    can report them.
+    """
+
+    def __init__(self, cache=None, session=None, max_workers=HTTP_MAX_WORKERS, per_host=HTTP_HOST_MAX_WORKERS,
+                 timeout=HTTP_TIMEOUT, ttl=LINK_CHECK_TTL_HOURS * 3600, clock=time.time):
+        self.cache = cache if cache is not None else SqliteCache("link_status")
+        self.session = session
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.timeout = timeout
+        self.ttl = ttl
+        self.clock = clock
+        self._host_slots = {}
+        self._host_lock = threading.Lock()
+        self.checked = self.cached = self.failed = 0
+
+    def _host_slot(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self._host_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return slot
+
+    def check(self, session, url):
+        """HTTP status of one URL (UNREACHABLE when the request fails)."""
+        with self._host_slot(url):
+            try:
+                return fetch_status(session, url, self.timeout)
+            except Exception:
+                return UNREACHABLE
+
+    def _fresh_cached(self, urls):
+        """{url: status} of the cached results younger than the TTL."""
+        now = self.clock()
+        found = {}
+        for url, text in self.cache.get_many(urls).items():
+            status, _, checked_at = text.partition(" ")
+            try:
+                if now - float(checked_at) < self.ttl:
+                    found[url] = int(status)
+            except ValueError:
+                continue    # unreadable entry: checked again
+        return found
+
+    def statuses(self, urls, progress_cb=None):
+        """{url: HTTP status} for every non-empty URL in `urls`."""
+        urls = list(dict.fromkeys(u for u in urls if u))
+        results = self._fresh_cached(urls)
+        self.cached = len(results)
+        pending = [u for u in urls if u not in results]
+        self.checked = self.failed = 0
+        if not pending:
+            return results
+
+        session = self.session or pooled_session(self.max_workers)
+        answered = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {pool.submit(self.check, session, url): url for url in pending}
+                for done, future in enumerate(as_completed(futures), 1):
+                    url, status = futures[future], future.result()
+                    results[url] = status
+                    self.checked += 1
+                    if status == UNREACHABLE:
+                        self.failed += 1
+                    else:
+                        answered[url] = status
+                    if progress_cb:
+                        progress_cb(done, len(pending))
+        finally:
+            if self.session is None:
+                session.close()
+            checked_at = self.clock()
+            self.cache.put_many({url: f"{status} {checked_at:.0f}" for url, status in answered.items()})
+        return results
+
+    def broken(self, urls, progress_cb=None):
+        """{url: status} of the URLs in `urls` that do not resolve."""
+        return {url: status for url, status in self.statuses(urls, progress_cb).items() if is_broken(status)}
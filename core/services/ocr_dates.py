@@ -0,0 +1,215 @@
+# core/services/ocr_dates.py — date stamps burned into attachment photos
+"""
+Reads the capture date that timestamp cameras print onto meter photos and
+hands it to DateEngine as the OCR override date.
+
+Each photo is downloaded (pooled session, HTTP_MAX_WORKERS threads), the
+stamp region (OCR_STAMP_BOX) is cropped and cleaned up with Pillow, and
+the text is recognized by a swappable backend (OCR_BACKENDS, selected by
+OCR_BACKEND) in OCR_MAX_WORKERS worker processes. The first date-looking
+token of the text is parsed by DateEngine.parse_datetime.
+
+Results are cached by SHA-256 of the image bytes together with the backend
+and stamp box that read them, so the same photo is recognized once however
+many URLs or exports point at it (and again after OCR_BACKEND or
+OCR_STAMP_BOX change); the URL -> hash map is cached too, so a re-run does
+not download it again. A photo the backend fails on counts as failed and
+is not cached, so it is retried on the next run.
+"""
+import hashlib
+import io
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from core.http_client import fetch_body, pooled_session
+from core.process_pool import StagePool
+from core.sqlite_cache import SqliteCache
+from core.services.date_engine import DateEngine
+from core.services.photo_dates import date_text, dates_by_so, text_date
+from config import HTTP_MAX_WORKERS, HTTP_TIMEOUT, OCR_BACKEND, OCR_MAX_WORKERS, OCR_STAMP_BOX
+
+try:
+    import pytesseract
+except ImportError:  # optional: only the "tesseract" backend needs it
+    pytesseract = None
+
+STAMP_SCALE = 2         # Upscale of the cropped stamp before recognition
+BATCH_SIZE = 64         # Photos downloaded and recognized per round (bounds memory)
+
+# "4 Dec 2025", "2025-12-04" / "2025/12/04", "04/12/2025" (day first) ...
+_DATE_TOKEN = re.compile(
+    r"(?P<dmy_text>\d{1,2}\s+[A-Za-z]{3}\s+\d{4})"
+    r"|(?P<ymd>\d{4})[-/.](?P<ymd_m>\d{1,2})[-/.](?P<ymd_d>\d{1,2})"
+    r"|(?P<dmy_d>\d{1,2})[-/.](?P<dmy_m>\d{1,2})[-/.](?P<dmy_y>\d{4})"
+)
+
+
+class TesseractBackend:
+    """Tesseract through pytesseract (needs the tesseract program installed)."""
+
+    name = "tesseract"
+
+    def available(self):
+        if pytesseract is None:
+            return False
+        try:
+            pytesseract.get_tesseract_version()
+        except Exception:
+            return False
+        return True
+
+    def __call__(self, image):
+        # One uniform block of text: the stamp line(s)
+        return pytesseract.image_to_string(image, config="--psm 6")
+
+
+# Backend name -> class; instances are called with a PIL image and return its text,
+# and their `name` is part of the result cache key. They are sent to worker
+# processes, so they must be picklable.
+OCR_BACKENDS = {
+    "tesseract": TesseractBackend,
+}
+
+
+def get_backend(name=OCR_BACKEND):
+    try:
+        return OCR_BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown OCR backend {name!r}. Available: {sorted(OCR_BACKENDS)}") from None
+
+
+def crop_stamp(image, box=OCR_STAMP_BOX):
+    """Grayscale, contrast-stretched and upscaled stamp region of a photo."""
+    image = ImageOps.exif_transpose(image)
+    width, height = image.size
+    left, top, right, bottom = box
+    stamp = image.crop((int(left * width), int(top * height), int(right * width), int(bottom * height)))
+    stamp = ImageOps.autocontrast(stamp.convert("L"))
+    return stamp.resize((stamp.width * STAMP_SCALE, stamp.height * STAMP_SCALE), Image.LANCZOS)
+
+
+def read_stamp(backend, data, box=OCR_STAMP_BOX):
+    """
+    Recognized stamp text of one photo ("" when the bytes are not an image,
+    None when the backend fails on it).
+
+    Module-level so process pool workers can run it.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            stamp = crop_stamp(image, box)
+    except (UnidentifiedImageError, OSError):
+        return ""
+    try:
+        return backend(stamp)
+    except Exception:
+        # Tesseract errors, a missing tesseract program, backend timeouts: this photo only
+        return None
+
+
+def stamp_date(text):
+    """First date in recognized stamp text, parsed by DateEngine (None if there is none)."""
+    for match in _DATE_TOKEN.finditer(text or ""):
+        if match.group("dmy_text"):
+            token = " ".join(match.group("dmy_text").split())
+        elif match.group("ymd"):
+            token = f"{match.group('ymd')}-{int(match.group('ymd_m')):02d}-{int(match.group('ymd_d')):02d}"
+        else:
+            token = f"{match.group('dmy_y')}-{int(match.group('dmy_m')):02d}-{int(match.group('dmy_d')):02d}"
+        parsed = DateEngine.parse_datetime(token)
+        if parsed:
+            return parsed
+    return None
+
+
+class StampDateReader:
+    """
+    Stamp dates of many photo URLs.
+
+    `recognized`, `cached` and `failed` count the URLs of the last `read`
+    so the run log can report them.
+    """
+
+    def __init__(self, backend=None, box=OCR_STAMP_BOX, session=None, max_workers=OCR_MAX_WORKERS,
+                 download_workers=HTTP_MAX_WORKERS, timeout=HTTP_TIMEOUT, url_cache=None, image_cache=None):
+        self.backend = backend if backend is not None else get_backend()
+        self.box = box
+        self.session = session
+        self.max_workers = max_workers
+        self.download_workers = download_workers
+        self.timeout = timeout
+        self.url_cache = url_cache if url_cache is not None else SqliteCache("ocr_url_hashes")
+        self.image_cache = image_cache if image_cache is not None else SqliteCache("ocr_dates")
+        # Results of another backend or stamp box are not reused
+        backend_name = getattr(self.backend, "name", type(self.backend).__name__)
+        self._variant = f"{backend_name}|{','.join(map(str, box))}|"
+        self.recognized = self.cached = self.failed = 0
+
+    def _cached_dates(self, hashes):
+        """{image hash: date | None} of the hashes this backend and box already read."""
+        found = self.image_cache.get_many(self._variant + h for h in hashes)
+        return {key[len(self._variant):]: text_date(text) for key, text in found.items()}
+
+    def _download(self, session, urls):
+        """{url: bytes} of the URLs that could be downloaded."""
+        def get(url):
+            try:
+                return url, fetch_body(session, url, self.timeout)
+            except Exception:
+                return url, None
+
+        with ThreadPoolExecutor(max_workers=self.download_workers) as pool:
+            return {url: data for url, data in pool.map(get, urls) if data is not None}
+
+    def read(self, urls, progress_cb=None):
+        """{url: date | None} for every non-empty URL in `urls`."""
+        urls = list(dict.fromkeys(u for u in urls if u))
+        hashes = self.url_cache.get_many(urls)
+        known = self._cached_dates(set(hashes.values()))
+        results = {url: known[h] for url, h in hashes.items() if h in known}
+        self.cached = len(results)
+        self.recognized = self.failed = 0
+        pending = [u for u in urls if u not in results]
+        if not pending:
+            return results
+
+        session = self.session or pooled_session(self.download_workers)
+        # One pool for every batch: spawned workers are started (and import the app) once
+        workers = StagePool(self.max_workers)
+        try:
+            for start in range(0, len(pending), BATCH_SIZE):
+                batch = pending[start:start + BATCH_SIZE]
+                bodies = self._download(session, batch)
+                self.failed += len(batch) - len(bodies)
+
+                url_hashes = {url: hashlib.sha256(data).hexdigest() for url, data in bodies.items()}
+                # Same photo behind several URLs (or already read under another URL)
+                known.update(self._cached_dates(set(url_hashes.values()) - known.keys()))
+                jobs = {}
+                for url, h in url_hashes.items():
+                    if h not in known and h not in jobs:
+                        jobs[h] = bodies[url]
+                texts = workers.map(read_stamp, [(self.backend, data, self.box) for data in jobs.values()])
+                fresh = {h: stamp_date(text) for h, text in zip(jobs, texts) if text is not None}
+                known.update(fresh)
+                self.recognized += len(fresh)
+                unread = set(jobs) - fresh.keys()
+                self.failed += sum(1 for h in url_hashes.values() if h in unread)
+
+                for url in batch:
+                    results[url] = known.get(url_hashes[url]) if url in url_hashes else None
+                self.url_cache.put_many(url_hashes)
+                self.image_cache.put_many({self._variant + h: date_text(d) for h, d in fresh.items()})
+                if progress_cb:
+                    progress_cb(min(start + BATCH_SIZE, len(pending)), len(pending))
+        finally:
+            workers.close()
+            if self.session is None:
+                session.close()
+        return results
+
+    def so_dates(self, url_map, sos, progress_cb=None):
+        """{so: stamp date} for the SOs whose photos carry one."""
+        return dates_by_so(self.read, url_map, sos, progress_cb)
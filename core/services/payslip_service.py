@@ -6,10 +6,16 @@ from dataclasses import dataclass, field
 from datetime import date, datetime
 from pathlib import Path
 
+import numpy as np
 import xlwings as xw
 from openpyxl import load_workbook
 from shutil import copy2
 
+from config import HOLIDAY_FILE, PAYSLIP_FILL_DAY_TYPES
+from core.artifact_cache import ArtifactCache
+from core.holiday_calendar import DAY_TYPES, default_calendar
+from core.services.date_engine import DateEngine
+
 try:
     from win32com.client import gencache
 except Exception:  # pragma: no cover - only used on Windows with pywin32
@@ -54,7 +60,12 @@ CLAIM_REQUIRED_HEADERS = {
 }
 CLAIM_OPTIONAL_HEADERS = {
     "REMARKS 2": "remarks_2",
+    "REMARKS": "remarks_1",
+    "Status Date": "status_date",
+    "Site": "site",
 }
+# Effective date DateEngine.calculate writes into REMARKS for diskon rows
+DISKON_DATE_PATTERN = re.compile(r"DISKON \((\d{1,2} \w{3} \d{4})\)")
 DAY_TYPE_TO_COLUMN = {
     ("HARI BIASA", "PH1"): "C",
     ("HARI BIASA", "PH3"): "D",
@@ -153,6 +164,8 @@ class FileClaimSummary:
     skipped_rows: int
     counts_by_team: dict[str, tuple[float, float, float, float, float, float]]
     kiv_counts_by_team: dict[str, tuple[float, float]]
+    # (sheet row, Day Type written, calendar day type) of rows the holiday calendar disagrees with
+    calendar_mismatches: tuple[tuple[int, str, str], ...] = ()
 
 
 @dataclass(frozen=True)
@@ -175,6 +188,7 @@ class PayslipGenerationResult:
     pdf_failures: list[str] = field(default_factory=list)
     calculation_workbook_path: Path | None = None
     claim_summary: ClaimCountSummary | None = None
+    cache_summary: str = ""
 
     @property
     def generated_xlsx_count(self) -> int:
@@ -296,7 +310,13 @@ def _clear_win32com_gen_py_cache() -> None:
         pass
 
 
-def load_worker_master(master_path: Path) -> tuple[dict[str, dict[str, WorkerIdentity]], WorkerIdentity | None]:
+def load_worker_master(
+    master_path: Path,
+    cache: ArtifactCache | None = None,
+) -> tuple[dict[str, dict[str, WorkerIdentity]], WorkerIdentity | None]:
+    if cache is not None:
+        return cache.fetch("worker_master", (Path(master_path),), lambda: load_worker_master(master_path))
+
     workbook = load_workbook(master_path, read_only=True, data_only=True)
     try:
         worksheet = workbook["DATA PERSONAL"]
@@ -366,7 +386,115 @@ def _find_claim_header_row(worksheet) -> tuple[int, dict[str, int]]:
     raise ValueError("Could not find the required CLAIM headers in the selected LKS workbook.")
 
 
-def load_claim_counts(lks_paths: list[Path]) -> ClaimCountSummary:
+def _calendar_day_types(dates: list[object], remarks_1: list[str], sites: list[object]) -> list[str | None]:
+    """Calendar DAY_TYPES label of each row (None where the row has no parseable date)."""
+    effective = [
+        match.group(1) if (match := DISKON_DATE_PATTERN.search(remark)) else value
+        for value, remark in zip(dates, remarks_1)
+    ]
+    _, days = DateEngine.parse_column(effective)
+    codes = default_calendar().classify(days, sites)
+    dated = ~np.isnat(days)
+    return [DAY_TYPES[code] if has_date else None for code, has_date in zip(codes, dated)]
+
+
+def _count_claim_file(lks_path: Path, fill_day_types: bool = PAYSLIP_FILL_DAY_TYPES) -> FileClaimSummary | None:
+    """
+    CLAIM row counts of one LKS workbook (None when it has no CLAIM sheet).
+
+    Rows are counted by the Day Type written in the sheet. The holiday
+    calendar never changes a written Day Type: rows it disagrees with are
+    reported in `calendar_mismatches`. With `fill_day_types`, rows whose
+    Day Type is blank are counted by their calendar day type instead of
+    being skipped.
+    """
+    file_counts: dict[str, list[float]] = {team_code: [0.0] * 6 for team_code in VALID_TEAM_CODES}
+    file_kiv_counts: dict[str, list[float]] = {team_code: [0.0, 0.0] for team_code in VALID_TEAM_CODES}
+    file_total_rows = 0
+    file_counted_rows = 0
+    workbook = load_workbook(lks_path, read_only=True, data_only=True)
+    try:
+        if "CLAIM" not in workbook.sheetnames:
+            return None
+
+        worksheet = workbook["CLAIM"]
+        header_row, column_map = _find_claim_header_row(worksheet)
+
+        def column_values(key: str) -> list[object]:
+            if not column_map.get(key):
+                return [None] * (worksheet.max_row - header_row)
+            return [
+                row[0] for row in worksheet.iter_rows(
+                    min_row=header_row + 1, max_row=worksheet.max_row,
+                    min_col=column_map[key], max_col=column_map[key], values_only=True,
+                )
+            ]
+
+        remarks_1 = [_as_text(value).upper() for value in column_values("remarks_1")]
+        calendar_types = _calendar_day_types(column_values("status_date"), remarks_1, column_values("site"))
+        mismatches = []
+
+        rows = zip(
+            column_values("labor"), column_values("voltage"), column_values("day_type"),
+            column_values("remarks_2"), calendar_types,
+        )
+        for row_idx, (labor, voltage, day_type_value, remarks_2_value, calendar_type) in enumerate(rows, header_row + 1):
+            team_code = _normalize_team_code(_as_text(labor))
+            phase = _normalize_phase(voltage)
+            day_type = _normalize_day_type(day_type_value)
+            if day_type is None:
+                if fill_day_types:
+                    day_type = calendar_type
+            elif calendar_type is not None and day_type != calendar_type:
+                mismatches.append((row_idx, day_type, calendar_type))
+            is_kiv = "KIV" in _as_text(remarks_2_value).upper()
+
+            file_total_rows += 1
+            if team_code is None or phase is None:
+                continue
+
+            if is_kiv:
+                kiv_index = 0 if phase == "PH1" else 1
+                file_kiv_counts[team_code][kiv_index] += 1.0
+            else:
+                if day_type is None:
+                    continue
+                column = DAY_TYPE_TO_COLUMN.get((day_type.upper(), phase))
+                if column is None:
+                    continue
+
+                count_index = COUNT_CELL_ORDER.index(column)
+                file_counts[team_code][count_index] += 1.0
+            file_counted_rows += 1
+    finally:
+        workbook.close()
+
+    return FileClaimSummary(
+        file_name=lks_path.name,
+        total_rows=file_total_rows,
+        counted_rows=file_counted_rows,
+        skipped_rows=file_total_rows - file_counted_rows,
+        counts_by_team={team_code: tuple(values) for team_code, values in file_counts.items()},
+        kiv_counts_by_team={team_code: tuple(values) for team_code, values in file_kiv_counts.items()},
+        calendar_mismatches=tuple(mismatches),
+    )
+
+
+def _mismatch_warning(file_summary: FileClaimSummary, max_show: int = 5) -> str:
+    shown = ", ".join(
+        f"row {row_idx} ({written}, calendar: {expected})"
+        for row_idx, written, expected in file_summary.calendar_mismatches[:max_show]
+    )
+    more = len(file_summary.calendar_mismatches) - max_show
+    return (
+        f"{file_summary.file_name}: {len(file_summary.calendar_mismatches)} rows have a Day Type the holiday "
+        f"calendar disagrees with (counted as written): {shown}" + (f" and {more} more." if more > 0 else ".")
+    )
+
+
+def load_claim_counts(
+    lks_paths: list[Path], cache: ArtifactCache | None = None, fill_day_types: bool = PAYSLIP_FILL_DAY_TYPES,
+) -> ClaimCountSummary:
     counts: dict[str, list[float]] = {team_code: [0.0] * 6 for team_code in VALID_TEAM_CODES}
     kiv_counts: dict[str, list[float]] = {team_code: [0.0, 0.0] for team_code in VALID_TEAM_CODES}
     file_summaries: list[FileClaimSummary] = []
@@ -375,62 +503,28 @@ def load_claim_counts(lks_paths: list[Path]) -> ClaimCountSummary:
     counted_rows = 0
 
     for lks_path in lks_paths:
-        file_counts: dict[str, list[float]] = {team_code: [0.0] * 6 for team_code in VALID_TEAM_CODES}
-        file_kiv_counts: dict[str, list[float]] = {team_code: [0.0, 0.0] for team_code in VALID_TEAM_CODES}
-        file_total_rows = 0
-        file_counted_rows = 0
-        workbook = load_workbook(lks_path, read_only=True, data_only=True)
-        try:
-            if "CLAIM" not in workbook.sheetnames:
-                warnings.append(f"{lks_path.name}: missing CLAIM sheet.")
-                continue
-
-            worksheet = workbook["CLAIM"]
-            header_row, column_map = _find_claim_header_row(worksheet)
-
-            for row_idx in range(header_row + 1, worksheet.max_row + 1):
-                team_code = _normalize_team_code(worksheet.cell(row=row_idx, column=column_map["labor"]).value or "")
-                phase = _normalize_phase(worksheet.cell(row=row_idx, column=column_map["voltage"]).value)
-                day_type = _normalize_day_type(worksheet.cell(row=row_idx, column=column_map["day_type"]).value)
-                remarks_2 = _as_text(
-                    worksheet.cell(row=row_idx, column=column_map.get("remarks_2", 0)).value
-                ).upper() if column_map.get("remarks_2") else ""
-                is_kiv = "KIV" in remarks_2
-
-                total_rows += 1
-                file_total_rows += 1
-                if team_code is None or phase is None:
-                    continue
+        if cache is not None:
+            # File name is part of the key: it is shown in the per-file summary;
+            # the holiday list is too, since it decides which rows count as Cuti Umum
+            holiday_file = Path(HOLIDAY_FILE)
+            inputs = (Path(lks_path), lks_path.name, holiday_file if holiday_file.exists() else None, fill_day_types)
+            file_summary = cache.fetch("claim_counts", inputs, lambda: _count_claim_file(lks_path, fill_day_types))
+        else:
+            file_summary = _count_claim_file(lks_path, fill_day_types)
+        if file_summary is None:
+            warnings.append(f"{lks_path.name}: missing CLAIM sheet.")
+            continue
 
-                if is_kiv:
-                    kiv_index = 0 if phase == "PH1" else 1
-                    kiv_counts[team_code][kiv_index] += 1.0
-                    file_kiv_counts[team_code][kiv_index] += 1.0
-                else:
-                    if day_type is None:
-                        continue
-                    column = DAY_TYPE_TO_COLUMN.get((day_type.upper(), phase))
-                    if column is None:
-                        continue
-
-                    count_index = COUNT_CELL_ORDER.index(column)
-                    counts[team_code][count_index] += 1.0
-                    file_counts[team_code][count_index] += 1.0
-                counted_rows += 1
-                file_counted_rows += 1
-        finally:
-            workbook.close()
-
-        file_summaries.append(
-            FileClaimSummary(
-                file_name=lks_path.name,
-                total_rows=file_total_rows,
-                counted_rows=file_counted_rows,
-                skipped_rows=file_total_rows - file_counted_rows,
-                counts_by_team={team_code: tuple(values) for team_code, values in file_counts.items()},
-                kiv_counts_by_team={team_code: tuple(values) for team_code, values in file_kiv_counts.items()},
-            )
-        )
+        for team_code in VALID_TEAM_CODES:
+            for index, value in enumerate(file_summary.counts_by_team[team_code]):
+                counts[team_code][index] += value
+            for index, value in enumerate(file_summary.kiv_counts_by_team[team_code]):
+                kiv_counts[team_code][index] += value
+        total_rows += file_summary.total_rows
+        counted_rows += file_summary.counted_rows
+        file_summaries.append(file_summary)
+        if file_summary.calendar_mismatches:
+            warnings.append(_mismatch_warning(file_summary))
 
     return ClaimCountSummary(
         source_files=len(lks_paths),
@@ -450,8 +544,9 @@ def create_calculation_workbook(
     salary_month: str,
     payment_date: date,
     lks_paths: list[Path],
+    cache: ArtifactCache | None = None,
 ) -> tuple[Path, ClaimCountSummary]:
-    claim_summary = load_claim_counts(lks_paths)
+    claim_summary = load_claim_counts(lks_paths, cache=cache)
     workbook = load_workbook(template_path)
     try:
         worksheet = workbook[workbook.sheetnames[0]]
@@ -863,6 +958,7 @@ def generate_payslips(
     lks_paths: list[Path] | None = None,
 ) -> PayslipGenerationResult:
     run_output_dir = _build_output_root(output_dir, payment_date, salary_month)
+    cache = ArtifactCache()
 
     claim_summary: ClaimCountSummary | None = None
     effective_calc_path = calc_path
@@ -873,10 +969,11 @@ def generate_payslips(
             salary_month=salary_month,
             payment_date=payment_date,
             lks_paths=lks_paths,
+            cache=cache,
         )
         recalculate_workbook(effective_calc_path)
 
-    team_members, supervisor = load_worker_master(master_path)
+    team_members, supervisor = load_worker_master(master_path, cache=cache)
     calculations, supervisor_calc = load_calculation(effective_calc_path)
     entries, warnings = build_entries(
         calculations=calculations,
@@ -910,4 +1007,5 @@ def generate_payslips(
         pdf_failures=pdf_failures,
         calculation_workbook_path=effective_calc_path if lks_paths else None,
         claim_summary=claim_summary,
+        cache_summary=cache.summary(),
     )
@@ -0,0 +1,196 @@
+# core/services/photo_dates.py — EXIF capture dates of attachment photos
+"""
+Capture date (EXIF DateTimeOriginal) of the photos behind the Attachments
+URL links, used as the override date of DateEngine.calculate.
+
+Only the start of each photo is downloaded: the EXIF block sits in the
+JPEG APP1 segment right after the file header, so a ranged GET of
+EXIF_FETCH_BYTES usually holds it (a longer segment is fetched in a second
+request). Requests share one pooled session across HTTP_MAX_WORKERS
+threads. Results, including "no EXIF date", are kept per URL in a
+SqliteCache table, so a URL is fetched once across runs; network errors
+are not cached and are retried on the next run.
+"""
+import io
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from PIL import ExifTags, Image
+
+from core.http_client import fetch_head, pooled_session
+from core.sqlite_cache import SqliteCache
+from config import EXIF_FETCH_BYTES, HTTP_MAX_WORKERS, HTTP_TIMEOUT
+
+EXIF_MAX_BYTES = 256 * 1024     # Give up on photos whose EXIF block ends later than this
+EXIF_DATE_FORMAT = "%Y:%m:%d %H:%M:%S"
+
+_DATE_TIME_ORIGINAL = 0x9003
+_DATE_TIME_DIGITIZED = 0x9004
+_DATE_TIME = 0x0132
+_EXIF_HEADER = b"Exif\x00\x00"
+
+
+def exif_segment(data):
+    """
+    (APP1 Exif payload, None) of a JPEG's leading bytes, or (None, bytes needed)
+    when `data` stops inside the header segments. (None, None) means the
+    file has no EXIF block (or is not a JPEG).
+    """
+    if data[:2] != b"\xff\xd8":
+        return None, None
+    pos = 2
+    while pos + 4 <= len(data):
+        if data[pos] != 0xFF:
+            return None, None
+        marker = data[pos + 1]
+        if marker == 0xFF:          # fill byte
+            pos += 1
+            continue
+        if marker in (0xD9, 0xDA):  # end of image / start of scan: no more metadata
+            return None, None
+        end = pos + 2 + int.from_bytes(data[pos + 2:pos + 4], "big")
+        if marker == 0xE1 and data[pos + 4:pos + 10] == _EXIF_HEADER[:len(data) - pos - 4]:
+            if end > len(data):
+                return None, end
+            return data[pos + 4:end], None
+        pos = end
+    return None, pos + 4
+
+
+def _exif_date(exif):
+    """DateTimeOriginal, then DateTimeDigitized, then DateTime of a PIL Exif (None if none parse)."""
+    try:
+        ifd = exif.get_ifd(ExifTags.IFD.Exif)
+    except Exception:
+        ifd = {}
+    for text in (ifd.get(_DATE_TIME_ORIGINAL), ifd.get(_DATE_TIME_DIGITIZED), exif.get(_DATE_TIME)):
+        if isinstance(text, bytes):
+            text = text.decode("ascii", "ignore")
+        try:
+            return datetime.strptime(str(text).strip("\x00 "), EXIF_DATE_FORMAT)
+        except ValueError:
+            continue
+    return None
+
+
+def exif_datetime(payload):
+    """Capture datetime in an APP1 Exif payload."""
+    exif = Image.Exif()
+    try:
+        exif.load(payload)
+    except Exception:
+        return None
+    return _exif_date(exif)
+
+
+def photo_datetime(data):
+    """Capture datetime of a photo file, or of its leading bytes (None when it carries none)."""
+    if data[:2] == b"\xff\xd8":
+        payload, _ = exif_segment(data)
+        return exif_datetime(payload) if payload is not None else None
+    try:
+        # Not a JPEG (PNG, WebP...): let Pillow find the EXIF block
+        with Image.open(io.BytesIO(data)) as image:
+            return _exif_date(image.getexif())
+    except Exception:
+        return None
+
+
+def date_text(value):
+    """Cache text of a date or datetime (None -> "")."""
+    if not value:
+        return ""
+    return value.isoformat(sep=" ") if isinstance(value, datetime) else value.isoformat()
+
+
+def text_date(text):
+    """datetime of date_text's result ("" -> None)."""
+    return datetime.fromisoformat(text) if text else None
+
+
+class PhotoDateReader:
+    """
+    Reads EXIF capture dates of many photo URLs concurrently.
+
+    `fetched`, `cached` and `failed` count the URLs of the last `read`
+    so the run log can report them.
+    """
+
+    def __init__(self, cache=None, session=None, max_workers=HTTP_MAX_WORKERS,
+                 fetch_bytes=EXIF_FETCH_BYTES, timeout=HTTP_TIMEOUT):
+        self.cache = cache if cache is not None else SqliteCache("photo_dates")
+        self.session = session
+        self.max_workers = max_workers
+        self.fetch_bytes = fetch_bytes
+        self.timeout = timeout
+        self.fetched = self.cached = self.failed = 0
+
+    def fetch(self, session, url):
+        """Capture datetime of one photo URL (None when it has no EXIF date)."""
+        size = self.fetch_bytes
+        while True:
+            data = fetch_head(session, url, size, self.timeout)
+            _, needed = exif_segment(data)
+            if needed is None:
+                return photo_datetime(data)
+            if len(data) < size or size >= EXIF_MAX_BYTES:
+                return None     # whole file read, or EXIF block too far in
+            size = min(max(needed, size * 2), EXIF_MAX_BYTES)
+
+    def read(self, urls, progress_cb=None):
+        """{url: datetime | None} for every non-empty URL in `urls`."""
+        urls = list(dict.fromkeys(u for u in urls if u))
+        results = {url: text_date(text) for url, text in self.cache.get_many(urls).items()}
+        self.cached = len(results)
+        pending = [u for u in urls if u not in results]
+        self.fetched = self.failed = 0
+        if not pending:
+            return results
+
+        session = self.session or pooled_session(self.max_workers)
+        fresh = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {pool.submit(self.fetch, session, url): url for url in pending}
+                for done, future in enumerate(as_completed(futures), 1):
+                    url = futures[future]
+                    try:
+                        fresh[url] = future.result()
+                        self.fetched += 1
+                    except Exception:
+                        # Unreachable photo: no override date this run, retried next run
+                        results[url] = None
+                        self.failed += 1
+                    if progress_cb:
+                        progress_cb(done, len(pending))
+        finally:
+            if self.session is None:
+                session.close()
+            self.cache.put_many({url: date_text(taken) for url, taken in fresh.items()})
+        results.update(fresh)
+        return results
+
+    def so_dates(self, url_map, sos, progress_cb=None):
+        """{so: capture datetime} for the SOs whose photos carry one."""
+        return dates_by_so(self.read, url_map, sos, progress_cb)
+
+
+def candidate_urls(imgs):
+    """Photos of one url_map entry whose date counts, in order: NEW meter, then OLD meter."""
+    return [u for u in (imgs.get("new"), imgs.get("old") or imgs.get("first")) if u]
+
+
+def dates_by_so(read, url_map, sos, progress_cb=None):
+    """
+    {so: date} from a reader's `read(urls, progress_cb)` ({url: datetime | None}):
+    the first of an SO's candidate_urls with a date wins.
+    """
+    candidates = {so: candidate_urls(url_map.get(so, {})) for so in sos}
+    found = read((u for urls in candidates.values() for u in urls), progress_cb)
+    dates = {}
+    for so, urls in candidates.items():
+        for url in urls:
+            if found.get(url):
+                dates[so] = found[url]
+                break
+    return dates
@@ -0,0 +1,213 @@
+# core/services/photo_hashes.py — the same photo uploaded for several SOs
+"""
+Perceptual hashes (dHash, 64 bits) of the OLD meter, CARD and NEW meter
+photos, used to flag SOs whose photo is a copy (or a re-encode, resize or
+light crop) of another SO's photo.
+
+Photos are downloaded over one pooled session (HTTP_MAX_WORKERS threads)
+and hashed in worker processes; hashes are cached per URL in a SqliteCache
+table, so a photo is downloaded and hashed once. The hashes of every run
+are kept in PHOTO_HASH_ARCHIVE (a NumPy .npz), and the photos of a run are
+compared with each other and with that archive by Hamming distance, one
+COMPARE_BLOCK x INDEX_BLOCK tile at a time.
+"""
+import hashlib
+import io
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from core.http_client import fetch_body, pooled_session
+from core.process_pool import StagePool
+from core.sqlite_cache import SqliteCache
+from config import HTTP_MAX_WORKERS, HTTP_TIMEOUT, OCR_MAX_WORKERS, PHASH_MAX_DISTANCE, PHOTO_HASH_ARCHIVE
+
+HASH_SIZE = 8           # dHash grid: HASH_SIZE x HASH_SIZE bits
+BATCH_SIZE = 256        # Photos downloaded and hashed per round (bounds memory)
+COMPARE_BLOCK = 1024    # Photos of the run compared per tile
+INDEX_BLOCK = 4096      # Indexed photos compared per tile (tiles bound the temporaries, not the index size)
+
+_POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def dhash(image, size=HASH_SIZE):
+    """Difference hash of a PIL image: 1 where a pixel is brighter than its left neighbour."""
+    image.draft("L", (size * 8, size * 8))   # JPEG: decode at reduced scale
+    gray = ImageOps.exif_transpose(image).convert("L").resize((size + 1, size), Image.LANCZOS)
+    pixels = np.asarray(gray, dtype=np.int16)
+    bits = np.packbits((pixels[:, 1:] > pixels[:, :-1]).ravel())
+    return int.from_bytes(bits.tobytes(), "big")
+
+
+def photo_hash(data):
+    """
+    dHash of a photo file as 16 hex digits ("" when the bytes are not an image).
+
+    Module-level so process pool workers can run it.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            return f"{dhash(image):016x}"
+    except Exception:
+        return ""
+
+
+def hamming(a, b):
+    """(len(a), len(b)) bit distances between two uint64 hash arrays."""
+    x = a[:, None] ^ b[None, :]
+    if hasattr(np, "bitwise_count"):   # NumPy 2
+        return np.bitwise_count(x)
+    return _POPCOUNT8[x.view(np.uint8)].reshape(*x.shape, 8).sum(axis=-1, dtype=np.uint8)
+
+
+class PhotoHashIndex:
+    """Photo hashes with the SO, slot and URL each belongs to (parallel arrays)."""
+
+    def __init__(self, hashes=(), sos=(), slots=(), urls=()):
+        self.hashes = np.asarray(hashes, dtype=np.uint64)
+        self.sos = np.asarray(sos, dtype=str)
+        self.slots = np.asarray(slots, dtype=str)
+        self.urls = np.asarray(urls, dtype=str)
+
+    def __len__(self):
+        return len(self.hashes)
+
+    @classmethod
+    def load(cls, path=PHOTO_HASH_ARCHIVE):
+        """Archived index (empty when the file is missing or unreadable)."""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                return cls(data["hashes"], data["sos"], data["slots"], data["urls"])
+        except (OSError, KeyError, ValueError):
+            return cls()
+
+    def save(self, path=PHOTO_HASH_ARCHIVE):
+        path = Path(path)
+        tmp = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as handle:
+                np.savez(handle, hashes=self.hashes, sos=self.sos, slots=self.slots, urls=self.urls)
+            os.replace(tmp, path)
+        except OSError:
+            # Only this run's photos are missing from the next comparison
+            if tmp is not None:
+                Path(tmp).unlink(missing_ok=True)
+
+    def without_sos(self, sos):
+        keep = ~np.isin(self.sos, np.asarray(list(sos), dtype=str))
+        return PhotoHashIndex(self.hashes[keep], self.sos[keep], self.slots[keep], self.urls[keep])
+
+    def merged(self, other):
+        """This index with `other`'s SOs replaced by `other`'s entries."""
+        base = self.without_sos(set(other.sos.tolist()))
+        return PhotoHashIndex(
+            np.concatenate([base.hashes, other.hashes]), np.concatenate([base.sos, other.sos]),
+            np.concatenate([base.slots, other.slots]), np.concatenate([base.urls, other.urls]),
+        )
+
+    def near_pairs(self, other, max_distance=PHASH_MAX_DISTANCE):
+        """(i, j) arrays of the entries of self and other whose hashes are within max_distance bits."""
+        found_i, found_j = [], []
+        for start in range(0, len(self), COMPARE_BLOCK):
+            block = self.hashes[start:start + COMPARE_BLOCK]
+            for other_start in range(0, len(other), INDEX_BLOCK):
+                tile = other.hashes[other_start:other_start + INDEX_BLOCK]
+                i, j = np.nonzero(hamming(block, tile) <= max_distance)
+                found_i.append(i + start)
+                found_j.append(j + other_start)
+        if not found_i:
+            return np.array([], dtype=np.intp), np.array([], dtype=np.intp)
+        return np.concatenate(found_i), np.concatenate(found_j)
+
+
+def reused_photos(run, archive, max_distance=PHASH_MAX_DISTANCE):
+    """
+    {so: ["card = SO 123 new_meter", ...]} for the SOs of `run` with a photo
+    matching another SO's photo, in this run or in `archive`.
+    """
+    detail = {}
+    for other, suffix in ((run, ""), (archive.without_sos(set(run.sos.tolist())), " (earlier run)")):
+        i, j = run.near_pairs(other, max_distance)
+        keep = run.sos[i] != other.sos[j]
+        for a, b in zip(i[keep], j[keep]):
+            note = f"{run.slots[a]} = SO {other.sos[b]} {other.slots[b]}{suffix}"
+            detail.setdefault(str(run.sos[a]), {})[note] = None    # ordered set of notes
+    return {so: list(notes) for so, notes in detail.items()}
+
+
+class PhotoHasher:
+    """
+    Perceptual hashes of many photo URLs.
+
+    `hashed`, `cached` and `failed` count the URLs of the last `hashes`
+    call so the run log can report them.
+    """
+
+    def __init__(self, cache=None, session=None, max_workers=OCR_MAX_WORKERS,
+                 download_workers=HTTP_MAX_WORKERS, timeout=HTTP_TIMEOUT):
+        self.cache = cache if cache is not None else SqliteCache("photo_hashes")
+        self.session = session
+        self.max_workers = max_workers
+        self.download_workers = download_workers
+        self.timeout = timeout
+        self.hashed = self.cached = self.failed = 0
+
+    def _download(self, session, urls):
+        """{url: bytes} of the URLs that could be downloaded."""
+        def get(url):
+            try:
+                return url, fetch_body(session, url, self.timeout)
+            except Exception:
+                return url, None
+
+        with ThreadPoolExecutor(max_workers=self.download_workers) as pool:
+            return {url: data for url, data in pool.map(get, urls) if data is not None}
+
+    def hashes(self, urls, progress_cb=None):
+        """{url: hash} for the non-empty URLs in `urls` that hold an image."""
+        urls = list(dict.fromkeys(u for u in urls if u))
+        texts = self.cache.get_many(urls)
+        self.cached = len(texts)
+        self.hashed = self.failed = 0
+        pending = [u for u in urls if u not in texts]
+
+        if pending:
+            session = self.session or pooled_session(self.download_workers)
+            # One pool for every batch: spawned workers are started (and import the app) once
+            workers = StagePool(self.max_workers)
+            try:
+                for start in range(0, len(pending), BATCH_SIZE):
+                    batch = pending[start:start + BATCH_SIZE]
+                    bodies = self._download(session, batch)
+                    self.failed += len(batch) - len(bodies)
+                    # Same bytes behind several URLs: hashed once
+                    jobs = {hashlib.sha256(data).hexdigest(): data for data in bodies.values()}
+                    hashed = dict(zip(jobs, workers.map(photo_hash, [(d,) for d in jobs.values()])))
+                    fresh = {url: hashed[hashlib.sha256(data).hexdigest()] for url, data in bodies.items()}
+                    self.hashed += len(fresh)
+                    texts.update(fresh)
+                    self.cache.put_many(fresh)
+                    if progress_cb:
+                        progress_cb(min(start + BATCH_SIZE, len(pending)), len(pending))
+            finally:
+                workers.close()
+                if self.session is None:
+                    session.close()
+        # "" marks a URL that is not an image
+        return {url: int(text, 16) for url, text in texts.items() if text}
+
+    def index(self, entries, progress_cb=None):
+        """PhotoHashIndex of (so, slot, url) entries (photos that could not be hashed left out)."""
+        entries = [(so, slot, url) for so, slot, url in entries if url]
+        found = self.hashes((url for _, _, url in entries), progress_cb)
+        entries = [(so, slot, url) for so, slot, url in entries if url in found]
+        return PhotoHashIndex(
+            [found[url] for _, _, url in entries],
+            [so for so, _, _ in entries], [slot for _, slot, _ in entries], [url for _, _, url in entries],
+        )
@@ -0,0 +1,55 @@
+# core/services/preview.py — dry run of run_process from the key columns only
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from core.raw_dataset import RawDataset
+from core.so_ledger import workbook_sos
+from core.services.claim_service import ClaimService
+from core.services.ingest import collect_inputs, sheets_to_read
+from config import COL_3MS_SO, COL_ADDRESS, COL_STATUS_DATE, COL_TECHNICIAN, COL_USER_STATUS
+
+# RAW columns a preview reads (Address only feeds the missing-address count)
+PREVIEW_COLUMNS = frozenset({COL_3MS_SO, COL_USER_STATUS, COL_STATUS_DATE, COL_TECHNICIAN, COL_ADDRESS})
+
+
+def preview(data_path, template_path, sheet_name=None):
+    """
+    What run_process would do with these inputs, without writing anything.
+
+    Reads PREVIEW_COLUMNS of the RAW export(s) (a file, folder or list, as
+    run_process accepts) and only the SO column of the template's CLAIM
+    sheet; the .xlsm is never loaded. `stats` is the dict run_process
+    reports (TRAS, duplicates, invalid dates...), computed by the same
+    ClaimService code.
+    """
+    batch = isinstance(data_path, (list, tuple)) or Path(data_path).is_dir()
+    input_paths = collect_inputs(data_path) if batch else [Path(data_path)]
+    if not input_paths:
+        raise ValueError(f"No RAW data files were found in {data_path}.")
+    legacy = [path.name for path in input_paths if path.suffix.lower() == ".xls"]
+    if legacy:
+        raise ValueError(f"Preview needs .xlsx exports; run the legacy .xls file(s) once to convert: {', '.join(legacy)}")
+
+    parts = []
+    for path in input_paths:
+        for sheet in sheets_to_read(path, sheet_name):
+            dataset = RawDataset.load(path, sheet, columns=PREVIEW_COLUMNS)
+            parts.append(ClaimService.group_dataset(dataset))
+    groups = ClaimService.combine_groups(parts)
+    if groups.empty: raise ValueError("RAW DATA has no valid SO rows.")
+    rows, stats = ClaimService.finalize_groups(groups)
+
+    existing = workbook_sos(template_path)
+    dates = [row.status_date for row in rows if isinstance(row.status_date, datetime)]
+
+    return {
+        "input_files": len(input_paths),
+        "stats": stats,
+        "new_sos": sum(1 for row in rows if row.so not in existing),       # rows run_process would add
+        "existing_sos": len({row.so for row in rows} & existing),
+        "template_sos": len(existing),
+        "first_date": min(dates) if dates else None,
+        "last_date": max(dates) if dates else None,
+        "technicians": dict(Counter(row.labor for row in rows if row.labor).most_common()),
+    }
@@ -1,9 +1,32 @@
 from openpyxl.styles import PatternFill, Alignment
-from core.so_utils import clean_so
+from core.so_utils import sheet_sos
+from core.services.link_checker import status_label
 from config import ATTACH_SHEET_NAME, CLAIM_SHEET_NAME
 
 RED_FILL = PatternFill(start_color="FF0000", end_color="FF0000", fill_type="solid")
 CENTER = Alignment(horizontal="center", vertical="center", wrap_text=True)
+IMAGE_SLOTS = ("old_meter", "card", "new_meter")   # ATTACHMENT columns 4, 5, 6
+_COUNT_KEYS = {"old_meter": "old", "card": "card", "new_meter": "new"}
+
+
+def _apply_style(ws, rows, attr, style):
+    """Sets one style attribute (cell.fill, cell.alignment...) of `rows` across the sheet's used columns."""
+    # ws[r] recomputes max_column (a pass over every cell) on each call
+    last_col = ws.max_column
+    for r in rows:
+        for c in range(1, last_col + 1):
+            setattr(ws.cell(r, c), attr, style)
+
+
+def highlight_rows(ws, rows):
+    """Fills `rows` RED across the sheet's used columns."""
+    _apply_style(ws, rows, "fill", RED_FILL)
+
+
+def center_rows(ws, rows):
+    """Centers `rows` across the sheet's used columns."""
+    _apply_style(ws, rows, "alignment", CENTER)
+
 
 class QualityControl:
     @staticmethod
@@ -15,8 +38,8 @@ class QualityControl:
         
         col_old, col_card, col_new = 4, 5, 6
         
-        for r in range(3, wsA.max_row + 1):
-            so = clean_so(wsA.cell(r, 2).value)
+        rows = range(3, wsA.max_row + 1)
+        for r, so in zip(rows, sheet_sos(wsA, rows, 2)):
             if not so: continue
 
             slots = []
@@ -35,6 +58,60 @@ class QualityControl:
 
         return missing_detail, counts
 
+    @staticmethod
+    def analyze_written(written):
+        """
+        analyze_missing for the rows ImageInjector.run just wrote, from the
+        URLs it wrote ((row, so, urls) entries) instead of the sheet cells.
+        """
+        missing_detail = {}
+        counts = {"old": 0, "card": 0, "new": 0}
+        for _, so, urls in written:
+            slots = [slot for slot, url in zip(IMAGE_SLOTS, urls) if not url]
+            for slot in slots:
+                counts[_COUNT_KEYS[slot]] += 1
+            if slots:
+                missing_detail[so] = slots
+        return missing_detail, counts
+
+    @staticmethod
+    def written_links(written, rows=None):
+        """image_links of ImageInjector.run's result (`rows` limits it), without reading the cells."""
+        rows = set(rows) if rows is not None else None
+        links = {}
+        for r, so, urls in written:
+            if rows is None or r in rows:
+                slots = {slot: url for slot, url in zip(IMAGE_SLOTS, urls) if url}
+                if slots:
+                    links.setdefault(so, {}).update(slots)
+        return links
+
+    @staticmethod
+    def analyze_broken(links, broken_status):
+        """
+        SOs whose image links are broken: ({so: ["card (404)", ...]}, broken link count).
+
+        `broken_status` is {url: status} of the links that did not resolve
+        (LinkChecker.broken).
+        """
+        broken_detail = {}
+        count = 0
+        for so, slots in links.items():
+            for slot, url in slots.items():
+                if url in broken_status:
+                    broken_detail.setdefault(so, []).append(f"{slot} ({status_label(broken_status[url])})")
+                    count += 1
+        return broken_detail, count
+
+    @staticmethod
+    def merge_details(*details):
+        """{so: slots} of several analyses combined (slots concatenated in order)."""
+        merged = {}
+        for detail in details:
+            for so, slots in detail.items():
+                merged.setdefault(so, []).extend(slots)
+        return merged
+
     @staticmethod
     def mark_defective(handler, missing_detail):
         """Highlights defective rows in RED."""
@@ -42,25 +119,43 @@ class QualityControl:
         wsC = handler.ws_claim
         wsA = handler.ws_attach
 
-        # Helper to highlight row
-        def highlight_row(ws, r):
-            for cell in ws[r]:
-                cell.fill = RED_FILL
+        # CLAIM, then ATTACHMENT
+        for ws in (wsC, wsA):
+            rows = range(3, ws.max_row + 1)
+            highlight_rows(ws, [r for r, so in zip(rows, sheet_sos(ws, rows, 2)) if so in defective_set])
 
-        # CLAIM
-        for r in range(3, wsC.max_row + 1):
-            if clean_so(wsC.cell(r, 2).value) in defective_set:
-                highlight_row(wsC, r)
+    @staticmethod
+    def mark_rows(handler, defective_detail, ledger, written=()):
+        """
+        mark_defective without scanning the sheets: the CLAIM row of each SO
+        comes from the ledger, its ATTACHMENT rows from `written`
+        (ImageInjector.run's result) or else the ledger.
+        """
+        attach_rows = {}
+        for r, so, _ in written:
+            if so in defective_detail:
+                attach_rows.setdefault(so, []).append(r)
 
-        # ATTACHMENT
-        for r in range(3, wsA.max_row + 1):
-            if clean_so(wsA.cell(r, 2).value) in defective_set:
-                highlight_row(wsA, r)
+        claim_rows, attach_rows_all = [], []
+        for so in defective_detail:
+            claim_row, attach_row = ledger.rows(so) if so in ledger else (None, None)
+            if claim_row:
+                claim_rows.append(claim_row)
+            attach_rows_all.extend(attach_rows.get(so) or ([attach_row] if attach_row else []))
+        highlight_rows(handler.ws_claim, claim_rows)
+        highlight_rows(handler.ws_attach, attach_rows_all)
 
     @staticmethod
     def format_all(handler):
         """Applies center alignment to all cells."""
         for ws in [handler.ws_claim, handler.ws_attach]:
-            for r in range(3, ws.max_row + 1):
-                for c in range(1, ws.max_column + 1):
-                    ws.cell(row=r, column=c).alignment = CENTER
+            center_rows(ws, range(3, ws.max_row + 1))
+
+    @staticmethod
+    def format_rows(handler, claim_rows, attach_rows):
+        """
+        format_all for the rows written this run only; rows of earlier runs
+        keep the alignment they were saved with.
+        """
+        center_rows(handler.ws_claim, sorted(set(claim_rows)))
+        center_rows(handler.ws_attach, sorted(set(attach_rows)))
@@ -0,0 +1,128 @@
+# core/services/thumbnails.py — local thumbnails of attachment photos
+"""
+Downscaled copies of the photos behind the Attachments URL links, embedded
+into the ATTACHMENT sheet in IMAGE_MODE "embedded" so the workbook opens
+without fetching full-size photos over the network.
+
+Photos are downloaded over one pooled session (HTTP_MAX_WORKERS threads)
+and shrunk with Pillow to fit THUMB_SIZE. Thumbnails are stored under
+THUMB_DIR by SHA-256 of the original photo, so one photo behind several
+URLs is stored once; the URL -> hash map is a SqliteCache table, so a URL
+whose thumbnail exists is never downloaded again.
+"""
+import hashlib
+import io
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+from core.http_client import fetch_body, pooled_session
+from core.sqlite_cache import SqliteCache
+from config import HTTP_MAX_WORKERS, HTTP_TIMEOUT, THUMB_DIR, THUMB_QUALITY, THUMB_SIZE
+
+
+def make_thumbnail(data, size=THUMB_SIZE, quality=THUMB_QUALITY):
+    """JPEG bytes of a photo shrunk to fit `size` (None when `data` is not an image)."""
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image = ImageOps.exif_transpose(image).convert("RGB")
+            image.thumbnail(size, Image.LANCZOS)
+            out = io.BytesIO()
+            image.save(out, "JPEG", quality=quality, optimize=True)
+    except Exception:
+        return None
+    return out.getvalue()
+
+
+class ThumbnailCache:
+    """
+    Thumbnail files of many photo URLs.
+
+    `fetched`, `cached` and `failed` count the URLs of the last `paths`
+    call so the run log can report them.
+    """
+
+    def __init__(self, directory=THUMB_DIR, size=THUMB_SIZE, quality=THUMB_QUALITY, url_cache=None,
+                 session=None, max_workers=HTTP_MAX_WORKERS, timeout=HTTP_TIMEOUT):
+        width, height = size
+        # Thumbnails of another size are kept apart, so changing THUMB_SIZE never reuses them
+        self.directory = Path(directory) / f"{width}x{height}"
+        self.size = size
+        self.quality = quality
+        self.url_cache = url_cache if url_cache is not None else SqliteCache("thumb_url_hashes")
+        self.session = session
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.fetched = self.cached = self.failed = 0
+
+    def path_of(self, digest):
+        return self.directory / digest[:2] / f"{digest}.jpg"
+
+    def _store(self, digest, thumb):
+        path = self.path_of(digest)
+        if path.exists():
+            return path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(thumb)
+            os.replace(tmp, path)
+        except OSError:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        return path
+
+    def fetch(self, session, url):
+        """(photo hash, thumbnail path) of one URL (path None when it is not an image)."""
+        data = fetch_body(session, url, self.timeout)
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_of(digest)
+        if not path.exists():
+            thumb = make_thumbnail(data, self.size, self.quality)
+            if thumb is None:
+                return digest, None
+            path = self._store(digest, thumb)
+        return digest, path
+
+    def paths(self, urls, progress_cb=None):
+        """{url: thumbnail path} for the non-empty URLs in `urls` that hold an image."""
+        urls = list(dict.fromkeys(u for u in urls if u))
+        results = {}
+        for url, digest in self.url_cache.get_many(urls).items():
+            path = self.path_of(digest)
+            if path.exists():
+                results[url] = path
+        self.cached = len(results)
+        pending = [u for u in urls if u not in results]
+        self.fetched = self.failed = 0
+        if not pending:
+            return results
+
+        session = self.session or pooled_session(self.max_workers)
+        digests = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {pool.submit(self.fetch, session, url): url for url in pending}
+                for done, future in enumerate(as_completed(futures), 1):
+                    url = futures[future]
+                    try:
+                        digest, path = future.result()
+                    except Exception:
+                        # Unreachable photo: its cell keeps the link, retried next run
+                        self.failed += 1
+                    else:
+                        self.fetched += 1
+                        if path is not None:
+                            digests[url] = digest
+                            results[url] = path
+                    if progress_cb:
+                        progress_cb(done, len(pending))
+        finally:
+            if self.session is None:
+                session.close()
+            self.url_cache.put_many(digests)
+        return results
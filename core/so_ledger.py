@@ -0,0 +1,185 @@
+# core/so_ledger.py — persistent SO index for LKS workbooks
+"""
+SQLite sidecar ("<workbook>.ledger") recording every SO in a workbook with
+its CLAIM and ATTACHMENT row and the content hash of what was written
+there (see ClaimService.row_hash), plus the next append row of each sheet.
+
+run_process uses it instead of scanning column B for duplicate SOs and
+for the first empty row. The ledger stores the size and mtime of the
+workbook it describes; when the workbook changed outside this tool (or
+the ledger is missing/unreadable) it is rebuilt from the loaded sheets.
+"""
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+from core.so_utils import clean_so, clean_so_column
+from config import CLAIM_SHEET_NAME, DATA_START_ROW, SERVICE_ORDER_COL_IDX
+
+LEDGER_SCHEMA = 2
+LEDGER_SUFFIX = ".ledger"
+
+EMPTY_VALUES = (None, "", " ")
+
+
+def next_empty_row(worksheet, start=DATA_START_ROW, col=SERVICE_ORDER_COL_IDX):
+    """First row from `start` whose SO cell is empty (the row below the sheet when none is)."""
+    values = worksheet.iter_rows(min_row=start, min_col=col, max_col=col, values_only=True)
+    for row_index, (value,) in enumerate(values, start):
+        if value in EMPTY_VALUES:
+            return row_index
+    return max(worksheet.max_row + 1, start)
+
+
+def _scan_sheet(worksheet):
+    """({so: first row}, next empty row) in one pass over column B."""
+    rows = {}
+    next_row = None
+    cells = worksheet.iter_rows(
+        min_row=DATA_START_ROW, min_col=SERVICE_ORDER_COL_IDX, max_col=SERVICE_ORDER_COL_IDX, values_only=True
+    )
+    values = [value for (value,) in cells]
+    for row_index, (value, so) in enumerate(zip(values, clean_so_column(values)), DATA_START_ROW):
+        if next_row is None and value in EMPTY_VALUES:
+            next_row = row_index
+        if so and so not in rows:
+            rows[so] = row_index
+    if next_row is None:
+        next_row = max(worksheet.max_row + 1, DATA_START_ROW)
+    return rows, next_row
+
+
+def _fingerprint(workbook_path):
+    stat = Path(workbook_path).stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class SoLedger:
+    """In-memory view of a ledger: SO -> (CLAIM row, ATTACHMENT row, row hash) and the append rows."""
+
+    def __init__(self, entries=None, next_claim=DATA_START_ROW, next_attach=DATA_START_ROW):
+        self.entries = entries if entries is not None else {}
+        self.next_claim = next_claim
+        self.next_attach = next_attach
+
+    def __contains__(self, so):
+        return so in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def path_for(workbook_path):
+        workbook_path = Path(workbook_path)
+        return workbook_path.with_name(workbook_path.name + LEDGER_SUFFIX)
+
+    @classmethod
+    def from_handler(cls, handler):
+        """
+        Rebuilds the ledger by scanning the loaded CLAIM and ATTACHMENT sheets.
+
+        Row hashes are left unknown (None); they are only read back from
+        the cells when an upsert run needs them.
+        """
+        claim_rows, next_claim = _scan_sheet(handler.ws_claim)
+        attach_rows, next_attach = _scan_sheet(handler.ws_attach)
+        entries = {so: (row, attach_rows.get(so), None) for so, row in claim_rows.items()}
+        return cls(entries, next_claim, next_attach)
+
+    @classmethod
+    def load(cls, workbook_path):
+        """Ledger saved for this exact workbook file, or None if missing or stale."""
+        ledger_path = cls.path_for(workbook_path)
+        if not ledger_path.exists() or not Path(workbook_path).exists():
+            return None
+        try:
+            with closing(sqlite3.connect(ledger_path)) as conn:
+                meta = dict(conn.execute("SELECT key, value FROM meta"))
+                if meta.get("schema") != str(LEDGER_SCHEMA) or meta.get("fingerprint") != _fingerprint(workbook_path):
+                    return None
+                entries = {
+                    so: (claim_row, attach_row, row_hash)
+                    for so, claim_row, attach_row, row_hash
+                    in conn.execute("SELECT so, claim_row, attach_row, row_hash FROM so_rows")
+                }
+            return cls(entries, int(meta["next_claim"]), int(meta["next_attach"]))
+        except (sqlite3.Error, KeyError, ValueError):
+            return None
+
+    @classmethod
+    def open(cls, workbook_path, handler):
+        """(ledger, rebuilt): the saved ledger when current, else one rebuilt from `handler`."""
+        ledger = cls.load(workbook_path)
+        if ledger is not None:
+            return ledger, False
+        return cls.from_handler(handler), True
+
+    def rows(self, so):
+        """(CLAIM row, ATTACHMENT row) of an SO."""
+        return self.entries[so][:2]
+
+    def row_hash(self, so):
+        """Stored content hash of an SO's row (None when unknown)."""
+        return self.entries[so][2]
+
+    def set_hash(self, so, row_hash):
+        claim_row, attach_row, _ = self.entries[so]
+        self.entries[so] = (claim_row, attach_row, row_hash)
+
+    def clear_hashes(self):
+        """Forgets every stored row hash (cells were rewritten without hashing)."""
+        self.entries = {so: (claim_row, attach_row, None) for so, (claim_row, attach_row, _) in self.entries.items()}
+
+    def record(self, sos, start_claim, start_attach, handler, hashes=None):
+        """Adds SOs written from start_claim / start_attach and moves the append rows past them."""
+        hashes = hashes if hashes is not None else [None] * len(sos)
+        for offset, (so, row_hash) in enumerate(zip(clean_so_column(sos), hashes)):
+            if so and so not in self.entries:
+                self.entries[so] = (start_claim + offset, start_attach + offset, row_hash)
+        self.next_claim = next_empty_row(handler.ws_claim, start_claim + len(sos))
+        self.next_attach = next_empty_row(handler.ws_attach, start_attach + len(sos))
+
+    def save(self, workbook_path):
+        """Writes the ledger next to `workbook_path` (call after the workbook is saved)."""
+        ledger_path = self.path_for(workbook_path)
+        tmp_path = ledger_path.with_name(ledger_path.name + ".tmp")
+        tmp_path.unlink(missing_ok=True)
+        try:
+            with closing(sqlite3.connect(tmp_path)) as conn, conn:
+                conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+                conn.execute(
+                    "CREATE TABLE so_rows (so TEXT PRIMARY KEY, claim_row INTEGER, attach_row INTEGER, row_hash TEXT)"
+                )
+                conn.executemany(
+                    "INSERT INTO so_rows VALUES (?, ?, ?, ?)",
+                    ((so, *entry) for so, entry in self.entries.items()),
+                )
+                conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+                    ("schema", str(LEDGER_SCHEMA)),
+                    ("fingerprint", _fingerprint(workbook_path)),
+                    ("next_claim", str(self.next_claim)),
+                    ("next_attach", str(self.next_attach)),
+                ])
+            tmp_path.replace(ledger_path)
+        except (sqlite3.Error, OSError):
+            # Without a ledger the next run simply rescans the workbook
+            tmp_path.unlink(missing_ok=True)
+
+
+def workbook_sos(workbook_path):
+    """
+    SOs on a workbook's CLAIM sheet, without loading the workbook.
+
+    Uses the saved ledger when it is current; otherwise only column B of
+    CLAIM is streamed from the file.
+    """
+    ledger = SoLedger.load(workbook_path)
+    if ledger is not None:
+        return set(ledger.entries)
+
+    from core.xlsx_reader import XlsxReader
+    with XlsxReader(workbook_path) as reader:
+        rows = reader.iter_rows(CLAIM_SHEET_NAME, columns={SERVICE_ORDER_COL_IDX}, min_row=DATA_START_ROW)
+        sos = {clean_so(values.get(SERVICE_ORDER_COL_IDX)) for _, values in rows}
+    sos.discard("")
+    return sos
@@ -1,4 +1,7 @@
 # core/so_utils.py — shared helpers
+import numpy as np
+
+from config import SERVICE_ORDER_COL_IDX
 
 
 def clean_so(value):
@@ -11,6 +14,23 @@ def clean_so(value):
     return s
 
 
+def clean_so_column(values):
+    """
+    clean_so over a whole column (list, array or Series), as an object array.
+
+    A plain loop over the cells: pandas string ops on object columns are
+    not vectorized either, and measured about 2x slower (bench_clean_so.py).
+    """
+    result = np.empty(len(values), dtype=object)
+    result[:] = list(map(clean_so, values))
+    return result
+
+
+def sheet_sos(worksheet, rows, col=SERVICE_ORDER_COL_IDX):
+    """Cleaned SO of each worksheet row in `rows` (same order)."""
+    return [clean_so(worksheet.cell(r, col).value) for r in rows]
+
+
 def is_missing(value) -> bool:
     """True if value is effectively empty."""
     if value is None:
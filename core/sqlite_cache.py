@@ -0,0 +1,61 @@
+# core/sqlite_cache.py — small key/text tables for per-URL and per-image results
+"""
+SQLite tables of key -> text under CACHE_DIR, for results that are looked
+up by the thousand (one row per attachment URL or image hash) rather than
+as one artifact per input file (see core/artifact_cache.py).
+
+Every table lives in the same file. A locked, read-only or corrupt cache
+never fails a run: reads return nothing and writes are dropped.
+"""
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+from config import CACHE_DIR, CACHE_ENABLED
+
+CACHE_FILE = "attachments.sqlite"
+_BATCH = 500    # keys per SELECT (SQLite caps bound parameters)
+
+
+class SqliteCache:
+    """One key -> text table."""
+
+    def __init__(self, table, path=None, enabled=CACHE_ENABLED):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid cache table name {table!r}.")
+        self.table = table
+        self.path = Path(path) if path is not None else Path(CACHE_DIR) / CACHE_FILE
+        self.enabled = enabled
+
+    def _connect(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {self.table} (key TEXT PRIMARY KEY, value TEXT)")
+        return conn
+
+    def get_many(self, keys):
+        """{key: text} for the keys present."""
+        keys = list(keys)
+        if not self.enabled or not keys:
+            return {}
+        found = {}
+        try:
+            with closing(self._connect()) as conn:
+                for start in range(0, len(keys), _BATCH):
+                    batch = keys[start:start + _BATCH]
+                    query = f"SELECT key, value FROM {self.table} WHERE key IN ({','.join('?' * len(batch))})"
+                    found.update(conn.execute(query, batch))
+        except (sqlite3.Error, OSError):
+            return {}
+        return found
+
+    def put_many(self, items):
+        """Stores {key: text}."""
+        if not self.enabled or not items:
+            return
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.executemany(f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?)", items.items())
+        except (sqlite3.Error, OSError):
+            # Only costs the work again next run
+            pass
@@ -0,0 +1,310 @@
+# core/xlsx_reader.py — column-projected .xlsx reader for RAW exports
+"""
+Reads only the wanted columns of one worksheet straight from the .xlsx zip.
+
+The sheet XML is streamed with an incremental parser, cells outside the
+projection are skipped without decoding, and shared strings are resolved
+lazily (the string table is parsed only as far as the highest index a
+projected cell refers to). Values come out the way
+`pd.read_excel(dtype=str)` would produce them, so callers can swap it in
+for `pd.read_excel` without changing downstream logic.
+"""
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+
+import pandas as pd
+from openpyxl.styles.numbers import builtin_format_code, is_date_format, is_timedelta_format
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_excel, from_ISO8601
+
+from core.raw_stream import cell_text, header_names
+
+NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+_ROW = NS_MAIN + "row"
+_CELL = NS_MAIN + "c"
+_VALUE = NS_MAIN + "v"
+_INLINE = NS_MAIN + "is"
+_TEXT = NS_MAIN + "t"
+_RUN = NS_MAIN + "r"
+_SI = NS_MAIN + "si"
+_SST = NS_MAIN + "sst"
+_SHEET_DATA = NS_MAIN + "sheetData"
+
+
+def column_index(letters):
+    """'A' -> 1, 'AB' -> 28."""
+    index = 0
+    for ch in letters:
+        index = index * 26 + (ord(ch) - 64)
+    return index
+
+
+def _string_item(si):
+    """Plain text of a shared/inline string (rich-text runs joined, phonetics skipped)."""
+    parts = []
+    plain = si.find(_TEXT)
+    if plain is not None and plain.text:
+        parts.append(plain.text)
+    for run in si.iter(_RUN):
+        t = run.find(_TEXT)
+        if t is not None and t.text:
+            parts.append(t.text)
+    return "".join(parts)
+
+
+class _SharedStrings:
+    """Shared string table parsed on demand, up to the highest index asked for."""
+
+    def __init__(self, archive, member):
+        self._items = []
+        self._parser = None
+        self._table = None
+        if member in archive.namelist():
+            self._parser = ET.iterparse(archive.open(member), events=("start", "end"))
+
+    def __getitem__(self, index):
+        while index >= len(self._items) and self._parser is not None:
+            try:
+                event, elem = next(self._parser)
+            except StopIteration:
+                self._parser = None
+                break
+            if event == "start":
+                if elem.tag == _SST:
+                    self._table = elem
+            elif elem.tag == _SI:
+                self._items.append(_string_item(elem))
+                # Parsed items are detached, so the tree never holds more than one
+                if self._table is not None:
+                    self._table.remove(elem)
+        return self._items[index]
+
+
+class XlsxReader:
+    """One open .xlsx/.xlsm package; see `read_xlsx` / `iter_xlsx_chunks`."""
+
+    def __init__(self, path):
+        self.path = path
+        self.archive = zipfile.ZipFile(path)
+        self._load_workbook()
+        self._load_styles()
+        self.shared_strings = _SharedStrings(self.archive, "xl/sharedStrings.xml")
+
+    def close(self):
+        self.archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _load_workbook(self):
+        rels = ET.fromstring(self.archive.read("xl/_rels/workbook.xml.rels"))
+        targets = {}
+        for rel in rels.iter(NS_PKG_REL + "Relationship"):
+            target = rel.get("Target")
+            if target.startswith("/"):
+                target = target.lstrip("/")
+            else:
+                target = posixpath.normpath(posixpath.join("xl", target))
+            targets[rel.get("Id")] = target
+
+        workbook = ET.fromstring(self.archive.read("xl/workbook.xml"))
+        pr = workbook.find(NS_MAIN + "workbookPr")
+        date1904 = pr is not None and pr.get("date1904") in ("1", "true")
+        self.epoch = CALENDAR_MAC_1904 if date1904 else CALENDAR_WINDOWS_1900
+
+        self.sheets = []  # (name, zip member) in workbook order
+        for sheet in workbook.iter(NS_MAIN + "sheet"):
+            member = targets.get(sheet.get(NS_REL + "id"))
+            if member and member.startswith("xl/worksheets/"):
+                self.sheets.append((sheet.get("name"), member))
+
+    def _load_styles(self):
+        """Style indices whose number format is a date / timedelta (openpyxl rules)."""
+        self.date_styles = set()
+        self.timedelta_styles = set()
+        if "xl/styles.xml" not in self.archive.namelist():
+            return
+        styles = ET.fromstring(self.archive.read("xl/styles.xml"))
+        custom = {}
+        num_fmts = styles.find(NS_MAIN + "numFmts")
+        if num_fmts is not None:
+            for fmt in num_fmts.iter(NS_MAIN + "numFmt"):
+                custom[int(fmt.get("numFmtId"))] = fmt.get("formatCode")
+        cell_xfs = styles.find(NS_MAIN + "cellXfs")
+        if cell_xfs is None:
+            return
+        for idx, xf in enumerate(cell_xfs.iter(NS_MAIN + "xf")):
+            fmt_id = int(xf.get("numFmtId", 0))
+            code = custom.get(fmt_id) or builtin_format_code(fmt_id)
+            if code and is_date_format(code):
+                self.date_styles.add(idx)
+            if code and is_timedelta_format(code):
+                self.timedelta_styles.add(idx)
+
+    def sheet_member(self, sheet_name=None):
+        if sheet_name is None or sheet_name == 0:
+            return self.sheets[0][1]
+        if isinstance(sheet_name, int):
+            return self.sheets[sheet_name][1]
+        for name, member in self.sheets:
+            if name == sheet_name:
+                return member
+        raise ValueError(f"Worksheet named '{sheet_name}' not found")
+
+    def _value(self, cell):
+        """Cell value as openpyxl (data_only) + pandas' reader would return it."""
+        data_type = cell.get("t", "n")
+        if data_type == "inlineStr":
+            inline = cell.find(_INLINE)
+            return _string_item(inline) if inline is not None else None
+
+        value = cell.findtext(_VALUE) or None
+        if value is None:
+            return None
+        if data_type == "n":
+            value = float(value) if ("." in value or "E" in value or "e" in value) else int(value)
+            style = int(cell.get("s", 0))
+            if style in self.date_styles:
+                try:
+                    return from_excel(value, self.epoch, timedelta=style in self.timedelta_styles)
+                except (OverflowError, ValueError):
+                    return "#VALUE!"
+            return value
+        if data_type == "s":
+            return self.shared_strings[int(value)]
+        if data_type == "b":
+            return bool(int(value))
+        if data_type == "d":
+            return from_ISO8601(value)
+        return value  # "str" (formula result) and "e" (error text)
+
+    def iter_rows(self, sheet_name=None, columns=None, min_row=1):
+        """
+        Yields (row_number, {column_index: value}) for each row >= min_row.
+
+        Only cells whose column index is in `columns` are decoded (all
+        cells when None). Rows missing from the XML are yielded empty.
+        """
+        col_cache = {}
+        last_row = 0
+        sheet_data = None
+        with self.archive.open(self.sheet_member(sheet_name)) as source:
+            for event, elem in ET.iterparse(source, events=("start", "end")):
+                if event == "start":
+                    if elem.tag == _SHEET_DATA:
+                        sheet_data = elem
+                    continue
+                if elem.tag != _ROW:
+                    continue
+
+                r = elem.get("r")
+                row_number = int(r) if r else last_row + 1
+                for gap in range(max(last_row + 1, min_row), row_number):
+                    yield gap, {}
+                last_row = row_number
+
+                if row_number >= min_row:
+                    values = {}
+                    col = 0
+                    for cell in elem:
+                        coord = cell.get("r")
+                        if coord:
+                            letters = coord.rstrip("0123456789")
+                            col = col_cache.get(letters)
+                            if col is None:
+                                col = col_cache[letters] = column_index(letters)
+                        else:
+                            col += 1
+                        if columns is not None and col not in columns:
+                            continue
+                        value = self._value(cell)
+                        if value is not None:
+                            values[col] = value
+                    yield row_number, values
+
+                # Processed rows are detached, so the tree never holds more than one
+                if sheet_data is not None:
+                    sheet_data.remove(elem)
+                else:
+                    elem.clear()
+
+    def iter_frames(self, sheet_name=None, header_row=1, usecols=None, chunk_size=None, intern=None):
+        """
+        Yields DataFrames of the projected columns (`read_excel(dtype=str)` values).
+
+        `usecols` is a list of header names or a callable(name) -> bool, as
+        in pandas. Columns selected by `intern` (same forms) keep a single
+        string object per distinct value, so repetitive columns cost a
+        pointer per cell. One frame for the whole sheet when chunk_size is None.
+        """
+        rows = self.iter_rows(sheet_name, min_row=header_row)
+        _, header = next(rows, (None, {}))
+        rows.close()
+        if not header:
+            return
+
+        width = max(header)
+        names = header_names([header.get(i) for i in range(1, width + 1)])
+        if usecols is None:
+            wanted = list(range(1, width + 1))
+        elif callable(usecols):
+            wanted = [i for i, name in enumerate(names, 1) if usecols(name)]
+        else:
+            allowed = set(usecols)
+            wanted = [i for i, name in enumerate(names, 1) if name in allowed]
+        columns = [names[i - 1] for i in wanted]
+        wanted_set = set(wanted)
+        interned = [
+            (position, {}) for position, name in enumerate(columns)
+            if intern is not None and (intern(name) if callable(intern) else name in intern)
+        ]
+
+        # Re-stream below the header, decoding only the projected cells
+        records = []
+        pending_blank = 0
+        for row_number, values in self.iter_rows(sheet_name, columns=wanted_set, min_row=header_row + 1):
+            if not values:
+                pending_blank += 1   # trailing blank rows are dropped, as read_excel does
+                continue
+            if pending_blank:
+                records.extend([[None] * len(wanted)] * pending_blank)
+                pending_blank = 0
+            record = [cell_text(values.get(i)) for i in wanted]
+            for position, seen in interned:
+                text = record[position]
+                if text is not None:
+                    record[position] = seen.setdefault(text, text)
+            records.append(record)
+            if chunk_size and len(records) >= chunk_size:
+                yield _frame(records, columns)
+                records = []
+        if records or not chunk_size:
+            yield _frame(records, columns)
+
+
+def _frame(records, columns):
+    frame = pd.DataFrame(records, columns=columns, dtype=object)
+    return frame.where(frame.notna(), float("nan"))
+
+
+def read_xlsx(path, sheet_name=None, header_row=1, usecols=None, intern=None):
+    """Whole projected sheet as one DataFrame (drop-in for read_excel(dtype=str))."""
+    with XlsxReader(path) as reader:
+        frames = list(reader.iter_frames(sheet_name, header_row=header_row, usecols=usecols, intern=intern))
+    if not frames:
+        return pd.DataFrame()
+    return frames[0]
+
+
+def iter_xlsx_chunks(path, sheet_name=None, header_row=1, usecols=None, chunk_size=5000, intern=None):
+    """Projected sheet in DataFrames of at most `chunk_size` rows."""
+    with XlsxReader(path) as reader:
+        yield from reader.iter_frames(
+            sheet_name, header_row=header_row, usecols=usecols, chunk_size=chunk_size, intern=intern
+        )
@@ -75,7 +75,21 @@ type DesktopEvent =
         } | null;
       };
     }
-  | { type: "runFailed"; module: ModuleKey; message: string };
+  | { type: "runFailed"; module: ModuleKey; message: string }
+  | {
+      type: "previewCompleted";
+      module: "lks";
+      result: {
+        newSos: number;
+        existingSos: number;
+        firstDate: string | null;
+        lastDate: string | null;
+        technicians: Record<string, number>;
+        summary: Record<string, string | number>;
+        trasByDate: Record<string, number>;
+      };
+    }
+  | { type: "previewFailed"; module: "lks"; message: string };
 
 type DesktopInitialState = {
   version: string;
@@ -100,6 +114,7 @@ type DesktopBridge = {
   openPath: (target: string) => void;
   checkUpdates: (module: string) => void;
   startLks: (payloadJson: string) => void;
+  previewLks: (payloadJson: string) => void;
   startPayslip: (payloadJson: string) => void;
   respondAppendConfirmation: (answer: boolean) => void;
 };
@@ -8,12 +8,21 @@ from ui.layout import set_window_size
 from ui.components import summary_block, step_progress
 from ui.colors import CYAN, GREEN, YELLOW, RED, RESET, DIM
 
+from core.artifact_cache import ArtifactCache
 from core.excel_handler import ExcelHandler
-from core.so_utils import clean_so
+from core.so_ledger import SoLedger
 from core.services.claim_service import ClaimService
+from core.services.ingest import collect_inputs, ingest, ingest_batch
 from core.services.image_injector import ImageInjector
-from core.services.quality_control import QualityControl
+from core.services.link_checker import LinkChecker
+from core.services.photo_dates import PhotoDateReader
+from core.services.ocr_dates import StampDateReader, get_backend
+from core.services.photo_hashes import PhotoHashIndex, PhotoHasher, reused_photos
+from core.services.quality_control import IMAGE_SLOTS, QualityControl
+from core.services.thumbnails import ThumbnailCache
 from core.services.preprocessor import Preprocessor
+from core.services.preview import preview
+from config import CHECK_LINKS, IMAGE_MODE, OCR_BACKEND, OCR_DATES, PHOTO_DATES, PHOTO_DUPLICATES, UPSERT_EXISTING
 
 LogFn = Callable[[str], None]
 ConfirmAppendFn = Callable[[int, int], bool]
@@ -31,10 +40,24 @@ def run_process(
     confirm_append_fn: Optional[ConfirmAppendFn] = None,
     status_fn: Optional[StatusFn] = None,
     show_cli_summary: bool = True,
+    upsert: Optional[bool] = None,
+    photo_dates: Optional[bool] = None,
+    ocr_dates: Optional[bool] = None,
+    check_links: Optional[bool] = None,
+    image_mode: Optional[str] = None,
+    photo_duplicates: Optional[bool] = None,
 ):
     log_fn = log_fn or print
+    upsert = UPSERT_EXISTING if upsert is None else upsert
+    photo_dates = PHOTO_DATES if photo_dates is None else photo_dates
+    ocr_dates = OCR_DATES if ocr_dates is None else ocr_dates
+    check_links = CHECK_LINKS if check_links is None else check_links
+    image_mode = IMAGE_MODE if image_mode is None else image_mode
+    photo_duplicates = PHOTO_DUPLICATES if photo_duplicates is None else photo_duplicates
     step_index = 1
     generated_input_path = str(data_path)
+    # A folder or a list of RAW exports is merged into one result workbook
+    batch = isinstance(data_path, (list, tuple)) or Path(data_path).is_dir()
 
     def step(title: str, status_message: str | None = None) -> None:
         nonlocal step_index
@@ -43,7 +66,7 @@ def run_process(
         _emit(log_fn, f"{CYAN}Step {step_index}: {title}{RESET}")
         step_index += 1
 
-    if data_path.suffix.lower() == ".xls":
+    if not batch and data_path.suffix.lower() == ".xls":
         step("Converting legacy .xls file", "Converting legacy .xls file")
         try:
             new_path = Preprocessor.process_legacy_file(data_path)
@@ -58,19 +81,51 @@ def run_process(
                 confirm_append_fn=confirm_append_fn,
                 status_fn=status_fn,
                 show_cli_summary=show_cli_summary,
+                upsert=upsert,
+                photo_dates=photo_dates,
+                ocr_dates=ocr_dates,
+                check_links=check_links,
+                image_mode=image_mode,
+                photo_duplicates=photo_duplicates,
             )
         except Exception as exc:
             _emit(log_fn, f"{RED}Error processing legacy file: {exc}{RESET}")
             raise
 
+    input_paths = collect_inputs(data_path) if batch else [data_path]
+    if not input_paths:
+        raise ValueError(f"No RAW data files were found in {data_path}.")
+
+    if batch and any(path.suffix.lower() == ".xls" for path in input_paths):
+        step("Converting legacy .xls files", "Converting legacy .xls files")
+        converted = []
+        for path in input_paths:
+            if path.suffix.lower() == ".xls":
+                path = Preprocessor.process_legacy_file(path)
+                _emit(log_fn, f"{DIM}  New input file: {path.name}{RESET}")
+            converted.append(path)
+        input_paths = converted
+
     if status_fn:
         status_fn("Ready to process")
 
-    _emit(log_fn, f"{CYAN}Input file  : {RESET}{data_path}")
+    if batch:
+        _emit(log_fn, f"{CYAN}Input files : {RESET}{len(input_paths)}")
+        for path in input_paths:
+            _emit(log_fn, f"{DIM}  - {path.name}{RESET}")
+        if isinstance(data_path, (list, tuple)):
+            output_dir = input_paths[0].parent
+            output_name = f"LKS ({input_paths[0].stem} +{len(input_paths) - 1}).xlsm"
+        else:
+            output_dir = Path(data_path)
+            output_name = f"LKS ({output_dir.name}).xlsm"
+    else:
+        _emit(log_fn, f"{CYAN}Input file  : {RESET}{data_path}")
+        output_dir = data_path.parent
+        output_name = f"LKS ({data_path.stem}).xlsm"
     _emit(log_fn, f"{CYAN}Template    : {RESET}{template_path}")
 
-    output_name = f"LKS ({data_path.stem}).xlsm"
-    output_path = data_path.parent / output_name
+    output_path = output_dir / output_name
     _emit(log_fn, f"{CYAN}Result file : {RESET}{output_path}")
 
     start_time = time.time()
@@ -78,12 +133,27 @@ def run_process(
     handler = ExcelHandler(template_path, output_path=output_path)
     handler.load()
 
-    source_path = data_path
     source_sheet = None
 
     step("Reading input data", "Reading input data")
-    claim_rows, stats = ClaimService.build_rows(source_path, sheet_name=source_sheet)
-
+    cache = ArtifactCache()
+    if batch:
+        raw = ingest_batch(input_paths, sheet_name=source_sheet, cache=cache)
+    else:
+        raw = ingest(data_path, sheet_name=source_sheet, cache=cache)
+    if raw.cached:
+        _emit(log_fn, f"{DIM}  Input unchanged since a previous run. Parsed data reused.{RESET}")
+    elif raw.streaming:
+        _emit(log_fn, f"{DIM}  Large input detected. Read in streaming mode.{RESET}")
+    _emit(log_fn, f"{DIM}  - Input cache           : {RESET}{GREEN}{cache.summary()}{RESET}")
+    claim_rows, stats = raw.claim_rows, raw.stats
+
+    for source_name, source_stats in raw.sources:
+        _emit(
+            log_fn,
+            f"{DIM}  - {source_name}: {RESET}{GREEN}{source_stats['sos_after_tras']} SOs{RESET}"
+            f"{DIM} ({source_stats['tras_removed']} TRAS, {source_stats['duplicates_skipped']} duplicate rows){RESET}",
+        )
     _emit(log_fn, f"{DIM}  - SOs after TRAS removal : {RESET}{GREEN}{stats['sos_after_tras']}{RESET}")
     _emit(log_fn, f"{DIM}  - Duplicate SOs skipped : {RESET}{GREEN}{stats['duplicates_skipped']}{RESET}")
     _emit(log_fn, f"{DIM}  - Rows skipped for TRAS : {RESET}{GREEN}{stats['tras_removed']}{RESET}")
@@ -102,23 +172,92 @@ def run_process(
 
     step("Checking existing template data", "Checking existing template data")
 
-    ws_claim = handler.ws_claim
-    existing_sos = set()
-    for row_index in range(3, ws_claim.max_row + 1):
-        so = clean_so(ws_claim.cell(row_index, 2).value)
-        if so:
-            existing_sos.add(so)
-
-    new_rows = [row for row in claim_rows if clean_so(row["Service Order"]) not in existing_sos]
-
-    if existing_sos:
+    ledger, rebuilt = SoLedger.open(template_path, handler)
+    if not rebuilt:
+        _emit(log_fn, f"{DIM}  SO ledger is up to date. Template rows were not rescanned.{RESET}")
+    existing_count = len(ledger)
+
+    # Override dates for DateEngine (diskon rule): photo EXIF dates, then burned-in date stamps
+    override_dates = {}
+    diskon_count = 0
+    # Only rows this run may write need their dates
+    targets = [row for row in claim_rows if upsert or row.so not in ledger] if photo_dates or ocr_dates else []
+
+    def stage_progress(label, status_text):
+        def progress(done, total):
+            if status_fn:
+                status_fn(f"{status_text} ({done}/{total})")
+            if show_cli_summary:
+                step_progress(label, done, total, spinner_i=done)
+        return progress
+
+    if photo_dates:
+        step("Reading photo capture dates", "Reading photo capture dates")
+        reader = PhotoDateReader()
+        taken = reader.so_dates(
+            raw.url_map, [row.so for row in targets], progress_cb=stage_progress("PHOTOS", "Reading photo dates")
+        )
+        override_dates.update(taken)
+        if show_cli_summary and reader.fetched + reader.failed:
+            _emit(log_fn, "")
+        _emit(log_fn, f"{DIM}  - Photos read            : {RESET}{GREEN}{reader.fetched}{RESET}"
+                      f"{DIM} ({reader.cached} cached, {reader.failed} unreachable){RESET}")
+        _emit(log_fn, f"{DIM}  - SOs with a photo date  : {RESET}{GREEN}{len(taken)}{RESET}")
+
+    if ocr_dates:
+        step("Reading date stamps on photos", "Reading date stamps on photos")
+        backend = get_backend()
+        if not backend.available():
+            _emit(log_fn, f"{YELLOW}OCR backend '{OCR_BACKEND}' is not available. Date stamps were not read.{RESET}")
+        else:
+            stamp_reader = StampDateReader(backend)
+            stamped = stamp_reader.so_dates(
+                raw.url_map, [row.so for row in targets], progress_cb=stage_progress("STAMPS", "Reading date stamps")
+            )
+            override_dates.update(stamped)
+            if show_cli_summary and stamp_reader.recognized + stamp_reader.failed:
+                _emit(log_fn, "")
+            _emit(log_fn, f"{DIM}  - Photos recognized      : {RESET}{GREEN}{stamp_reader.recognized}{RESET}"
+                          f"{DIM} ({stamp_reader.cached} cached, {stamp_reader.failed} unreachable){RESET}")
+            _emit(log_fn, f"{DIM}  - SOs with a date stamp  : {RESET}{GREEN}{len(stamped)}{RESET}")
+
+    if override_dates:
+        diskon_count = ClaimService.apply_override_dates(targets, override_dates)
+        _emit(log_fn, f"{DIM}  - Dated differently from Status Date : {RESET}{GREEN}{diskon_count}{RESET}")
+
+    def incoming_hash(row, so, has_attachment=True):
+        formulas = ImageInjector.formulas(raw.url_map.get(so, {}), image_mode) if has_attachment else (None, None, None)
+        return ClaimService.row_hash(row, formulas)
+
+    # Upsert: SOs already in the template are rewritten only when their content hash changed
+    new_rows, changed_rows = [], []
+    unchanged_count = 0
+    compared = set()
+    for row in claim_rows:
+        so = row.so   # already cleaned by ClaimService.finalize_groups
+        if so not in ledger:
+            new_rows.append(row)
+        elif upsert and so not in compared:
+            compared.add(so)
+            claim_row, attach_row = ledger.rows(so)
+            row_hash = incoming_hash(row, so, attach_row is not None)
+            written_hash = ledger.row_hash(so) or ClaimService.written_row_hash(handler, claim_row, attach_row)
+            if row_hash == written_hash:
+                unchanged_count += 1
+            else:
+                changed_rows.append((so, row, row_hash))
+    if upsert and existing_count:
+        _emit(log_fn, f"{DIM}  - SOs already in template : {RESET}{GREEN}{len(compared)}{RESET}"
+                      f"{DIM} ({len(changed_rows)} changed, {unchanged_count} unchanged){RESET}")
+
+    if existing_count:
         should_continue = True
         if confirm_append_fn:
-            should_continue = confirm_append_fn(len(existing_sos), len(new_rows))
+            should_continue = confirm_append_fn(existing_count, len(new_rows))
         else:
             _emit(
                 log_fn,
-                f"{YELLOW}Template already has {len(existing_sos)} SOs. {len(new_rows)} new SOs will be added. Continue? (y/n){RESET}",
+                f"{YELLOW}Template already has {existing_count} SOs. {len(new_rows)} new SOs will be added. Continue? (y/n){RESET}",
             )
             try:
                 should_continue = input(">> ").strip().lower() == "y"
@@ -130,36 +269,54 @@ def run_process(
             handler.close()
             return {"aborted": True, "output_path": str(output_path)}
 
-    if not new_rows:
+    if not new_rows and not changed_rows:
         _emit(log_fn, f"{YELLOW}All SOs already exist in the template. Nothing new was added.{RESET}")
         handler.close()
         return {
             "aborted": False,
             "output_path": str(output_path),
             "new_rows": 0,
-            "existing_rows": len(existing_sos),
+            "updated_rows": 0,
+            "unchanged_rows": unchanged_count,
+            "existing_rows": existing_count,
             "missing_count": 0,
             "counts": {"old": 0, "card": 0, "new": 0},
+            "broken_links": 0,
+            "reused_photos": 0,
             "elapsed": time.time() - start_time,
             "generated_input_path": generated_input_path,
         }
 
     step("Writing rows into the template", "Writing rows into template")
 
-    def get_next_empty(worksheet, col=2):
-        for row_index in range(3, worksheet.max_row + 2):
-            if worksheet.cell(row_index, col).value in (None, "", " "):
-                return row_index
-        return worksheet.max_row + 1
-
-    start_claim = get_next_empty(handler.ws_claim)
-    start_attach = get_next_empty(handler.ws_attach)
+    start_claim = ledger.next_claim
+    start_attach = ledger.next_attach
     ClaimService.write_data(handler, new_rows, start_claim, start_attach)
+    image_rows = list(range(start_attach, start_attach + len(new_rows)))
+    written_claim_rows = list(range(start_claim, start_claim + len(new_rows)))
+    for so, row, row_hash in changed_rows:
+        claim_row, attach_row = ledger.rows(so)
+        ClaimService.write_row(handler, row, claim_row, attach_row)
+        ledger.set_hash(so, row_hash)
+        written_claim_rows.append(claim_row)
+        if attach_row is not None:
+            image_rows.append(attach_row)
+    if changed_rows:
+        _emit(log_fn, f"{DIM}  Updated {len(changed_rows)} existing SOs in place.{RESET}")
+
+    if not upsert:
+        # Every ATTACHMENT row gets its formulas rewritten below, so stored hashes no longer hold
+        ledger.clear_hashes()
+    new_sos = [row.so for row in new_rows]
+    ledger.record(
+        new_sos, start_claim, start_attach, handler,
+        hashes=[incoming_hash(row, so) for row, so in zip(new_rows, new_sos)],
+    )
 
     step("Checking image links", "Checking image links")
     _emit(log_fn, f"{DIM}  Reviewing OLD meter, CARD, and NEW meter image links.{RESET}")
 
-    total_imgs = len(new_rows)
+    total_imgs = len(image_rows) if upsert else len(new_rows)
     img_counter = 0
 
     def img_progress(message):
@@ -170,26 +327,80 @@ def run_process(
         if show_cli_summary:
             step_progress("IMAGES", img_counter, total_imgs, extra=message, spinner_i=img_counter)
 
-    ImageInjector.run(handler, source_path, progress_cb=img_progress, sheet_name=source_sheet)
+    thumbnails = ThumbnailCache() if image_mode == "embedded" else None
+    written = ImageInjector.run(
+        handler, progress_cb=img_progress, url_map=raw.url_map, rows=image_rows if upsert else None,
+        thumbnails=thumbnails, download_cb=stage_progress("THUMBS", "Downloading photo thumbnails"),
+    )
     if show_cli_summary:
         _emit(log_fn, "")
+    if thumbnails is not None:
+        _emit(log_fn, f"{DIM}  - Thumbnails embedded    : {RESET}{GREEN}{thumbnails.fetched + thumbnails.cached}{RESET}"
+                      f"{DIM} ({thumbnails.cached} cached, {thumbnails.failed} unreachable){RESET}")
+
+    broken, broken_count = {}, 0
+    if check_links:
+        step("Validating image links", "Validating image links")
+        # Only the rows written this run; earlier rows were validated when they were written
+        links = QualityControl.written_links(written, rows=image_rows)
+        checker = LinkChecker()
+        broken_status = checker.broken(
+            (url for slots in links.values() for url in slots.values()),
+            progress_cb=stage_progress("LINKS", "Validating image links"),
+        )
+        broken, broken_count = QualityControl.analyze_broken(links, broken_status)
+        if show_cli_summary and checker.checked:
+            _emit(log_fn, "")
+        _emit(log_fn, f"{DIM}  - Links checked          : {RESET}{GREEN}{checker.checked}{RESET}"
+                      f"{DIM} ({checker.cached} cached, {checker.failed} unreachable){RESET}")
+        _emit(log_fn, f"{DIM}  - Broken image links     : {RESET}{GREEN}{broken_count}{RESET}")
+
+    reused = {}
+    if photo_duplicates:
+        step("Looking for photos reused across SOs", "Looking for reused photos")
+        written_sos = [row.so for row in new_rows] + [so for so, _, _ in changed_rows]
+        hasher = PhotoHasher()
+        run_index = hasher.index(
+            (
+                (so, slot, url)
+                for so in written_sos
+                for slot, url in zip(IMAGE_SLOTS, ImageInjector.slot_urls(raw.url_map.get(so, {})))
+            ),
+            progress_cb=stage_progress("HASHES", "Hashing photos"),
+        )
+        archive = PhotoHashIndex.load()
+        reused = reused_photos(run_index, archive)
+        archive.merged(run_index).save()
+        if show_cli_summary and hasher.hashed + hasher.failed:
+            _emit(log_fn, "")
+        _emit(log_fn, f"{DIM}  - Photos hashed          : {RESET}{GREEN}{hasher.hashed}{RESET}"
+                      f"{DIM} ({hasher.cached} cached, {hasher.failed} unreachable, {len(archive)} archived){RESET}")
+        _emit(log_fn, f"{DIM}  - SOs with reused photos : {RESET}{GREEN}{len(reused)}{RESET}")
 
     step("Reviewing rows that need attention", "Reviewing rows that need attention")
 
-    missing, counts = QualityControl.analyze_missing(handler)
-    if missing:
-        _emit(log_fn, f"{YELLOW}Rows needing review because one or more images are missing:{RESET}")
+    missing, counts = QualityControl.analyze_written(written)
+    defective = QualityControl.merge_details(missing, broken, reused)
+    for title, detail in (
+        ("one or more images are missing", missing),
+        ("one or more image links are broken", broken),
+        ("a photo matches another SO's photo", reused),
+    ):
+        if not detail:
+            continue
+        _emit(log_fn, f"{YELLOW}Rows needing review because {title}:{RESET}")
         max_show = 10
-        for index, (so, slots) in enumerate(missing.items()):
+        for index, (so, slots) in enumerate(detail.items()):
             if index < max_show:
                 _emit(log_fn, f"  - SO {so} -> {', '.join(slots)}")
-        if len(missing) > max_show:
-            _emit(log_fn, f"  ... and {len(missing) - max_show} more.")
-    else:
+        if len(detail) > max_show:
+            _emit(log_fn, f"  ... and {len(detail) - max_show} more.")
+    if not defective:
         _emit(log_fn, f"{GREEN}All SOs have complete images.{RESET}")
 
-    QualityControl.mark_defective(handler, missing)
-    QualityControl.format_all(handler)
+    QualityControl.mark_rows(handler, defective, ledger, written)
+    # Rows of earlier runs were formatted when they were written
+    QualityControl.format_rows(handler, written_claim_rows, image_rows)
 
     step("Saving the result workbook", "Saving result workbook")
     handler.save()
@@ -225,17 +436,25 @@ def run_process(
         except Exception:
             pass
 
+    # After the Excel refresh, so the ledger matches the final file on disk
+    ledger.save(output_path)
+
     elapsed = time.time() - start_time
     summary = {
+        **({"Input files": len(input_paths)} if batch else {}),
         "Processed SOs": stats["sos_after_tras"],
         "Added to template": len(new_rows),
+        **({"Updated in template": len(changed_rows), "Unchanged SOs": unchanged_count} if upsert else {}),
+        **({"Diskon by photo date": diskon_count} if photo_dates or ocr_dates else {}),
         "Duplicate SOs skipped": stats["duplicates_skipped"],
         "Rows skipped for TRAS": stats["tras_removed"],
         "SOs with duplicates": stats.get("duplicate_groups", 0),
-        "Rows needing review": len(missing),
+        "Rows needing review": len(defective),
         "Missing OLD meter": counts["old"],
         "Missing CARD": counts["card"],
         "Missing NEW meter": counts["new"],
+        **({"Broken image links": broken_count} if check_links else {}),
+        **({"SOs with reused photos": len(reused)} if photo_duplicates else {}),
         "Execution time": f"{elapsed:.2f}s",
     }
 
@@ -251,27 +470,93 @@ def run_process(
         "output_path": str(output_path),
         "generated_input_path": generated_input_path,
         "new_rows": len(new_rows),
-        "existing_rows": len(existing_sos),
-        "missing_count": len(missing),
+        "updated_rows": len(changed_rows),
+        "unchanged_rows": unchanged_count,
+        "existing_rows": existing_count,
+        "missing_count": len(defective),
         "counts": counts,
+        "broken_links": broken_count,
+        "reused_photos": len(reused),
         "elapsed": elapsed,
         "summary": summary,
         "tras_by_date": stats.get("tras_by_date", {}),
         "duplicates_skipped": stats["duplicates_skipped"],
         "duplicate_groups": stats.get("duplicate_groups", 0),
         "duplicate_counts": stats.get("duplicate_counts", {}),
+        "sources": [
+            {
+                "source": source_name,
+                "processed": source_stats["sos_after_tras"],
+                "tras_removed": source_stats["tras_removed"],
+                "duplicates_skipped": source_stats["duplicates_skipped"],
+            }
+            for source_name, source_stats in raw.sources
+        ],
+    }
+
+
+def run_preview(data_path, template_path, log_fn: Optional[LogFn] = None, show_cli_summary: bool = True):
+    """
+    Reports what run_process would do (new SOs, TRAS, duplicates, date range)
+    without loading the template workbook or writing anything.
+    """
+    log_fn = log_fn or print
+    start_time = time.time()
+    _emit(log_fn, f"{CYAN}Preview     : {RESET}{data_path}")
+    _emit(log_fn, f"{CYAN}Template    : {RESET}{template_path}")
+
+    result = preview(data_path, template_path)
+    stats = result["stats"]
+    first_date, last_date = result["first_date"], result["last_date"]
+    elapsed = time.time() - start_time
+
+    summary = {
+        **({"Input files": result["input_files"]} if result["input_files"] > 1 else {}),
+        "Processed SOs": stats["sos_after_tras"],
+        "New SOs": result["new_sos"],
+        "Already in template": result["existing_sos"],
+        "Duplicate SOs skipped": stats["duplicates_skipped"],
+        "Rows skipped for TRAS": stats["tras_removed"],
+        "SOs with duplicates": stats.get("duplicate_groups", 0),
+        "Invalid status dates": stats["invalid_dates"],
+        "Date range": (
+            f"{first_date:%d %b %Y} - {last_date:%d %b %Y}" if first_date else "No valid status dates"
+        ),
+        "Technicians": len(result["technicians"]),
+        "Execution time": f"{elapsed:.2f}s",
+    }
+
+    if show_cli_summary:
+        _emit(log_fn, "")
+        for key, value in summary.items():
+            _emit(log_fn, f" • {CYAN}{key:<22}{RESET}: {value}")
+        _emit(log_fn, f"{DIM}Preview only. Nothing was written.{RESET}")
+
+    return {
+        **result,
+        "summary": summary,
+        "tras_by_date": stats.get("tras_by_date", {}),
+        "elapsed": elapsed,
     }
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python main.py <data.xlsx> [template.xlsx]")
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    upsert = True if "--upsert" in sys.argv[1:] else None
+    photo_dates = True if "--photo-dates" in sys.argv[1:] else None
+    ocr_dates = True if "--ocr-dates" in sys.argv[1:] else None
+    check_links = True if "--check-links" in sys.argv[1:] else None
+    image_mode = "embedded" if "--embed-images" in sys.argv[1:] else None
+    photo_duplicates = True if "--photo-duplicates" in sys.argv[1:] else None
+    preview_only = "--preview" in sys.argv[1:]
+    if len(args) < 1:
+        print("Usage: python main.py <data.xlsx | folder of exports> [template.xlsx] [--upsert] [--photo-dates] [--ocr-dates] [--check-links] [--embed-images] [--photo-duplicates] | [--preview]")
         sys.exit(1)
 
-    data_path = Path(sys.argv[1]).resolve()
+    data_path = Path(args[0]).resolve()
 
-    if len(sys.argv) >= 3:
-        template_path = Path(sys.argv[2]).resolve()
+    if len(args) >= 2:
+        template_path = Path(args[1]).resolve()
     else:
         from config import DEFAULT_TEMPLATE_PATH
 
@@ -285,9 +570,17 @@ def main():
         print(f"{RED}Error: Template file not found: {template_path}{RESET}")
         sys.exit(1)
 
+    if preview_only:
+        run_preview(data_path, template_path, log_fn=print)
+        return
+
     set_window_size(110, 40)
     show_title()
-    run_process(data_path, template_path, log_fn=print, show_cli_summary=True)
+    run_process(
+        data_path, template_path, log_fn=print, show_cli_summary=True,
+        upsert=upsert, photo_dates=photo_dates, ocr_dates=ocr_dates, check_links=check_links,
+        image_mode=image_mode, photo_duplicates=photo_duplicates,
+    )
 
 
 if __name__ == "__main__":
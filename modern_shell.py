@@ -17,7 +17,7 @@ from core.services.payslip_service import (
     format_claim_summary_lines,
     generate_payslips,
 )
-from main import run_process
+from main import run_preview, run_process
 from ui_theme import apply_app_palette
 from updater import APP_DIR
 
@@ -122,6 +122,7 @@ class WebPayslipWorker(QObject):
             if result.claim_summary is not None:
                 for line in format_claim_summary_lines(result.claim_summary):
                     self.log_message.emit(line)
+            self.log_message.emit(f"Input cache: {result.cache_summary}")
             self.log_message.emit(f"Generated Excel payslips: {result.generated_xlsx_count}")
             self.log_message.emit(f"Generated PDF payslips: {result.generated_pdf_count}")
             self.log_message.emit(f"Output folder: {result.output_dir}")
@@ -312,6 +313,44 @@ class Bridge(QObject):
         self._emit({"type": "runStarted", "module": "lks"})
         self.lks_thread.start()
 
+    @Slot(str)
+    def previewLks(self, payload_json: str) -> None:
+        payload = json.loads(payload_json)
+        input_path = Path(payload.get("inputPath", "")).expanduser()
+        template_path = Path(payload.get("templatePath") or DEFAULT_TEMPLATE_PATH).resolve()
+
+        if not input_path.exists():
+            self._emit({"type": "previewFailed", "module": "lks", "message": "Select a valid input workbook."})
+            return
+        if not template_path.exists():
+            self._emit({"type": "previewFailed", "module": "lks", "message": "The LKS template file could not be found."})
+            return
+
+        def work() -> None:
+            try:
+                result = run_preview(input_path.resolve(), template_path, log_fn=lambda _message: None, show_cli_summary=False)
+            except Exception as exc:
+                self._emit({"type": "previewFailed", "module": "lks", "message": self._friendly_lks_error(str(exc))})
+                return
+            self._emit(
+                {
+                    "type": "previewCompleted",
+                    "module": "lks",
+                    "result": {
+                        "newSos": result["new_sos"],
+                        "existingSos": result["existing_sos"],
+                        "firstDate": result["first_date"].isoformat() if result["first_date"] else None,
+                        "lastDate": result["last_date"].isoformat() if result["last_date"] else None,
+                        "technicians": result["technicians"],
+                        "summary": result["summary"],
+                        "trasByDate": result["tras_by_date"],
+                    },
+                }
+            )
+
+        # Reads a few columns only, so a plain thread is enough (no append confirmation to relay)
+        threading.Thread(target=work, daemon=True).start()
+
     @Slot(object)
     def _handle_lks_finished(self, result: dict) -> None:
         self.lks_worker = None
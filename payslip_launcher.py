@@ -157,6 +157,7 @@ class PayslipWorker(QObject):
             if result.claim_summary is not None:
                 for line in format_claim_summary_lines(result.claim_summary):
                     self.log_message.emit(line)
+            self.log_message.emit(f"Input cache: {result.cache_summary}")
             self.log_message.emit(f"Generated Excel payslips: {result.generated_xlsx_count}")
             self.log_message.emit(f"Generated PDF payslips: {result.generated_pdf_count}")
             self.log_message.emit(f"Output folder: {result.output_dir}")
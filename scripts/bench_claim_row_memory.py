@@ -0,0 +1,53 @@
+"""
+Benchmark: memory held by ClaimRow records vs the former 18-key row dicts.
+
+Usage: python scripts/bench_claim_row_memory.py [rows ...]   (default 50000 200000)
+"""
+from __future__ import annotations
+
+import gc
+import sys
+import tracemalloc
+
+from bench_data import make_raw_frame
+
+from config import COL_3MS_SO
+from core.services.claim_service import ClaimRow, ClaimService
+
+
+def _as_legacy_dicts(rows):
+    """The dict shape build_rows returned before ClaimRow (same value objects)."""
+    return [{"Qty": i, **row.as_dict()} for i, row in enumerate(rows, 1)]
+
+
+def _as_claim_rows(rows):
+    return [ClaimRow(*(getattr(row, attr) for attr in ClaimRow.__slots__)) for row in rows]
+
+
+def _measure(build, rows):
+    """Bytes allocated for the list and its records (cell values are shared, not counted)."""
+    gc.collect()
+    tracemalloc.start()
+    built = build(rows)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del built
+    return size
+
+
+def main(sizes: list[int]) -> None:
+    print(f"{'rows':>8} {'SOs':>8} {'dict MB':>9} {'ClaimRow MB':>12} {'saved':>7}")
+    for n_rows in sizes:
+        df = make_raw_frame(n_rows)
+        df = df[df[COL_3MS_SO].astype(str).str.strip() != ""]
+        rows, _ = ClaimService.finalize_groups(ClaimService.group_frame(df))
+        dict_size = _measure(_as_legacy_dicts, rows)
+        row_size = _measure(_as_claim_rows, rows)
+        print(
+            f"{n_rows:>8} {len(rows):>8} {dict_size / 2**20:>8.1f} {row_size / 2**20:>11.1f} "
+            f"{1 - row_size / dict_size:>6.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [50_000, 200_000])
@@ -0,0 +1,130 @@
+"""
+Benchmark: vectorized ClaimService grouping vs the original groupby/iterrows loop.
+
+Usage: python scripts/bench_claim_rows.py [rows ...]   (default 10000 50000 200000)
+"""
+from __future__ import annotations
+
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+
+from bench_data import make_raw_frame, normalize
+
+from config import (
+    COL_3MS_SO, COL_CONTRACT, COL_SO_STATUS, COL_USER_STATUS, COL_ADDRESS,
+    COL_VOLTAGE, COL_SO_TYPE, COL_SO_DESC, COL_TECHNICIAN, COL_STATUS_DATE,
+    COL_SITE_ID, COL_OLD_METER, COL_NEW_METER, COL_NEW_COMM,
+)
+from core.so_utils import clean_so
+from core.services.claim_service import BUSINESS_AREAS, ClaimService
+from core.services.date_engine import DateEngine
+
+
+def get_business_area(site_id):
+    return BUSINESS_AREAS.get(str(site_id).strip(), "")
+
+
+def legacy_rows_from_frame(df):
+    """The pre-vectorization build_rows body (after read_excel/rename)."""
+    stats = {
+        "total_sos_raw": 0, "tras_removed": 0, "duplicates_skipped": 0,
+        "sos_after_tras": 0, "invalid_dates": 0, "missing_address": 0,
+        "tras_by_date": Counter(), "duplicate_sos": [], "duplicate_groups": 0,
+        "duplicate_counts": {}
+    }
+    so_groups = []
+    for so, subdf in df.groupby(COL_3MS_SO, sort=False):
+        so_clean = clean_so(so)
+        if not so_clean:
+            continue
+        stats["total_sos_raw"] += 1
+        duplicate_count = max(len(subdf.index) - 1, 0)
+        if duplicate_count:
+            stats["duplicates_skipped"] += duplicate_count
+            stats["duplicate_groups"] += 1
+            stats["duplicate_sos"].append(so_clean)
+            stats["duplicate_counts"][so_clean] = duplicate_count + 1
+        if COL_USER_STATUS in subdf.columns:
+            if subdf[COL_USER_STATUS].astype(str).str.upper().str.contains("TRAS").any():
+                stats["tras_removed"] += 1
+                tras_date = None
+                for _, tras_row in subdf.iterrows():
+                    tras_date = DateEngine.parse_date(tras_row.get(COL_STATUS_DATE, "") or "")
+                    if tras_date:
+                        break
+                stats["tras_by_date"][tras_date if tras_date else "Unknown date"] += 1
+                continue
+        row0 = subdf.iloc[0]
+        raw_status = row0.get(COL_STATUS_DATE, "") or ""
+        date_obj = DateEngine.parse_datetime(raw_status)
+        if not date_obj and str(raw_status).strip():
+            stats["invalid_dates"] += 1
+        if not str(row0.get(COL_ADDRESS, "") or "").strip():
+            stats["missing_address"] += 1
+        so_groups.append({
+            "so": so_clean, "row0": row0,
+            "status_val": date_obj if date_obj else raw_status,
+            "date_obj": date_obj, "site_id": row0.get(COL_SITE_ID, "") or "",
+        })
+    so_groups.sort(key=lambda g: g["date_obj"] if g["date_obj"] else datetime.min)
+    stats["sos_after_tras"] = len(so_groups)
+    rows = []
+    for i, g in enumerate(so_groups, 1):
+        r0 = g["row0"]
+        logic = DateEngine.calculate(g["status_val"], ocr_date_str=None)
+        rows.append({
+            "Qty": i, "Service Order": g["so"],
+            "Account Number": r0.get(COL_CONTRACT, "") or "",
+            "Status": r0.get(COL_SO_STATUS, "") or "",
+            "Address": r0.get(COL_ADDRESS, "") or "",
+            "Voltage": r0.get(COL_VOLTAGE, "") or "",
+            "SO Description": r0.get(COL_SO_TYPE, "") or r0.get(COL_SO_DESC, "") or "",
+            "Labor": r0.get(COL_TECHNICIAN, "") or "",
+            "Status Date": g["status_val"], "Site": g["site_id"],
+            "Business Area": get_business_area(g["site_id"]),
+            "Old Device No": r0.get(COL_OLD_METER, "") or "",
+            "New Device No": r0.get(COL_NEW_METER, "") or "",
+            "Comm Module No": r0.get(COL_NEW_COMM, "") or "",
+            "Hari Field": logic["hari"], "Jenis Kerja": "KERJA BIASA",
+            "Remarks 1": logic["remarks_1"], "Remarks 2": logic["remarks_2"],
+        })
+    formatted = {}
+    for key, count in sorted(
+        stats["tras_by_date"].items(),
+        key=lambda item: (item[0] == "Unknown date", item[0] if item[0] != "Unknown date" else datetime.max.date()),
+    ):
+        formatted[key if key == "Unknown date" else key.strftime("%d %b %Y")] = count
+    stats["tras_by_date"] = formatted
+    stats["duplicate_sos"] = sorted(stats["duplicate_sos"])
+    return rows, stats
+
+
+def vectorized_rows_from_frame(df):
+    return ClaimService.finalize_groups(ClaimService.group_frame(df))
+
+
+def _timed(fn, df):
+    start = time.perf_counter()
+    result = fn(df)
+    return result, time.perf_counter() - start
+
+
+def main(sizes: list[int]) -> None:
+    print(f"{'rows':>8} {'SOs':>8} {'legacy':>10} {'vectorized':>11} {'speedup':>8}")
+    for n_rows in sizes:
+        df = make_raw_frame(n_rows)
+        df = df[df[COL_3MS_SO].astype(str).str.strip() != ""]
+        legacy, t_legacy = _timed(legacy_rows_from_frame, df)
+        fast, t_fast = _timed(vectorized_rows_from_frame, df)
+        # ClaimRow keeps only the written fields ("Qty" was never written)
+        legacy_rows = [{k: v for k, v in row.items() if k != "Qty"} for row in legacy[0]]
+        fast_rows = [row.as_dict() for row in fast[0]]
+        if normalize((legacy_rows, legacy[1])) != normalize((fast_rows, fast[1])):
+            raise SystemExit(f"Mismatch between engines at {n_rows} rows")
+        print(f"{n_rows:>8} {len(fast[0]):>8} {t_legacy:>9.2f}s {t_fast:>10.2f}s {t_legacy / t_fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 50_000, 200_000])
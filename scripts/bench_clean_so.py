@@ -0,0 +1,98 @@
+"""
+Benchmark: SO normalization work of one run, per-call clean_so vs the column helpers.
+
+"per value" compares clean_so in a loop, clean_so_column, pandas string
+ops (strip + ".0" suffix, the vectorized-looking alternative) and an
+lru_cache memo on a RAW SO column. "per run" replays the SO cleaning a run does for
+N new SOs: before, every stage re-cleaned ClaimRow.so and read column B
+cell by cell; now finalize_groups and the ledger clean whole columns once
+and the ClaimRow SOs are reused as they are.
+
+Usage: python scripts/bench_clean_so.py [rows ...]   (default 20000 100000)
+"""
+from __future__ import annotations
+
+import sys
+import time
+from functools import lru_cache
+
+import pandas as pd
+from openpyxl import Workbook
+
+from bench_data import make_raw_frame
+
+from config import COL_3MS_SO, DATA_START_ROW
+from core.so_utils import clean_so, clean_so_column, sheet_sos
+
+
+def _best(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _str_ops(values):
+    """clean_so with pandas string ops (text cells only; the others left to clean_so)."""
+    raw = pd.Series(values, dtype=object)
+    text = raw.str.strip().str.removesuffix(".0")
+    other = text.isna().to_numpy()
+    result = text.to_numpy(dtype=object, copy=True)
+    result[other] = [clean_so(v) for v in raw.to_numpy()[other]]
+    return result
+
+
+def _per_value(values):
+    memo = lru_cache(maxsize=None, typed=True)(clean_so)
+    if list(_str_ops(values)) != [clean_so(v) for v in values]:
+        raise SystemExit("pandas string ops differ from clean_so")
+    return (
+        _best(lambda: [clean_so(v) for v in values]),
+        _best(lambda: clean_so_column(values)),
+        _best(lambda: _str_ops(values)),
+        _best(lambda: [memo(v) for v in values]),
+    )
+
+
+def _legacy_run(keys, sheet):
+    sos = [clean_so(k) for k in keys]                       # finalize_groups
+    sos = [clean_so(so) for so in sos]                      # run_process: ledger lookup
+    sos = [clean_so(so) for so in sos]                      # run_process: new_sos
+    sos = [clean_so(so) for so in sos]                      # write_row
+    sos = [clean_so(so) for so in sos]                      # SoLedger.record
+    rows = range(DATA_START_ROW, sheet.max_row + 1)
+    for _ in range(4):                                      # ImageInjector.run, analyze_missing, mark_defective x2
+        [clean_so(sheet.cell(r, 2).value) for r in rows]
+
+
+def _new_run(keys, sheet):
+    sos = clean_so_column(keys)                              # finalize_groups
+    clean_so_column(sos)                                     # SoLedger.record
+    rows = range(DATA_START_ROW, sheet.max_row + 1)
+    for _ in range(4):
+        sheet_sos(sheet, rows)
+
+
+def main(sizes: list[int]) -> None:
+    print(f"{'rows':>8} {'SOs':>7} {'loop':>8} {'column':>8} {'str ops':>8} {'lru':>8} {'run before':>11} {'run now':>8} {'speedup':>8}")
+    for n_rows in sizes:
+        column = make_raw_frame(n_rows)[COL_3MS_SO].to_numpy(dtype=object)
+        keys = [k for k in dict.fromkeys(column) if isinstance(k, str)]
+        sheet = Workbook().active
+        for row, so in enumerate(keys, DATA_START_ROW):
+            sheet.cell(row, 2).value = clean_so(so)
+
+        loop, column_time, str_ops, memo = _per_value(column)
+        before = _best(lambda: _legacy_run(keys, sheet), repeat=3)
+        now = _best(lambda: _new_run(keys, sheet), repeat=3)
+        print(
+            f"{n_rows:>8} {len(keys):>7} {loop * 1000:>6.1f}ms {column_time * 1000:>6.1f}ms {str_ops * 1000:>6.1f}ms "
+            f"{memo * 1000:>6.1f}ms "
+            f"{before * 1000:>9.1f}ms {now * 1000:>6.1f}ms {before / now:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [20_000, 100_000])
@@ -0,0 +1,112 @@
+"""Synthetic RAW export data shared by the benchmark scripts."""
+from __future__ import annotations
+
+import random
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import pandas as pd
+
+from config import (
+    COL_3MS_SO, COL_CONTRACT, COL_SO_STATUS, COL_USER_STATUS, COL_ADDRESS,
+    COL_VOLTAGE, COL_SO_TYPE, COL_SO_DESC, COL_TECHNICIAN, COL_STATUS_DATE,
+    COL_SITE_ID, COL_OLD_METER, COL_OLD_COMM, COL_NEW_METER, COL_NEW_COMM,
+    COL_ATTACH_URL,
+)
+
+RAW_HEADERS = [
+    COL_3MS_SO, COL_CONTRACT, COL_SO_STATUS, COL_USER_STATUS, COL_ADDRESS,
+    COL_VOLTAGE, COL_SO_TYPE, COL_SO_DESC, COL_TECHNICIAN, COL_STATUS_DATE,
+    COL_SITE_ID, COL_OLD_METER, COL_OLD_COMM, COL_NEW_METER, COL_NEW_COMM,
+    COL_ATTACH_URL,
+]
+
+_SITES = ["6340", "6342", "6346", "6410", "6999"]
+_TECHS = [f"ZMRT{i:04d}" for i in range(1, 9)]
+_USER_STATUS = ["COMP", "COMP TECO", "TRAS", "COMP", "COMP"]
+_PHOTOS = ["old_read", "card", "new_meter", "oldread", "crd", "mew_meter", "misc", "new_mtr"]
+
+
+def _status_date(rng: random.Random) -> str | None:
+    roll = rng.random()
+    day = rng.randint(1, 28)
+    month = rng.choice(["Oct", "Nov", "Dec"])
+    if roll < 0.80:
+        return f"{month} {day:02d}, 2025, {rng.randint(1, 12)}:{rng.randint(0, 59):02d} {rng.choice(['AM', 'PM'])}"
+    if roll < 0.90:
+        return f"2025-{rng.randint(10, 12)}-{day:02d} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00"
+    if roll < 0.95:
+        return "not a date"
+    return None
+
+
+def make_raw_records(n_rows: int, seed: int = 7) -> list[list]:
+    """RAW export rows: ~20% continuation rows, some TRAS, blanks and bad dates."""
+    rng = random.Random(seed)
+    records = []
+    so = 5_000_000_000
+    while len(records) < n_rows:
+        so += rng.randint(1, 3)
+        so_text = str(so) if rng.random() > 0.05 else f"{so}.0"
+        status = rng.choice(_USER_STATUS)
+        base = [
+            so_text,
+            str(rng.randint(10**11, 10**12 - 1)),
+            "COMP",
+            status,
+            None if rng.random() < 0.03 else f"NO {rng.randint(1, 99)}, JALAN {rng.randint(1, 40)}, TAMAN MAJU",
+            rng.choice(["01", "02"]),
+            rng.choice(["ZISM", "ZISM", None]),
+            "SMART METER INSTALL",
+            rng.choice(_TECHS),
+            _status_date(rng),
+            rng.choice(_SITES),
+            f"OLD{rng.randint(10**6, 10**7)}",
+            None,
+            f"NEW{rng.randint(10**6, 10**7)}",
+            f"CM{rng.randint(10**6, 10**7)}",
+        ]
+        extra = rng.choice([0, 0, 0, 1, 2])
+        for photo_idx in range(extra + 1):
+            url = f"https://3ms.example.com/att/{so}/{rng.choice(_PHOTOS)}_{photo_idx}.jpg"
+            if photo_idx == 0:
+                records.append(base + [url])
+            elif rng.random() < 0.3:
+                records.append(base + [url])          # duplicate SO row
+            else:
+                records.append([None] * (len(RAW_HEADERS) - 1) + [url])  # continuation row
+    return records[:n_rows]
+
+
+def make_raw_frame(n_rows: int, seed: int = 7) -> pd.DataFrame:
+    """RAW export as `pd.read_excel(dtype=str)` would return it."""
+    frame = pd.DataFrame(make_raw_records(n_rows, seed), columns=RAW_HEADERS, dtype=object)
+    return frame.astype(str).where(frame.notna())
+
+
+def write_raw_xlsx(path: Path, n_rows: int, seed: int = 7) -> Path:
+    """Writes a synthetic RAW export workbook (write-only mode, single sheet)."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet("Sheet1")
+    worksheet.append(RAW_HEADERS)
+    for record in make_raw_records(n_rows, seed):
+        worksheet.append(record)
+    workbook.save(path)
+    return path
+
+
+def normalize(value):
+    """Makes NaN comparable when checking that two engines agree."""
+    if isinstance(value, float) and value != value:
+        return "<NaN>"
+    if isinstance(value, dict):
+        return {k: normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    return value
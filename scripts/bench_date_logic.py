@@ -0,0 +1,85 @@
+"""
+Benchmark: DateEngine.calculate per row / per distinct date vs calculate_batch.
+
+Status dates are the synthetic RAW column, parsed the way finalize_groups
+does; "ocr" adds an OCR date column (half filled, some differing from the
+status date) so the diskon remarks are exercised. Results are checked equal.
+
+Usage: python scripts/bench_date_logic.py [rows ...]   (default 20000 100000)
+"""
+from __future__ import annotations
+
+import random
+import sys
+import time
+from datetime import timedelta
+
+import numpy as np
+
+from bench_data import make_raw_frame
+
+from config import COL_STATUS_DATE
+from core.services.date_engine import DateEngine
+
+_FIELDS = ("is_diskon", "hari", "remarks_1", "remarks_2")
+
+
+def _best(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _per_row(dates, ocr):
+    return [DateEngine.calculate(d, o) for d, o in zip(dates, ocr)]
+
+
+def _per_date(dates):
+    """The previous finalize_groups path: one calculate per distinct status date."""
+    memo = {}
+    for d in dates:
+        key = d.date() if d else None
+        if key not in memo:
+            memo[key] = DateEngine.calculate(d, ocr_date_str=None)
+    return [memo[d.date() if d else None] for d in dates]
+
+
+def _ocr_column(dates, seed=11):
+    rng = random.Random(seed)
+    return [
+        (d + timedelta(days=rng.choice([0, 0, 1, 3]))).strftime("%d %b %Y") if d and rng.random() < 0.5 else None
+        for d in dates
+    ]
+
+
+def _check(expected, batch):
+    for i, logic in enumerate(expected):
+        if any(logic[k] != batch[k][i] for k in _FIELDS):
+            raise SystemExit(f"calculate_batch differs from calculate at row {i}")
+
+
+def main(sizes: list[int]) -> None:
+    print(f"{'rows':>8} {'ocr':>4} {'per row':>9} {'per date':>9} {'batch':>8} {'vs row':>7}")
+    for n_rows in sizes:
+        dates, dates_us = DateEngine.parse_column(make_raw_frame(n_rows)[COL_STATUS_DATE].to_numpy(dtype=object))
+        ocr = _ocr_column(dates)
+        none = [None] * len(dates)
+
+        _check(_per_row(dates, none), DateEngine.calculate_batch(dates_us))
+        _check(_per_row(dates, ocr), DateEngine.calculate_batch(dates_us, np.asarray(ocr, dtype=object)))
+
+        row = _best(lambda: _per_row(dates, none), repeat=3)
+        memo = _best(lambda: _per_date(dates), repeat=3)
+        batch = _best(lambda: DateEngine.calculate_batch(dates_us), repeat=3)
+        print(f"{n_rows:>8} {'no':>4} {row * 1000:>7.1f}ms {memo * 1000:>7.1f}ms {batch * 1000:>6.1f}ms {row / batch:>6.1f}x")
+
+        row = _best(lambda: _per_row(dates, ocr), repeat=3)
+        batch = _best(lambda: DateEngine.calculate_batch(dates_us, ocr), repeat=3)
+        print(f"{n_rows:>8} {'yes':>4} {row * 1000:>7.1f}ms {'-':>9} {batch * 1000:>6.1f}ms {row / batch:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [20_000, 100_000])
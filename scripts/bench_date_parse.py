@@ -0,0 +1,68 @@
+"""
+Benchmark: status-date column parsing, parse_datetime per distinct value vs DateEngine.parse_column.
+
+The "mixed" column is the synthetic RAW export (mostly "Nov 12, 2025, 1:24 PM",
+some ISO and blanks); "iso" is the str(datetime) text the fast reader gives
+for date-typed cells. Both paths are checked to return the same values.
+
+Usage: python scripts/bench_date_parse.py [rows ...]   (default 20000 100000)
+"""
+from __future__ import annotations
+
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from bench_data import make_raw_frame
+
+from config import COL_STATUS_DATE
+from core.services.date_engine import DateEngine
+
+
+def _best(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _per_value(values):
+    """The previous path: factorize, then parse_datetime once per distinct value."""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+    parsed = [DateEngine.parse_datetime(v or "") for v in uniques] + [None]
+    parsed_obj = np.empty(len(parsed), dtype=object)
+    parsed_obj[:] = parsed
+    parsed_us = np.array(
+        [np.datetime64(d, "us") if d else np.datetime64("NaT", "us") for d in parsed], dtype="datetime64[us]"
+    )
+    return parsed_obj[codes], parsed_us[codes]
+
+
+def _iso_column(n_rows: int):
+    start = datetime(2025, 10, 1)
+    return np.array([str(start + timedelta(minutes=7 * i)) for i in range(n_rows)], dtype=object)
+
+
+def main(sizes: list[int]) -> None:
+    print(f"{'rows':>8} {'column':>7} {'per value':>10} {'column':>8} {'speedup':>8}")
+    for n_rows in sizes:
+        columns = {
+            "mixed": make_raw_frame(n_rows)[COL_STATUS_DATE].to_numpy(dtype=object),
+            "iso": _iso_column(n_rows),
+        }
+        for name, values in columns.items():
+            old, new = _per_value(values), DateEngine.parse_column(values)
+            if list(old[0]) != list(new[0]) or not np.array_equal(old[1], new[1], equal_nan=True):
+                raise SystemExit(f"Parsed values differ ({name}, {n_rows} rows)")
+            before = _best(lambda: _per_value(values), repeat=3)
+            now = _best(lambda: DateEngine.parse_column(values), repeat=3)
+            print(f"{n_rows:>8} {name:>7} {before * 1000:>8.1f}ms {now * 1000:>6.1f}ms {before / now:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [20_000, 100_000])
@@ -0,0 +1,98 @@
+"""
+Benchmark: attachment URL classification, the previous detect_type vs the compiled rules.
+
+"per url" runs each implementation once per URL (memo cleared first, so
+"compiled" is the cold cost of one regex match); "column" is
+ImageInjector.detect_types over the whole URL column. Every URL of the
+synthetic RAW column plus a typo vocabulary sample is checked to give the
+same type as before. Also prints the rule statistics of the column.
+
+Usage: python scripts/bench_detect_type.py [rows ...]   (default 20000 100000)
+"""
+from __future__ import annotations
+
+import sys
+import time
+
+from bench_data import make_raw_frame
+
+from config import COL_ATTACH_URL
+from core.services.image_injector import FUZZY_NEW, URL_RULES, ImageInjector, classify_filename
+
+
+def _legacy_detect_type(url):
+    """detect_type as it was before the compiled rules."""
+    if not url: return None
+    u = url.lower()
+    filename = u.split("/")[-1]
+    if any(x in filename for x in ["old_read", "oldread", "old_red", "old_rea"]):
+        return "old"
+    if any(x in filename for x in ["card", "cad", "crd", "car", "ard"]):
+        return "card"
+    if any(
+        x in filename
+        for x in [
+            "new_meter", "newmeter", "nee_meter", "new_metwr", "new_meer", "mew_meter", "mewmeter",
+            "ew_meter", "ewmeter", "nw_meter", "new_mter", "new_metr", "newmeterr",
+        ]
+    ):
+        return "new"
+    if (
+        ("new_m" in filename or "mew_m" in filename or "ew_m" in filename)
+        and ("eer" in filename or "ter" in filename or "etr" in filename or "meter" in filename)
+    ):
+        return "new"
+    return None
+
+
+def _vocabulary_urls():
+    """Every rule token alone, in pairs and in mixed case, to check precedence."""
+    tokens = [t for _, kind_tokens in URL_RULES for t in kind_tokens] + list(FUZZY_NEW[0]) + list(FUZZY_NEW[1])
+    names = tokens + [f"{a}_{b}" for a in tokens for b in tokens] + [t.upper() for t in tokens]
+    names += ["IMG_0001", "scan", "new_m", "mter", "Old_Read/x", ""]
+    return [f"https://3ms.example.com/att/1/{name}.jpg" for name in names] + [None, "", "nofolder_card.jpg"]
+
+
+def _best(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _check(urls):
+    column = ImageInjector.detect_types(urls)
+    for i, url in enumerate(urls):
+        expected = _legacy_detect_type(url)
+        if ImageInjector.detect_type(url) != expected or column[i] != expected:
+            raise SystemExit(f"Classification differs for {url!r}: {expected!r} before")
+
+
+def _cold_per_url(urls):
+    classify_filename.cache_clear()
+    return [ImageInjector.detect_type(u) for u in urls]
+
+
+def main(sizes: list[int]) -> None:
+    _check(_vocabulary_urls())
+    print(f"{'rows':>8} {'legacy':>9} {'compiled':>9} {'memo':>8} {'column':>8} {'vs legacy':>10}")
+    for n_rows in sizes:
+        urls = make_raw_frame(n_rows)[COL_ATTACH_URL].tolist()
+        _check(urls)
+
+        legacy = _best(lambda: [_legacy_detect_type(u) for u in urls], repeat=3)
+        cold = _best(lambda: _cold_per_url(urls), repeat=3)
+        memo = _best(lambda: [ImageInjector.detect_type(u) for u in urls], repeat=3)
+        column = _best(lambda: ImageInjector.detect_types(urls), repeat=3)
+        print(f"{n_rows:>8} {legacy * 1000:>7.1f}ms {cold * 1000:>7.1f}ms {memo * 1000:>6.1f}ms "
+              f"{column * 1000:>6.1f}ms {legacy / column:>9.1f}x")
+
+    rule_counts, unclassified = ImageInjector.rule_stats(urls)
+    print("\nRules:", ", ".join(f"{rule}={count}" for rule, count in rule_counts.most_common()))
+    print("Unclassified:", ", ".join(f"{name}={count}" for name, count in unclassified.most_common(5)))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [20_000, 100_000])
@@ -0,0 +1,84 @@
+"""
+Benchmark: centering the CLAIM and ATTACHMENT cells after a run.
+
+"legacy" is format_all as it was (reading ws.max_column again for every row
+of both sheets); "all" is format_all with the used columns read once;
+"run rows" is format_rows for the rows one run writes, which is what
+run_process now does. The template holds `rows` rows from earlier runs.
+Checks that every formatted cell ends up with the same alignment.
+
+Usage: python scripts/bench_format.py [rows ...]   (default 10000)
+"""
+from __future__ import annotations
+
+import sys
+import time
+
+from openpyxl import Workbook
+
+from bench_data import PROJECT_ROOT  # noqa: F401  (puts the project on sys.path)
+
+from config import DATA_START_ROW
+from core.services.quality_control import CENTER, QualityControl
+
+CLAIM_COLUMNS = 18
+ATTACH_COLUMNS = 8
+RUN_ROWS = 500      # rows written by the run being formatted
+
+
+class _Handler:
+    def __init__(self, rows):
+        wb = Workbook()
+        self.ws_claim = wb.active
+        self.ws_attach = wb.create_sheet()
+        for ws, columns in ((self.ws_claim, CLAIM_COLUMNS), (self.ws_attach, ATTACH_COLUMNS)):
+            for r in range(DATA_START_ROW, DATA_START_ROW + rows):
+                for c in range(1, columns + 1):
+                    ws.cell(r, c, f"{r}-{c}")
+
+
+def _legacy_format_all(handler):
+    """format_all as it was before the used columns were read once per sheet."""
+    for ws in [handler.ws_claim, handler.ws_attach]:
+        for r in range(3, ws.max_row + 1):
+            for c in range(1, ws.max_column + 1):
+                ws.cell(row=r, column=c).alignment = CENTER
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def _check(handler, rows):
+    for ws in (handler.ws_claim, handler.ws_attach):
+        last_col = ws.max_column
+        for r in rows:
+            for c in range(1, last_col + 1):
+                if ws.cell(r, c).alignment != CENTER:
+                    raise SystemExit(f"Row {r} column {c} of {ws.title} is not centered")
+
+
+def main(sizes: list[int]) -> None:
+    print(f"{'rows':>8} {'legacy':>9} {'all':>9} {'run rows':>9} {'vs legacy':>10}")
+    for n_rows in sizes:
+        run_rows = range(DATA_START_ROW + n_rows - RUN_ROWS, DATA_START_ROW + n_rows)
+
+        handler = _Handler(n_rows)
+        legacy = _timed(lambda: _legacy_format_all(handler))
+
+        handler = _Handler(n_rows)
+        whole = _timed(lambda: QualityControl.format_all(handler))
+        _check(handler, range(DATA_START_ROW, DATA_START_ROW + n_rows))
+
+        handler = _Handler(n_rows)
+        scoped = _timed(lambda: QualityControl.format_rows(handler, run_rows, run_rows))
+        _check(handler, run_rows)
+
+        print(f"{n_rows:>8} {legacy * 1000:>7.0f}ms {whole * 1000:>7.0f}ms {scoped * 1000:>7.1f}ms "
+              f"{legacy / scoped:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000])
@@ -0,0 +1,76 @@
+"""
+Benchmark: peak RSS of ingesting a RAW export with and without CATEGORICAL_RAW.
+
+Each mode runs in a fresh interpreter (peak RSS never goes down), parsing
+the export in memory and building claim rows and the URL map.
+
+Usage: python scripts/bench_raw_memory.py [rows]   (default 100000)
+"""
+from __future__ import annotations
+
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from bench_data import PROJECT_ROOT, write_raw_xlsx
+
+_CHILD = """
+import sys
+sys.path.insert(0, {root!r})
+import config
+config.CATEGORICAL_RAW = {categorical!r}
+from bench_raw_memory import peak_rss_mb
+from core.services.ingest import ingest
+before = peak_rss_mb()
+result = ingest({path!r}, streaming=False)
+print(peak_rss_mb() - before, len(result.claim_rows))
+"""
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    try:
+        import resource
+    except ImportError:   # Windows
+        import ctypes
+        from ctypes import wintypes
+
+        class _Counters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage",
+                )
+            ]
+
+        counters = _Counters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb)
+        return counters.PeakWorkingSetSize / 2**20
+    scale = 2**20 if sys.platform == "darwin" else 2**10   # bytes on macOS, KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def _run(path: Path, categorical: bool) -> tuple[float, int]:
+    code = _CHILD.format(root=str(PROJECT_ROOT), categorical=categorical, path=str(path))
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=Path(__file__).parent, capture_output=True, text=True, check=True
+    ).stdout.split()
+    return float(output[0]), int(output[1])
+
+
+def main(n_rows: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_raw_xlsx(Path(tmp) / f"raw_{n_rows}.xlsx", n_rows)
+        plain, plain_rows = _run(path, categorical=False)
+        categorical, categorical_rows = _run(path, categorical=True)
+    if plain_rows != categorical_rows:
+        raise SystemExit("Row count mismatch between modes")
+    print(f"{'rows':>8} {'plain MB':>9} {'categorical MB':>15} {'saved':>7}")
+    print(f"{n_rows:>8} {plain:>9.1f} {categorical:>15.1f} {1 - categorical / plain:>6.0%}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,113 @@
+"""
+Benchmark: building the SO -> attachment URL map, the previous implementation
+(build_url_map before the UrlMap change, loaded from git) vs the column-wise
+UrlMap.
+
+"whole" builds the map of the full RAW frame. "chunked" builds it over
+STREAM_CHUNK_SIZE slices as the streaming path does: previously one dict
+filled chunk by chunk, now one UrlMap per chunk merged at the end. Both
+paths are compared with their own previous version only; every SO is
+checked to map to the same URLs as before. A lookup pass (url_map.get for
+every SO, as the Attachment writer does) is timed too. The filename
+classification cache is cleared before every build, as in a fresh run.
+
+Needs the git history (git show); run from a checkout of the repository.
+
+Usage: python scripts/bench_url_map.py [rows ...]   (default 50000 200000)
+"""
+from __future__ import annotations
+
+import subprocess
+import sys
+import time
+import types
+
+from bench_data import PROJECT_ROOT, make_raw_frame
+
+from config import STREAM_CHUNK_SIZE
+from core.raw_dataset import RawDataset
+from core.services import image_injector
+from core.services.image_injector import ImageInjector, UrlMap
+
+PREVIOUS = "d19ef6a^"   # Last commit with the dict-of-dicts URL map
+
+
+def _previous_module(path, name):
+    """Module `path` as it was at PREVIOUS (imports resolve against the current tree)."""
+    source = subprocess.run(
+        ["git", "show", f"{PREVIOUS}:{path}"], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    module = types.ModuleType(name)
+    module.__file__ = str(PROJECT_ROOT / path)
+    exec(compile(source, f"{path}@{PREVIOUS}", "exec"), module.__dict__)
+    return module
+
+
+_legacy_raw = _previous_module("core/raw_dataset.py", "legacy_raw_dataset")
+_legacy_injector = _previous_module("core/services/image_injector.py", "legacy_image_injector")
+_legacy_injector.RawDataset = _legacy_raw.RawDataset   # url_entries as it was (per-row generator)
+
+
+def _best(fn, clear, repeat=3):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        clear()
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _chunks(frame, dataset_cls):
+    """Consecutive STREAM_CHUNK_SIZE slices with the SO fill carried across, as iter_chunks yields."""
+    chunks, carry = [], None
+    for start in range(0, len(frame), STREAM_CHUNK_SIZE):
+        chunk = dataset_cls(frame.iloc[start:start + STREAM_CHUNK_SIZE].reset_index(drop=True), so_carry=carry)
+        chunks.append(chunk)
+        carry = chunk.last_so
+    return chunks
+
+
+def _legacy_streaming(chunks):
+    """build_url_map_streaming as it was, over chunks already read."""
+    url_map = {}
+    for chunk in chunks:
+        _legacy_injector.ImageInjector.url_map_from_entries(chunk.url_entries(), url_map)
+    return url_map
+
+
+def _check(expected, url_map, label):
+    if len(expected) != len(url_map) or list(expected) != list(url_map):
+        raise SystemExit(f"{label}: SOs differ ({len(expected)} before, {len(url_map)} now)")
+    for so, imgs in expected.items():
+        if url_map.get(so) != imgs:
+            raise SystemExit(f"{label}: URLs of {so} differ: {imgs} before, {url_map.get(so)} now")
+
+
+def main(sizes: list[int]) -> None:
+    clear_legacy = _legacy_injector.classify_filename.cache_clear
+    clear_current = image_injector.classify_filename.cache_clear
+    print(f"{'rows':>8} {'SOs':>7} | {'whole: before':>13} {'UrlMap':>9} {'ratio':>6} | "
+          f"{'chunked: before':>15} {'UrlMap':>9} {'ratio':>6} | {'lookup':>8}")
+    for n_rows in sizes:
+        frame = make_raw_frame(n_rows)
+        legacy_dataset = _legacy_raw.RawDataset(frame)
+        dataset = RawDataset(frame)
+        legacy_chunks = _chunks(frame, _legacy_raw.RawDataset)
+        chunks = _chunks(frame, RawDataset)
+
+        legacy, expected = _best(lambda: _legacy_injector.ImageInjector.build_url_map(legacy_dataset), clear_legacy)
+        whole, url_map = _best(lambda: ImageInjector.build_url_map(dataset), clear_current)
+        legacy_chunked, expected_chunked = _best(lambda: _legacy_streaming(legacy_chunks), clear_legacy)
+        chunked, merged = _best(lambda: UrlMap.merge(UrlMap.from_rows(*c.url_rows()) for c in chunks), clear_current)
+        _check(expected, url_map, "whole")
+        _check(expected_chunked, merged, "chunked")
+        lookup, _ = _best(lambda: [url_map.get(so, {}) for so in dataset.so_keys], lambda: None)
+
+        print(f"{n_rows:>8} {len(url_map):>7} | {legacy * 1000:>11.1f}ms {whole * 1000:>7.1f}ms "
+              f"{legacy / whole:>5.1f}x | {legacy_chunked * 1000:>13.1f}ms {chunked * 1000:>7.1f}ms "
+              f"{legacy_chunked / chunked:>5.1f}x | {lookup * 1000:>6.1f}ms")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [50_000, 200_000])
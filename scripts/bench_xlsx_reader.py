@@ -0,0 +1,47 @@
+"""
+Benchmark: core.xlsx_reader (column-projected) vs pd.read_excel(dtype=str).
+
+Usage: python scripts/bench_xlsx_reader.py [rows ...]   (default 10000 50000 100000)
+"""
+from __future__ import annotations
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from bench_data import write_raw_xlsx
+
+from core.xlsx_reader import read_xlsx
+from core.raw_dataset import is_raw_column
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def _same(expected: pd.DataFrame, actual: pd.DataFrame) -> bool:
+    expected = expected[list(actual.columns)].astype(object)
+    expected = expected.where(expected.notna(), None)
+    actual = actual.where(actual.notna(), None)
+    return expected.shape == actual.shape and bool((expected.values == actual.values).all())
+
+
+def main(sizes: list[int]) -> None:
+    print(f"{'rows':>8} {'read_excel':>11} {'projected':>10} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in sizes:
+            path = write_raw_xlsx(Path(tmp) / f"raw_{n_rows}.xlsx", n_rows)
+            full, t_pandas = _timed(lambda: pd.read_excel(path, dtype=str))
+            projected, t_projected = _timed(lambda: read_xlsx(path, usecols=is_raw_column))
+            if not _same(full, projected):
+                raise SystemExit(f"Reader mismatch at {n_rows} rows")
+            print(f"{n_rows:>8} {t_pandas:>10.2f}s {t_projected:>9.2f}s {t_pandas / t_projected:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 50_000, 100_000])
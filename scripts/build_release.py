@@ -37,6 +37,7 @@ INCLUDE_DIRS = [
 
 EXCLUDE_DIR_NAMES = {
     "__pycache__",
+    ".cache",
     ".git",
     ".venv",
     "dist",
@@ -0,0 +1,80 @@
+"""Shared fixtures: a local HTTP stub serving attachment photos, and test JPEGs."""
+import io
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from PIL import Image
+
+EXIF_IFD = 0x8769
+DATE_TIME_ORIGINAL = 0x9003
+
+
+class PhotoServer:
+    """
+    Serves `routes` ({path: bytes}) on 127.0.0.1; other paths answer 404.
+    `hits` counts the requests per path (HEAD and GET alike).
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.hits = Counter()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _answer(self, with_body):
+                server.hits[self.path] += 1
+                body = server.routes.get(self.path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if with_body:
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                self._answer(True)
+
+            def do_HEAD(self):
+                self._answer(False)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.httpd.server_port}{path}"
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def photo_server():
+    server = PhotoServer()
+    yield server
+    server.close()
+
+
+def jpeg_bytes(seed=0, taken=None, size=(320, 240)):
+    """JPEG of a gradient pattern (different per seed), with an EXIF DateTimeOriginal when `taken`."""
+    width, height = size
+    image = Image.new("RGB", size)
+    image.putdata([
+        ((x * 255 // width + seed * 40) % 256, (y * 255 // height) % 256, (x * y + seed * 97) % 256)
+        for y in range(height) for x in range(width)
+    ])
+    exif = Image.Exif()
+    if taken is not None:
+        exif.get_ifd(EXIF_IFD)[DATE_TIME_ORIGINAL] = taken.strftime("%Y:%m:%d %H:%M:%S")
+    out = io.BytesIO()
+    image.save(out, "JPEG", quality=90, exif=exif)
+    return out.getvalue()
@@ -0,0 +1,25 @@
+"""Day types of core/holiday_calendar.py."""
+from datetime import date, timedelta
+
+from core.holiday_calendar import HolidayCalendar
+
+HOLIDAYS = {"JHR": [date(2025, 3, 23), date(2025, 5, 1)], "KTN": [date(2025, 5, 1)]}
+
+
+def test_day_type_matches_classify():
+    calendar = HolidayCalendar(HOLIDAYS)
+    days = [date(2025, 1, 1) + timedelta(i) for i in range(365)]
+    for state in (None, "KTN", "6410", "SWK"):
+        labels = calendar.labels(days, state)
+        assert [calendar.day_type(day, state) for day in days] == list(labels)
+    assert calendar.day_type(date(2025, 3, 23)) == "Cuti Umum"          # holiday on a Sunday
+    assert calendar.day_type(date(2025, 3, 23), "KTN") == "Hujung Minggu"
+    assert calendar.day_type(None) == "Hari Biasa"
+
+
+def test_uncovered_year_warns_once(capsys):
+    calendar = HolidayCalendar(HOLIDAYS)
+    assert calendar.day_type(date(2027, 5, 1)) == "Hari Biasa"
+    calendar.classify([date(2027, 5, 2), date(2025, 5, 1)])
+    out = capsys.readouterr().out
+    assert out.count("2027") == 1 and "covers 2025-2025" in out
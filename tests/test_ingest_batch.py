@@ -0,0 +1,18 @@
+"""Batches of RAW exports (core/services/ingest.py ingest_batch)."""
+from core.services import ingest
+from core.services.claim_service import ClaimService
+from scripts.bench_data import write_raw_xlsx
+
+
+def test_per_source_stats_match_a_single_file_run(tmp_path, monkeypatch):
+    paths = [write_raw_xlsx(tmp_path / f"raw_{seed}.xlsx", 300, seed=seed) for seed in (1, 2)]
+    finalized = []
+    finalize = ClaimService.finalize_groups
+    monkeypatch.setattr(ClaimService, "finalize_groups", lambda groups: finalized.append(1) or finalize(groups))
+
+    result = ingest.ingest_batch(paths, max_workers=1)
+
+    assert len(finalized) == 1               # claim rows are built once, for the merged groups
+    for (label, stats), path in zip(result.sources, paths):
+        assert label == path.name
+        assert stats == finalize(ClaimService.group_dataset(ingest.RawDataset.coerce(path)))[1]
@@ -0,0 +1,38 @@
+"""Artifact cache of RAW ingestion (core/services/ingest.py)."""
+import shutil
+
+import pytest
+
+from config import HOLIDAY_FILE
+from core.artifact_cache import ArtifactCache
+from core.services import ingest
+from scripts.bench_data import write_raw_xlsx
+
+
+@pytest.fixture
+def holiday_file(tmp_path, monkeypatch):
+    path = tmp_path / "public_holidays.csv"
+    shutil.copy(HOLIDAY_FILE, path)
+    monkeypatch.setattr(ingest, "HOLIDAY_FILE", str(path))
+    return path
+
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_holiday_list_change_invalidates_cached_rows(tmp_path, holiday_file, batch):
+    raw = write_raw_xlsx(tmp_path / "raw.xlsx", 200)
+    cache = ArtifactCache(root=tmp_path / "cache")
+
+    def run():
+        if batch:
+            return ingest.ingest_batch([raw], cache=cache)
+        return ingest.ingest(raw, cache=cache)
+
+    run()
+    misses = cache.misses
+    run()
+    assert cache.misses == misses            # warm re-run served from the cache
+
+    with open(holiday_file, "a", encoding="utf-8") as handle:
+        handle.write("2025-07-01,Test Holiday,ALL\n")
+    run()
+    assert cache.misses > misses             # new holiday list: parsed again
@@ -0,0 +1,34 @@
+"""Broken attachment links (core/services/link_checker.py)."""
+import socket
+
+from core.services.link_checker import UNREACHABLE, LinkChecker
+from core.sqlite_cache import SqliteCache
+
+
+def _closed_port_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}/photo.jpg"
+
+
+def test_statuses_over_http_and_cache_them(photo_server, tmp_path):
+    photo_server.routes["/photo.jpg"] = b"\xff\xd8 photo bytes"
+    photo_server.routes["/notes.txt"] = b"not an image"
+    good, missing, text = (photo_server.url(p) for p in ("/photo.jpg", "/missing.jpg", "/notes.txt"))
+    down = _closed_port_url()
+    now = [1_000_000.0]
+    checker = LinkChecker(cache=SqliteCache("link_status", tmp_path / "cache.sqlite"), timeout=2,
+                          ttl=3600, clock=lambda: now[0])
+
+    # A non-image body still resolves: only the status counts
+    assert checker.broken([good, missing, text, down]) == {missing: 404, down: UNREACHABLE}
+    assert (checker.checked, checker.cached, checker.failed) == (4, 0, 1)
+
+    # HTTP answers are cached for the TTL; network errors are retried
+    assert checker.statuses([good, missing, text, down]) == {good: 200, missing: 404, text: 200, down: UNREACHABLE}
+    assert (checker.checked, checker.cached, checker.failed) == (1, 3, 1)
+    assert photo_server.hits["/photo.jpg"] == 1
+
+    now[0] += 3600
+    checker.statuses([good])
+    assert (checker.checked, photo_server.hits["/photo.jpg"]) == (1, 2)
@@ -0,0 +1,77 @@
+"""Stamp dates read from attachment photos (core/services/ocr_dates.py)."""
+from datetime import datetime
+
+import pytest
+
+from conftest import jpeg_bytes
+from core.services.ocr_dates import StampDateReader
+from core.sqlite_cache import SqliteCache
+
+
+class StubBackend:
+    """Recognizes every stamp as `text`; raises when `text` is an exception."""
+
+    name = "stub"
+
+    def __init__(self, text="04/12/2025 10:31"):
+        self.text = text
+        self.calls = 0
+
+    def __call__(self, image):
+        self.calls += 1
+        if isinstance(self.text, Exception):
+            raise self.text
+        return self.text
+
+
+@pytest.fixture
+def caches(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    return {"url_cache": SqliteCache("ocr_url_hashes", path), "image_cache": SqliteCache("ocr_dates", path)}
+
+
+def _reader(backend, caches, **options):
+    # One worker: stamps are recognized in this process, so the stub's call count is visible
+    return StampDateReader(backend=backend, max_workers=1, **caches, **options)
+
+
+def test_read_stamps_over_http_and_cache_them(photo_server, caches):
+    photo_server.routes["/photo.jpg"] = jpeg_bytes()
+    photo_server.routes["/notes.txt"] = b"not an image"
+    good, missing, text = (photo_server.url(p) for p in ("/photo.jpg", "/missing.jpg", "/notes.txt"))
+    backend = StubBackend()
+    reader = _reader(backend, caches)
+
+    stamped = datetime(2025, 12, 4)
+    assert reader.read([good, missing, text]) == {good: stamped, missing: None, text: None}
+    assert (reader.recognized, reader.cached, reader.failed) == (2, 0, 1)
+    assert backend.calls == 1
+
+    assert reader.read([good, missing, text]) == {good: stamped, missing: None, text: None}
+    assert (reader.recognized, reader.cached, reader.failed) == (0, 2, 1)
+    assert backend.calls == 1 and photo_server.hits["/photo.jpg"] == 1
+
+
+def test_backend_errors_fail_one_photo_and_are_retried(photo_server, caches):
+    photo_server.routes["/a.jpg"] = jpeg_bytes(seed=1)
+    urls = [photo_server.url("/a.jpg")]
+
+    reader = _reader(StubBackend(RuntimeError("tesseract is not installed")), caches)
+    assert reader.read(urls) == {urls[0]: None}
+    assert (reader.recognized, reader.failed) == (0, 1)
+
+    backend = StubBackend()
+    reader = _reader(backend, caches)
+    assert reader.read(urls) == {urls[0]: datetime(2025, 12, 4)}
+    assert backend.calls == 1
+
+
+def test_results_are_kept_per_backend_and_stamp_box(photo_server, caches):
+    photo_server.routes["/a.jpg"] = jpeg_bytes(seed=2)
+    urls = [photo_server.url("/a.jpg")]
+    _reader(StubBackend(""), caches).read(urls)     # no date on this crop
+
+    backend = StubBackend()
+    reader = _reader(backend, caches, box=(0.0, 0.0, 1.0, 1.0))
+    assert reader.read(urls) == {urls[0]: datetime(2025, 12, 4)}
+    assert backend.calls == 1
@@ -0,0 +1,56 @@
+"""CLAIM counts of the payslip generator (core/services/payslip_service.py)."""
+from datetime import datetime
+
+import pytest
+from openpyxl import Workbook
+
+from core.services.payslip_service import load_claim_counts
+
+HEADERS = ["Labor", "Voltage", "Hari Biasa / Hujung Minggu / Cuti Umum", "Status Date", "REMARKS", "REMARKS 2", "Site"]
+# 1 May 2025 is Hari Pekerja (Cuti Umum everywhere), 2 May a Friday, 4 May a Sunday
+ROWS = [
+    ("KMRT0001", "01", "Hari Biasa", datetime(2025, 5, 1), None, None, "6340"),
+    ("KMRT0001", "02", "Hari Biasa", datetime(2025, 5, 2), None, None, "6340"),
+    ("KMRT0002", "01", "Hujung Minggu", datetime(2025, 5, 4), None, None, "6340"),
+    ("KMRT0002", "01", None, datetime(2025, 5, 1), None, None, "6340"),
+    ("KMRT0003", "02", "Cuti Umum", datetime(2025, 5, 1), None, "KIV", "6340"),
+]
+
+
+@pytest.fixture
+def lks_path(tmp_path):
+    workbook = Workbook()
+    worksheet = workbook.active
+    worksheet.title = "CLAIM"
+    worksheet.append(HEADERS)
+    for row in ROWS:
+        worksheet.append(row)
+    path = tmp_path / "LKS.xlsx"
+    workbook.save(path)
+    return path
+
+
+def test_written_day_types_keep_their_counts(lks_path):
+    summary = load_claim_counts([lks_path])
+
+    # Counted as written, as before the holiday calendar: the Hari Biasa row on
+    # a public holiday stays Hari Biasa and the blank row is skipped
+    assert summary.counts_by_team["KMRT0001"] == (1.0, 1.0, 0.0, 0.0, 0.0, 0.0)
+    assert summary.counts_by_team["KMRT0002"] == (0.0, 0.0, 1.0, 0.0, 0.0, 0.0)
+    assert summary.kiv_counts_by_team["KMRT0003"] == (0.0, 1.0)
+    assert (summary.total_rows, summary.counted_rows, summary.skipped_rows) == (5, 4, 1)
+
+
+def test_calendar_disagreements_are_reported(lks_path):
+    summary = load_claim_counts([lks_path])
+
+    assert summary.file_summaries[0].calendar_mismatches == ((2, "Hari Biasa", "Cuti Umum"),)
+    assert any("row 2 (Hari Biasa, calendar: Cuti Umum)" in warning for warning in summary.warnings)
+
+
+def test_blank_day_types_filled_only_on_request(lks_path):
+    summary = load_claim_counts([lks_path], fill_day_types=True)
+
+    assert summary.counts_by_team["KMRT0001"] == (1.0, 1.0, 0.0, 0.0, 0.0, 0.0)
+    assert summary.counts_by_team["KMRT0002"] == (0.0, 0.0, 1.0, 0.0, 1.0, 0.0)
+    assert summary.skipped_rows == 0
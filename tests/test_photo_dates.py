@@ -0,0 +1,23 @@
+"""EXIF capture dates of attachment photos (core/services/photo_dates.py)."""
+from datetime import datetime
+
+from conftest import jpeg_bytes
+from core.services.photo_dates import PhotoDateReader
+from core.sqlite_cache import SqliteCache
+
+TAKEN = datetime(2025, 5, 1, 9, 30, 15)
+
+
+def test_read_dates_over_http_and_cache_them(photo_server, tmp_path):
+    photo_server.routes["/photo.jpg"] = jpeg_bytes(taken=TAKEN)
+    photo_server.routes["/notes.txt"] = b"not an image"
+    good, missing, text = (photo_server.url(p) for p in ("/photo.jpg", "/missing.jpg", "/notes.txt"))
+    reader = PhotoDateReader(cache=SqliteCache("photo_dates", tmp_path / "cache.sqlite"), max_workers=2)
+
+    assert reader.read([good, missing, text]) == {good: TAKEN, missing: None, text: None}
+    assert (reader.fetched, reader.cached, reader.failed) == (2, 0, 1)
+
+    # Dates (and "no date") come from the cache; the unreachable photo is retried
+    assert reader.read([good, missing, text]) == {good: TAKEN, missing: None, text: None}
+    assert (reader.fetched, reader.cached, reader.failed) == (0, 2, 1)
+    assert photo_server.hits["/photo.jpg"] == 1 and photo_server.hits["/missing.jpg"] == 2
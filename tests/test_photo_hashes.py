@@ -0,0 +1,58 @@
+"""Photos reused across SOs (core/services/photo_hashes.py)."""
+import io
+
+from PIL import Image
+
+from conftest import jpeg_bytes
+from core.services.photo_hashes import PhotoHasher, PhotoHashIndex, reused_photos
+from core.sqlite_cache import SqliteCache
+
+
+def _resized(data, size):
+    with Image.open(io.BytesIO(data)) as image:
+        out = io.BytesIO()
+        image.resize(size).save(out, "JPEG", quality=60)
+    return out.getvalue()
+
+
+def _hasher(tmp_path):
+    # One worker: photos are hashed in this process
+    return PhotoHasher(cache=SqliteCache("photo_hashes", tmp_path / "cache.sqlite"), max_workers=1)
+
+
+def test_hashes_over_http_and_cache_them(photo_server, tmp_path):
+    photo_server.routes["/photo.jpg"] = jpeg_bytes()
+    photo_server.routes["/notes.txt"] = b"not an image"
+    good, missing, text = (photo_server.url(p) for p in ("/photo.jpg", "/missing.jpg", "/notes.txt"))
+    hasher = _hasher(tmp_path)
+
+    found = hasher.hashes([good, missing, text])
+    assert list(found) == [good]
+    assert (hasher.hashed, hasher.cached, hasher.failed) == (2, 0, 1)
+
+    # Hashes (and "not an image") come from the cache; the 404 is retried
+    assert hasher.hashes([good, missing, text]) == found
+    assert (hasher.hashed, hasher.cached, hasher.failed) == (0, 2, 1)
+    assert photo_server.hits["/photo.jpg"] == 1 and photo_server.hits["/missing.jpg"] == 2
+
+
+def test_reused_photos_in_the_run_and_the_archive(photo_server, tmp_path):
+    photo = jpeg_bytes(seed=3, size=(640, 480))
+    photo_server.routes["/a.jpg"] = photo
+    photo_server.routes["/b.jpg"] = _resized(photo, (480, 360))      # re-encoded copy of a
+    photo_server.routes["/c.jpg"] = jpeg_bytes(seed=5, size=(640, 480))
+    photo_server.routes["/old.jpg"] = photo
+    hasher = _hasher(tmp_path)
+
+    archive_path = tmp_path / "photo_hashes.npz"
+    hasher.index([("SO0", "card", photo_server.url("/old.jpg"))]).save(archive_path)
+    run = hasher.index([
+        ("SO1", "new", photo_server.url("/a.jpg")),
+        ("SO2", "new", photo_server.url("/b.jpg")),
+        ("SO3", "new", photo_server.url("/c.jpg")),
+    ])
+
+    assert reused_photos(run, PhotoHashIndex.load(archive_path)) == {
+        "SO1": ["new = SO SO2 new", "new = SO SO0 card (earlier run)"],
+        "SO2": ["new = SO SO1 new", "new = SO SO0 card (earlier run)"],
+    }
@@ -0,0 +1,23 @@
+"""Row styling of core/services/quality_control.py."""
+from openpyxl import Workbook, load_workbook
+
+from core.services.quality_control import CENTER, RED_FILL, center_rows, highlight_rows
+
+
+def test_styles_cover_the_used_columns_and_survive_a_save(tmp_path):
+    workbook = Workbook()
+    ws = workbook.active
+    for r in range(3, 8):
+        for c in range(1, 5):
+            ws.cell(r, c, f"{r}-{c}")
+
+    highlight_rows(ws, [4, 6])
+    center_rows(ws, range(3, 8))
+    workbook.save(tmp_path / "qc.xlsx")
+
+    ws = load_workbook(tmp_path / "qc.xlsx").active
+    for r in range(3, 8):
+        for c in range(1, 5):
+            cell = ws.cell(r, c)
+            assert cell.alignment == CENTER
+            assert (cell.fill == RED_FILL) == (r in (4, 6))
@@ -0,0 +1,28 @@
+"""Thumbnails of attachment photos (core/services/thumbnails.py)."""
+from PIL import Image
+
+from conftest import jpeg_bytes
+from core.services.thumbnails import ThumbnailCache
+from core.sqlite_cache import SqliteCache
+
+
+def test_thumbnails_over_http_and_cache_them(photo_server, tmp_path):
+    photo = jpeg_bytes(size=(640, 480))
+    photo_server.routes["/photo.jpg"] = photo
+    photo_server.routes["/copy.jpg"] = photo
+    photo_server.routes["/notes.txt"] = b"not an image"
+    good, copy, missing, text = (photo_server.url(p) for p in ("/photo.jpg", "/copy.jpg", "/missing.jpg", "/notes.txt"))
+    thumbs = ThumbnailCache(directory=tmp_path / "thumbs", size=(160, 120),
+                            url_cache=SqliteCache("thumb_url_hashes", tmp_path / "cache.sqlite"))
+
+    paths = thumbs.paths([good, copy, missing, text])
+    assert set(paths) == {good, copy}
+    assert paths[good] == paths[copy]                    # one file per photo, however many URLs
+    with Image.open(paths[good]) as image:
+        assert image.format == "JPEG" and image.size == (160, 120)
+    assert (thumbs.fetched, thumbs.cached, thumbs.failed) == (3, 0, 1)
+
+    # Thumbnails already on disk are not downloaded again
+    assert thumbs.paths([good, copy, missing, text]) == paths
+    assert (thumbs.fetched, thumbs.cached, thumbs.failed) == (1, 2, 1)
+    assert photo_server.hits["/photo.jpg"] == 1 and photo_server.hits["/copy.jpg"] == 1
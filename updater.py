@@ -19,6 +19,7 @@ REPOSITORY = "nua1m/TNB-LKS-Automation"
 LATEST_RELEASE_API = f"https://api.github.com/repos/{REPOSITORY}/releases/latest"
 REQUEST_TIMEOUT_SECONDS = 8
 PRESERVE_TOP_LEVEL = {
+    ".cache",
     ".git",
     ".venv",
     "__pycache__",